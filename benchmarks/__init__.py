@@ -0,0 +1 @@
+"""Performance benchmarks (run headless under SDL's dummy video driver)"""
@@ -0,0 +1,88 @@
+"""Memory benchmark: Python shape objects vs the columnar NumPy store
+
+Run with:  python -m benchmarks.bench_memory [count]
+"""
+
+import os
+import random
+import sys
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+from config import RED, GREEN, BLUE
+from shapes import Circle, Ellipse, Line, Scene
+from shapes.columnar import ColumnarScene
+
+
+def _random_rows(count, seed=1):
+    """Deterministic mix of circle/ellipse/line parameters"""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        kind = rng.random()
+        x, y = rng.randint(-100000, 100000), rng.randint(-100000, 100000)
+        if kind < 0.4:
+            rows.append(("circle", x, y, rng.randint(1, 5000)))
+        elif kind < 0.7:
+            rows.append(("ellipse", x, y, rng.randint(1, 5000), rng.randint(1, 5000)))
+        else:
+            rows.append(("line", x, y, rng.randint(-100000, 100000), rng.randint(-100000, 100000)))
+    return rows
+
+
+def _make_objects(rows):
+    colors = (RED, GREEN, BLUE)
+    shapes = []
+    for i, row in enumerate(rows):
+        color = colors[i % 3]
+        if row[0] == "circle":
+            shapes.append(Circle(row[1], row[2], row[3], color, (row[1], row[2])))
+        elif row[0] == "ellipse":
+            shapes.append(Ellipse(row[1], row[2], row[3], row[4], color, (row[1], row[2])))
+        else:
+            shapes.append(Line(row[1], row[2], row[3], row[4], color, tuple(row[1:])))
+    return shapes
+
+
+def _measure(build):
+    """Return (result, bytes allocated while building it)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def run(count=200000):
+    """Return bytes per shape for each storage strategy"""
+    rows = _random_rows(count)
+
+    objects, object_bytes = _measure(lambda: _make_objects(rows))
+    _, scene_bytes = _measure(lambda: Scene(objects))
+
+    def build_columnar():
+        store = ColumnarScene()
+        for shape in objects:
+            store.append(shape)
+        return store
+
+    store, columnar_bytes = _measure(build_columnar)
+    return {
+        'shapes': count,
+        'objects_bytes_per_shape': object_bytes / count,
+        'objects_with_index_bytes_per_shape': (object_bytes + scene_bytes) / count,
+        'columnar_bytes_per_shape': columnar_bytes / count,
+        'columnar_payload_bytes_per_shape': store.bytes_per_shape(),
+    }
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    for name, value in run(count).items():
+        print(f"{name:<38}{value:>12.1f}" if isinstance(value, float) else f"{name:<38}{value:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Backend benchmark: pygame.draw per shape vs the batched NumPy rasterizer
+
+Run with:  python -m benchmarks.bench_raster [count] [--zoom 1,3]
+
+Draws a ColumnarScene of count circles, ellipses and lines (geometry
+only) with each render backend and prints the time per frame, the
+speedup and the share of drawn pixels on which the two backends differ.
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+from config import RED, GREEN, BLUE, CANVAS_BG_COLOR, LOD_POINT_SIZE_PX
+from drawing import LabelPlacer
+from shapes import ColumnarScene, BACKENDS, set_backend
+
+
+CANVAS = (1920, 1080)
+MAX_SIZE = 4  # Largest radius / line extent in world units: many small primitives
+
+
+def _small_scene(count, seed=1):
+    """count shapes of each kind scattered over the benchmark canvas"""
+    rng = np.random.default_rng(seed)
+    half_w, half_h = CANVAS[0] // 10, CANVAS[1] // 10
+
+    def xs():
+        return rng.integers(-half_w, half_w, count)
+
+    def ys():
+        return rng.integers(-half_h, half_h, count)
+
+    def sizes(low=1):
+        return rng.integers(low, MAX_SIZE + 1, count)
+
+    scene = ColumnarScene()
+    scene.add_circles(xs(), ys(), sizes(), RED, labelled=False)
+    scene.add_ellipses(xs(), ys(), sizes(), sizes(), GREEN, labelled=False)
+    x, y = xs(), ys()
+    scene.add_lines(x, y, x + sizes(-MAX_SIZE), y + sizes(-MAX_SIZE), BLUE, labelled=False)
+    return scene
+
+
+def _render(scene, zoom_level, repeat):
+    """(best seconds per frame, pixels) of a geometry-only redraw of the whole canvas"""
+    surface = pygame.Surface(CANVAS)
+    best = float('inf')
+    for _ in range(repeat + 1):  # The first frame fills the stencil cache
+        surface.fill(CANVAS_BG_COLOR)
+        labels = LabelPlacer(labels=False)
+        start = time.perf_counter()
+        scene.draw_batch(surface, CANVAS[0], CANVAS[1], CANVAS[0] // 2, CANVAS[1] // 2, zoom_level,
+                         LOD_POINT_SIZE_PX, labels=labels)
+        best = min(best, time.perf_counter() - start)
+    return best, pygame.surfarray.array2d(surface)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the pygame and numpy render backends.")
+    parser.add_argument("count", type=int, nargs="?", default=100000, help="shapes per kind (default: 100000)")
+    parser.add_argument("--zoom", default="1,3", help="comma-separated zoom levels (default: 1,3)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed frames per backend (default: 3)")
+    args = parser.parse_args()
+
+    pygame.display.init()
+    scene = _small_scene(args.count)
+    background = pygame.Surface((1, 1))
+    background.fill(CANVAS_BG_COLOR)
+    blank = pygame.surfarray.array2d(background)[0, 0]
+
+    print(f"{args.count * 3} shapes on {CANVAS[0]}x{CANVAS[1]}")
+    for zoom_level in (float(z) for z in args.zoom.split(",")):
+        times, pixels = {}, {}
+        for backend in BACKENDS:
+            set_backend(backend)
+            times[backend], pixels[backend] = _render(scene, zoom_level, args.repeat)
+        drawn = (pixels['pygame'] != blank).sum()
+        differ = (pixels['pygame'] != pixels['numpy']).sum()
+        print(f"zoom {zoom_level:g}: pygame {times['pygame'] * 1000:8.1f} ms  "
+              f"numpy {times['numpy'] * 1000:8.1f} ms  ({times['pygame'] / times['numpy']:.1f}x)  "
+              f"{differ} of {drawn} pixels differ ({differ / max(drawn, 1):.3%})")
+    set_backend(BACKENDS[0])
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
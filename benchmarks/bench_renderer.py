@@ -0,0 +1,104 @@
+"""Micro-benchmark: per-row gradient drawing vs precomputed surfaces
+
+Run with:  python -m benchmarks.bench_renderer
+"""
+
+import os
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from config import *
+from drawing.fonts import render_text
+from drawing.renderer import draw_gradient_rect, draw_button_3d
+
+
+# =====================
+# Reference (old) implementations
+# =====================
+def legacy_gradient_rect(surface, rect, color1, color2, vertical=True):
+    """Old path: one pygame.draw.rect per pixel row/column"""
+    if vertical:
+        for i in range(rect.height):
+            alpha = i / rect.height
+            r = int(color1[0] * (1 - alpha) + color2[0] * alpha)
+            g = int(color1[1] * (1 - alpha) + color2[1] * alpha)
+            b = int(color1[2] * (1 - alpha) + color2[2] * alpha)
+            pygame.draw.rect(surface, (r, g, b), (rect.x, rect.y + i, rect.width, 1))
+    else:
+        for i in range(rect.width):
+            alpha = i / rect.width
+            r = int(color1[0] * (1 - alpha) + color2[0] * alpha)
+            g = int(color1[1] * (1 - alpha) + color2[1] * alpha)
+            b = int(color1[2] * (1 - alpha) + color2[2] * alpha)
+            pygame.draw.rect(surface, (r, g, b), (rect.x + i, rect.y, 1, rect.height))
+
+
+def legacy_button_3d(surface, rect, color, text, font_size, pressed=False):
+    """Old path: shadow, per-row gradient, border and text on every call"""
+    if not pressed:
+        shadow_rect = rect.copy()
+        shadow_rect.y += 4
+        pygame.draw.rect(surface, VERY_DARK_GRAY, shadow_rect, border_radius=8)
+    button_rect = rect.copy()
+    if pressed:
+        button_rect.y += 2
+    for i in range(rect.height):
+        alpha = i / rect.height
+        r = int(color[0] * (1 - alpha * 0.2))
+        g = int(color[1] * (1 - alpha * 0.2))
+        b = int(color[2] * (1 - alpha * 0.2))
+        pygame.draw.rect(surface, (r, g, b), (button_rect.x, button_rect.y + i, button_rect.width, 1))
+    pygame.draw.rect(surface, BLACK, button_rect, 2, border_radius=8)
+    text_surface = render_text(text, font_size, WHITE)
+    surface.blit(text_surface, text_surface.get_rect(center=button_rect.center))
+
+
+CASES = [
+    ("panel background", lambda f, s: f(s, pygame.Rect(0, 0, INPUT_PANEL_WIDTH, 900), PANEL_BG, VERY_DARK_GRAY, True)),
+    ("panel header", lambda f, s: f(s, pygame.Rect(0, 0, INPUT_PANEL_WIDTH, 70), PANEL_HEADER, PANEL_BG, True)),
+    ("zoom badge", lambda f, s: f(s, pygame.Rect(0, 0, 110, 30), PANEL_HEADER, SECTION_BG, False)),
+]
+
+BUTTON_CASES = [
+    ("tool button", (250, 32), BTN_PRIMARY, "Circle", FONT_NORMAL),
+    ("draw button", (240, 45), BTN_SUCCESS, "DRAW SHAPE", FONT_LARGE),
+]
+
+
+def _time(fn, number):
+    """Return milliseconds per call"""
+    return timeit.timeit(fn, number=number) * 1000 / number
+
+
+def run(number=200):
+    """Time old and new paths and return a list of result rows"""
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((INPUT_PANEL_WIDTH + 200, 900))
+
+    results = []
+    for name, call in CASES:
+        old = _time(lambda: call(legacy_gradient_rect, screen), number)
+        new = _time(lambda: call(draw_gradient_rect, screen), number)
+        results.append((name, old, new))
+
+    for name, size, color, text, font_size in BUTTON_CASES:
+        rect = pygame.Rect((10, 10), size)
+        old = _time(lambda: legacy_button_3d(screen, rect, color, text, font_size), number)
+        new = _time(lambda: draw_button_3d(screen, rect, color, text, font_size), number)
+        results.append((name, old, new))
+
+    pygame.quit()
+    return results
+
+
+def main():
+    print(f"{'case':<18}{'old ms':>10}{'new ms':>10}{'speedup':>10}")
+    for name, old, new in run():
+        print(f"{name:<18}{old:>10.4f}{new:>10.4f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""Rendering benchmark suite with a regression gate
+
+Times grid, panel and shape drawing, display list replay, oversized
+shapes, shape creation and the coordinate helpers (scalar and the
+Viewport's array transforms) under SDL's dummy video driver, writes the
+results as JSON and compares them with a stored baseline.
+
+Run with:  python -m benchmarks.bench_suite [--filter grid] [--quick]
+           python -m benchmarks.bench_suite --update-baseline
+
+Exit status is 1 when any case is slower than its baseline by more than
+--threshold (default 25%). Baselines are machine specific: regenerate
+benchmarks/baseline.json on the machine that runs the gate.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import timeit
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from config import *
+import ui.panel as panel
+from drawing import draw_grid, invalidate_grid_cache, LabelPlacer, Viewport
+from shapes import Circle, Ellipse, Line, Scene, DisplayList
+from utils import coordinate_to_screen, screen_to_coordinate, visible_world_rect
+from utils.shapes_factory import create_shape_from_input
+
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+RESULTS_FILE = "bench_results.json"
+
+GRID_SIZES = [(800, 600), (1920, 1080)]
+GRID_ZOOMS = [0.5, 1.0, 4.0, 10.0]
+SHAPE_COUNTS = [1000, 10000, 100000]
+SHAPE_CANVAS = (1280, 720)
+OVERSIZE_RADII = [100, 1000, 10000]  # World units; x PIXELS_PER_UNIT * OVERSIZE_ZOOM on screen
+OVERSIZE_ZOOM = 10.0
+CALLS = 10000  # Calls per sample for the cheap per-shape helpers
+MIN_SAMPLE_S = 0.2  # Each sample repeats a case until it runs at least this long
+
+
+# =====================
+# Cases
+# =====================
+def _grid_cases(screen):
+    """draw_grid with the cached layer rebuilt every call, plus the cached blit"""
+    cases = []
+    for width, height in GRID_SIZES:
+        for zoom_level in GRID_ZOOMS:
+            def rebuild(width=width, height=height, zoom_level=zoom_level):
+                invalidate_grid_cache()
+                draw_grid(screen, width, width // 2, height // 2, height, zoom_level)
+            cases.append((f"grid {width}x{height} zoom {zoom_level:g}", rebuild))
+
+    width, height = GRID_SIZES[-1]
+    cases.append((f"grid {width}x{height} cached",
+                  lambda: draw_grid(screen, width, width // 2, height // 2, height, 1.0)))
+    return cases
+
+
+def _panel_cases(screen):
+    """draw_input_panel per tool: steady state and after a layout rebuild"""
+    cases = []
+    canvas_width, height = screen.get_width() - INPUT_PANEL_WIDTH, screen.get_height()
+    for _, tool in panel.TOOLS:
+        fields, active = panel.init_input_fields(tool)
+
+        def draw(tool=tool, fields=fields, active=active):
+            panel.draw_input_panel(screen, canvas_width, height, tool, DEFAULT_COLOR,
+                                   fields, active, DEFAULT_ZOOM, (), 0)
+
+        def rebuild(draw=draw):
+            panel._content_tool = None  # Forces the retained content to re-render
+            draw()
+
+        cases.append((f"panel {tool}", draw))
+        cases.append((f"panel {tool} rebuild", rebuild))
+    return cases
+
+
+def _random_shapes(kind, count, seed=1):
+    """count shapes of one kind scattered over the benchmark canvas at zoom 1"""
+    rng = random.Random(seed)
+    half_w = SHAPE_CANVAS[0] / 2 / PIXELS_PER_UNIT
+    half_h = SHAPE_CANVAS[1] / 2 / PIXELS_PER_UNIT
+    colors = (RED, GREEN, BLUE, ORANGE)
+    shapes = []
+    for i in range(count):
+        x, y = rng.randint(-int(half_w), int(half_w)), rng.randint(-int(half_h), int(half_h))
+        color = colors[i % len(colors)]
+        if kind == "circle":
+            shapes.append(Circle(x, y, rng.randint(1, 20), color, (x, y)))
+        elif kind == "ellipse":
+            shapes.append(Ellipse(x, y, rng.randint(1, 20), rng.randint(1, 20), color, (x, y)))
+        else:
+            x2, y2 = x + rng.randint(-30, 30), y + rng.randint(-30, 30)
+            shapes.append(Line(x, y, x2, y2, color, (x, y, x2, y2)))
+    return shapes
+
+
+def _shape_cases(screen, counts):
+    """Full redraw (geometry and labels) of a scene holding one shape kind"""
+    cases = []
+    width, height = SHAPE_CANVAS
+    for kind in ("circle", "ellipse", "line"):
+        for count in counts:
+            def draw(scene=Scene(_random_shapes(kind, count))):
+                labels = LabelPlacer()
+                scene.draw_batch(screen, width, height, width // 2, height // 2, 1.0,
+                                 CULL_MARGIN_PX, labels=labels)
+                labels.flush()
+            cases.append((f"draw {kind} x{count}", draw))
+    return cases
+
+
+def _display_list_cases(screen, counts):
+    """Replay (geometry and labels) of the same scenes compiled into a DisplayList"""
+    cases = []
+    width, height = SHAPE_CANVAS
+    for kind in ("circle", "ellipse", "line"):
+        for count in counts:
+            display_list = DisplayList()
+            display_list.update(screen, Scene(_random_shapes(kind, count)), width, height,
+                                width // 2, height // 2, 1.0)
+
+            def replay(display_list=display_list):
+                display_list.draw(screen)
+                display_list.draw_labels(screen)
+            cases.append((f"replay {kind} x{count}", replay))
+    return cases
+
+
+def _oversize_cases(screen):
+    """One shape far larger than the canvas crossing it at OVERSIZE_ZOOM: time should not grow with size"""
+    cases = []
+    width, height = SHAPE_CANVAS
+    for radius in OVERSIZE_RADII:
+        edge = radius - 5  # Shifted so the outline runs across the canvas
+        shapes = {
+            "circle": Circle(0, -edge, radius, RED, (0, -edge)),
+            "ellipse": Ellipse(-edge, 0, radius, radius // 2, GREEN, (-edge, 0)),
+            "line": Line(-radius, -edge, radius, edge, BLUE, (-radius, -edge, radius, edge)),
+        }
+        for kind, shape in shapes.items():
+            def draw(scene=Scene([shape])):
+                labels = LabelPlacer()
+                scene.draw_batch(screen, width, height, width // 2, height // 2, OVERSIZE_ZOOM,
+                                 CULL_MARGIN_PX, labels=labels)
+                labels.flush()
+            cases.append((f"oversized {kind} r{radius}", draw))
+    return cases
+
+
+def _factory_cases():
+    """create_shape_from_input for CALLS valid inputs per tool"""
+    inputs = {
+        "circle": {'cx': '12', 'cy': '-7', 'r': '25'},
+        "ellipse": {'cx': '12', 'cy': '-7', 'rx': '25', 'ry': '10'},
+        "line": {'x1': '-40', 'y1': '15', 'x2': '60', 'y2': '-20'},
+    }
+    cases = []
+    for tool, fields in inputs.items():
+        def create(tool=tool, fields=fields):
+            for _ in range(CALLS):
+                create_shape_from_input(tool, fields, DEFAULT_COLOR, 400, 300, 1.0)
+        cases.append((f"create_shape_from_input {tool} x{CALLS}", create))
+    return cases
+
+
+def _coordinate_cases():
+    """The coordinate helpers, CALLS calls per sample"""
+    rng = random.Random(2)
+    points = [(rng.uniform(-500, 500), rng.uniform(-500, 500)) for _ in range(CALLS)]
+
+    def to_screen():
+        for x, y in points:
+            coordinate_to_screen(x, y, 640, 360, 1.5)
+
+    def to_world():
+        for x, y in points:
+            screen_to_coordinate(x, y, 640, 360, 1.5)
+
+    def world_rect():
+        for _ in range(CALLS):
+            visible_world_rect(1280, 720, 640, 360, 1.5, CULL_MARGIN_PX)
+
+    viewport = Viewport(1280, 720, 1.5)
+    xs, ys = zip(*points)
+
+    def to_screen_array():
+        viewport.to_screen(xs, ys)
+
+    def to_world_array():
+        viewport.to_world(xs, ys)
+
+    return [(f"coordinate_to_screen x{CALLS}", to_screen),
+            (f"screen_to_coordinate x{CALLS}", to_world),
+            (f"visible_world_rect x{CALLS}", world_rect),
+            (f"Viewport.to_screen {CALLS} points", to_screen_array),
+            (f"Viewport.to_world {CALLS} points", to_world_array)]
+
+
+def build_cases(screen, quick=False):
+    """Every (name, callable) case in a stable order"""
+    counts = SHAPE_COUNTS[:-1] if quick else SHAPE_COUNTS
+    return (_grid_cases(screen) + _panel_cases(screen) + _shape_cases(screen, counts)
+            + _display_list_cases(screen, counts) + _oversize_cases(screen) + _factory_cases()
+            + _coordinate_cases())
+
+
+# =====================
+# Timing
+# =====================
+def time_case(fn, repeat):
+    """Milliseconds per call: (best, median) over repeat samples"""
+    fn()  # Warm caches and lazy imports
+    start = time.perf_counter()
+    fn()
+    once = time.perf_counter() - start
+    number = max(1, int(MIN_SAMPLE_S / once)) if once > 0 else 1000
+    samples = [t * 1000 / number for t in timeit.repeat(fn, number=number, repeat=repeat)]
+    return min(samples), statistics.median(samples), number
+
+
+def run(name_filter=None, quick=False, repeat=5):
+    """Run the suite; returns the results document"""
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((GRID_SIZES[-1][0] + INPUT_PANEL_WIDTH, GRID_SIZES[-1][1]))
+
+    cases = {}
+    for name, fn in build_cases(screen, quick):
+        if name_filter and name_filter not in name:
+            continue
+        best, median, number = time_case(fn, repeat)
+        cases[name] = {'ms': best, 'median_ms': median, 'number': number, 'repeat': repeat}
+        print(f"{name:<44}{best:>12.4f}{median:>12.4f}")
+
+    pygame.quit()
+    return {
+        'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'video_driver': os.environ.get("SDL_VIDEODRIVER"),
+        'cases': cases,
+    }
+
+
+# =====================
+# Regression gate
+# =====================
+def compare(results, baseline, threshold):
+    """[(name, baseline ms, ms, ratio)] for cases slower than baseline * (1 + threshold)"""
+    regressions = []
+    for name, case in results['cases'].items():
+        base = baseline['cases'].get(name)
+        if base is None or base['ms'] <= 0:
+            continue
+        ratio = case['ms'] / base['ms']
+        if ratio > 1 + threshold:
+            regressions.append((name, base['ms'], case['ms'], ratio))
+    return regressions
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Headless rendering benchmarks.")
+    parser.add_argument("--out", default=RESULTS_FILE,
+                        help=f"results file (default: {RESULTS_FILE})")
+    parser.add_argument("--baseline", default=BASELINE_FILE,
+                        help="baseline results to compare with (default: benchmarks/baseline.json)")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown per case as a fraction (default: 0.25)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store this run as the new baseline instead of comparing")
+    parser.add_argument("--filter", default=None, help="only run cases whose name contains this")
+    parser.add_argument("--quick", action="store_true", help="skip the 100k-shape cases")
+    parser.add_argument("--repeat", type=int, default=5, help="samples per case (default: 5)")
+    args = parser.parse_args(argv)
+    if args.threshold < 0 or args.repeat < 1:
+        parser.error("threshold must be >= 0 and repeat >= 1")
+    return args
+
+
+def main(argv=None):
+    """Run, save and gate; returns the process exit code"""
+    args = parse_args(argv)
+    print(f"{'case':<44}{'best ms':>12}{'median ms':>12}")
+    results = run(args.filter, args.quick, args.repeat)
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    if args.update_baseline:
+        if args.filter and os.path.exists(args.baseline):
+            # A filtered run only replaces the cases it measured
+            with open(args.baseline, encoding="utf-8") as f:
+                cases = json.load(f)['cases']
+            results = dict(results, cases=dict(cases, **results['cases']))
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, before, after, ratio in regressions:
+        print(f"REGRESSION {name}: {before:.4f} ms -> {after:.4f} ms ({ratio:.2f}x)")
+    print(f"{len(results['cases'])} cases, {len(regressions)} regressions "
+          f"(threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""Scaling benchmark: full-canvas tile rasterization in-process vs on a TilePool
+
+Run with:  python -m benchmarks.bench_tile_pool [count] [--workers 1,2,4,8]
+
+Rasterizes every tile of a 1920x1080 canvas (the cache is emptied before
+each run) for a dense scene of mixed shapes and prints the time and the
+speedup over in-process rendering for each worker count.
+"""
+
+import argparse
+import os
+import random
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from config import RED, GREEN, BLUE, ORANGE
+from drawing import TileCache, TilePool
+from shapes import Circle, Ellipse, Line, ColumnarScene
+
+
+CANVAS = (1920, 1080)
+ZOOM = 1.0
+
+
+def _dense_scene(count, seed=1):
+    """count shapes packed onto the benchmark canvas"""
+    rng = random.Random(seed)
+    half_w, half_h = CANVAS[0] // 10, CANVAS[1] // 10
+    colors = (RED, GREEN, BLUE, ORANGE)
+    shapes = []
+    for i in range(count):
+        x, y = rng.randint(-half_w, half_w), rng.randint(-half_h, half_h)
+        color = colors[i % len(colors)]
+        kind = i % 3
+        if kind == 0:
+            shapes.append(Circle(x, y, rng.randint(1, 25), color, (x, y)))
+        elif kind == 1:
+            shapes.append(Ellipse(x, y, rng.randint(1, 25), rng.randint(1, 15), color, (x, y)))
+        else:
+            x2, y2 = x + rng.randint(-40, 40), y + rng.randint(-40, 40)
+            shapes.append(Line(x, y, x2, y2, color, (x, y, x2, y2)))
+    return ColumnarScene(shapes)
+
+
+def time_full_redraw(tiles, shapes, screen, repeat=3):
+    """Best milliseconds to rasterize and blit every tile of the canvas"""
+    best = float('inf')
+    for _ in range(repeat):
+        tiles.clear()
+        start = time.perf_counter()
+        tiles.draw(screen, shapes, CANVAS[0], CANVAS[1], CANVAS[0] // 2, CANVAS[1] // 2, ZOOM)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TilePool scaling benchmark.")
+    parser.add_argument("count", type=int, nargs="?", default=100000, help="shapes (default: 100000)")
+    parser.add_argument("--workers", default=None,
+                        help="comma-separated worker counts (default: 1, 2, 4, ... up to the core count)")
+    args = parser.parse_args(argv)
+    if args.workers:
+        counts = [int(n) for n in args.workers.split(",")]
+    else:
+        counts, n = [], 1
+        while n <= (os.cpu_count() or 1):
+            counts.append(n)
+            n *= 2
+
+    pygame.display.init()
+    screen = pygame.display.set_mode(CANVAS)
+    shapes = _dense_scene(args.count)
+
+    baseline = time_full_redraw(TileCache(), shapes, screen)
+    print(f"{'workers':<10}{'ms':>12}{'speedup':>10}")
+    print(f"{'in-process':<10}{baseline:>12.1f}{1.0:>10.2f}")
+    for workers in counts:
+        pool = TilePool(workers)
+        try:
+            ms = time_full_redraw(TileCache(pool=pool), shapes, screen)
+        finally:
+            pool.close()
+        print(f"{workers:<10}{ms:>12.1f}{baseline / ms:>10.2f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -47,15 +47,28 @@ HIGHLIGHT = (255, 215, 0)
 INPUT_PANEL_WIDTH = 320  # Panel width
 CANVAS_BG_COLOR = (248, 249, 250)
 
+# Presentation: push only damaged rectangles instead of flipping the whole window
+DIRTY_RECTS = True
+DAMAGE_MAX_RECTS = 128  # More changed rects than this in one frame -> full flip
+
+# Frame profiler (F3 toggles timing and the overlay, F4 writes the traces)
+PROFILER_ENABLED = False  # Start with timing on (also --profile)
+PROFILER_WINDOW = 600  # Frames behind the rolling p50/p95/p99
+PROFILER_TRACE_FRAMES = 18000  # Frames kept for export (~5 min at 60 FPS)
+PROFILER_OVERLAY_REFRESH_MS = 250  # Overlay text is re-rendered at most this often
+PROFILE_TRACE_FILE = "frame_trace.json"  # Summary + per-frame stage times
+PROFILE_CHROME_FILE = "frame_trace.chrome.json"  # Same frames as Chrome trace events
+
 # Drawing Settings
 DEFAULT_TOOL = "circle"  # "circle", "ellipse", "line"
 DEFAULT_COLOR = RED
 
-# Zoom settings
+# Zoom and pan settings (see drawing/viewport.py)
 DEFAULT_ZOOM = 1.0
-MIN_ZOOM = 0.5
-MAX_ZOOM = 10.0
-ZOOM_STEP = 0.1
+MIN_ZOOM = 0.001
+MAX_ZOOM = 10000.0
+ZOOM_FACTOR = 1.25  # Each zoom step (wheel notch, +/- key or button) multiplies or divides the zoom by this
+PAN_DRAG_THRESHOLD_PX = 4  # A left press that moves further than this pans instead of selecting
 
 # Font sizes
 FONT_LARGE = 40    # title_font
@@ -64,14 +77,73 @@ FONT_NORMAL = 24   # font
 FONT_SMALL = 20    # small_font
 FONT_TINY = 18     # tiny_font
 
+# Render caches
+TEXT_CACHE_SIZE = 2048  # Max rendered text surfaces kept in memory
+SURFACE_CACHE_SIZE = 256  # Max precomputed gradient/button surfaces
+SHAPE_TILES = True  # Rasterize shape geometry into cached tiles per zoom level
+TILE_SIZE_PX = 256  # Edge of a square shape tile in pixels
+TILE_CACHE_SIZE = 128  # Max cached tiles across all zoom levels (~256 KB each)
+TILE_MARGIN_PX = 8  # Covers stroke width and endpoint dots past a shape's bounds
+TILE_WORKERS = 0  # Processes rasterizing tiles in parallel (0 = in the main process)
+ZOOM_PREVIEW = True  # Show a scaled canvas while a zoom change rasterizes in the background (needs SHAPE_TILES)
+DISPLAY_LIST = True  # Replay labels (and untiled geometry) from batched commands compiled on edits and zoom
+DISPLAY_LIST_CELL_PX = 32  # Overlap-test cell: shapes sharing a cell keep their draw order
+DISPLAY_LIST_APPEND_MAX = 256  # Appending more shapes than this at once recompiles the whole list
+
+# Shape rasterizer: "pygame" (one pygame.draw call per outline and dot) or
+# "numpy" (whole batches stamped into the surface pixels, see shapes/raster.py)
+RENDER_BACKEND = "pygame"
+RASTER_STENCIL_MAX_PX = 256  # Outlines with a larger screen radius are drawn with pygame.draw
+RASTER_LINE_MAX_PX = 2048  # So are lines longer than this on screen
+RASTER_LINE_STENCIL_PX = 32  # Lines up to this long are stamped from cached stencils, longer ones stepped
+RASTER_STENCIL_CACHE = 16384  # Max cached stencils (one per outline size, dot or line vector)
+RASTER_CHUNK_PIXELS = 1 << 16  # Pixels expanded per vectorized step (small enough to stay in cache)
+
+# Outlines with a larger screen radius (and longer lines) are clipped to the
+# surface's clip rect before drawing, so their cost follows the visible part
+CLIP_OVERSIZE_PX = 2048
+
 # Drawing constants
 PIXELS_PER_UNIT = 5  # 5 pixels = 1 coordinate unit
 LINE_WIDTH = 2
 POINT_RADIUS = 3
 POINT_SIZE = 4
 
-# Grid size
-X_MIN = -1000
-X_MAX =  1000
-Y_MIN = -1000
-Y_MAX =  1000
\ No newline at end of file
+# Spatial index / viewport culling
+SPATIAL_CELL_SIZE = 50    # World units per index cell
+SPATIAL_MAX_CELLS = 64    # Shapes spanning more cells are kept in a separate list
+PICK_INDEX_TAIL = 4096    # Shapes appended before the columnar pick index is rebuilt
+
+# Canvas picking (hover and click select the topmost shape under the cursor)
+PICK_TOLERANCE_PX = 6     # Max screen distance from the cursor to a shape's outline
+PICK_HIGHLIGHT_PAD_PX = 4  # Gap between a picked shape and its highlight box
+PICK_HOVER_COLOR = ACCENT_BLUE
+PICK_SELECT_COLOR = HIGHLIGHT
+CULL_MARGIN_PX = 100      # Extra screen margin so labels and dots are not culled
+
+# Level of detail / label decimation
+LOD_POINT_SIZE_PX = 3     # Shapes smaller than this on screen collapse to a single point
+LABEL_MIN_SIZE_PX = 8     # Coordinate labels only for shapes at least this large on screen
+LABEL_CELL_SIZE_PX = 64   # Bucket size for label collision checks
+
+# Shape storage: "objects" (one Python object per shape) or
+# "columnar" (NumPy structure-of-arrays for very large scenes)
+SCENE_STORE = "objects"
+
+# Scene files: ".json" is the readable format, SCENE_FILE_EXT the binary one
+SCENE_FILE_EXT = ".pds"
+DEFAULT_SCENE_FILE = "scene.pds"  # Saved with Ctrl+S when no file was opened
+MAPPED_CHUNK_SHAPES = 4096  # Records per chunk in binary scene files
+MAPPED_CHUNK_CACHE = 256  # Max chunks kept materialized per open file
+IMPORT_FILE_EXTS = (".csv", ".tsv", ".tab")  # Bulk shape imports (header row required)
+IMPORT_CHUNK_ROWS = 65536  # CSV/TSV rows parsed per vectorized step
+
+# Undo history (Ctrl+Z / Ctrl+Y)
+HISTORY_MAX_BYTES = 256 * 1024 * 1024  # Oldest edits are forgotten past this much held memory
+OBJECT_SHAPE_BYTES = 704  # One shape object plus its index entry (benchmarks/bench_memory.py)
+EDIT_LOG_MAX = 4096  # Single-shape edits a scene logs for its caches before they rebuild instead
+
+# Axis ticks (steps follow a 1-2-5 sequence so spacing stays constant on screen)
+TICK_MINOR_MIN_PX = 5     # Minimum on-screen distance between minor ticks
+TICKS_PER_MEDIUM = 5      # Minor ticks per medium tick
+TICKS_PER_MAJOR = 10      # Minor ticks per major (labelled) tick / grid line
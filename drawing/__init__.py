@@ -1,6 +1,18 @@
 """Drawing and Rendering module"""
 
-from .grid import draw_grid
+from .grid import draw_grid, invalidate_grid_cache
+from .damage import DamageTracker
+from .labels import LabelPlacer
+from .tiles import TileCache
+from .tile_pool import TilePool
+from .preview import ZoomPreview
+from .overlay import draw_profiler_overlay
+from .selection import shape_screen_rect, draw_highlight
+from .viewport import Viewport
+from .fonts import get_font, render_text, text_cache_stats
 from .renderer import draw_gradient_rect, draw_rounded_rect, draw_button_3d
 
-__all__ = ['draw_grid', 'draw_gradient_rect', 'draw_rounded_rect', 'draw_button_3d']
+__all__ = ['draw_grid', 'invalidate_grid_cache', 'DamageTracker', 'LabelPlacer', 'TileCache', 'TilePool', 'ZoomPreview',
+           'draw_profiler_overlay', 'shape_screen_rect', 'draw_highlight', 'Viewport',
+           'get_font', 'render_text', 'text_cache_stats',
+           'draw_gradient_rect', 'draw_rounded_rect', 'draw_button_3d']
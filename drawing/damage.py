@@ -0,0 +1,32 @@
+"""Damage tracking for dirty-rectangle presentation"""
+
+import pygame
+from config import DAMAGE_MAX_RECTS
+
+
+class DamageTracker:
+    """Collects the screen rectangles changed during a frame"""
+    def __init__(self):
+        self.rects = []
+        self.full = True  # First frame always pushes the whole window
+
+    def add(self, rect):
+        """Report a changed rectangle (None and empty rects are ignored)"""
+        if rect is not None and rect.width > 0 and rect.height > 0:
+            self.rects.append(pygame.Rect(rect))
+
+    def invalidate_all(self):
+        """Request a full-window flip for this frame (resize, zoom, ...)"""
+        self.full = True
+
+    def present(self):
+        """Push the damaged regions to the display and reset for the next frame"""
+        if self.full or len(self.rects) > DAMAGE_MAX_RECTS:
+            # Many small rects (e.g. a bulk import) cost more than one flip
+            pygame.display.flip()
+        elif self.rects:
+            pygame.display.update(self.rects)
+        presented = self.full or bool(self.rects)
+        self.rects = []
+        self.full = False
+        return presented
@@ -0,0 +1,62 @@
+"""Shared font registry and rendered-text cache"""
+
+from collections import OrderedDict
+
+import pygame
+from config import TEXT_CACHE_SIZE
+
+
+# Global font and text caches (shared by every module in the process)
+_fonts = {}
+_text_cache = OrderedDict()
+_text_cache_hits = 0
+_text_cache_misses = 0
+
+
+def get_font(size):
+    """Return the shared default font for the given point size"""
+    font = _fonts.get(size)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.Font(None, size)
+        _fonts[size] = font
+    return font
+
+
+def render_text(text, size, color, antialias=True):
+    """Return a cached rendered text Surface (treat it as read-only)"""
+    global _text_cache_hits, _text_cache_misses
+
+    key = (text, size, tuple(color), antialias)
+    surface = _text_cache.get(key)
+    if surface is not None:
+        _text_cache_hits += 1
+        _text_cache.move_to_end(key)
+        return surface
+
+    _text_cache_misses += 1
+    surface = get_font(size).render(text, antialias, color)
+    _text_cache[key] = surface
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)  # Evict least recently used
+    return surface
+
+
+def text_cache_stats():
+    """Return hit/miss counters and the current size of the text cache"""
+    return {
+        'hits': _text_cache_hits,
+        'misses': _text_cache_misses,
+        'size': len(_text_cache),
+        'capacity': TEXT_CACHE_SIZE,
+        'fonts': len(_fonts),
+    }
+
+
+def clear_text_cache():
+    """Empty the text cache and reset its counters"""
+    global _text_cache_hits, _text_cache_misses
+    _text_cache.clear()
+    _text_cache_hits = 0
+    _text_cache_misses = 0
@@ -1,120 +1,209 @@
 """Grid and Axes Drawing"""
 
+from math import ceil, floor, log10
+
 import pygame
 from config import *
+from .fonts import render_text
+
+
+def nice_step(min_step):
+    """Smallest 1-2-5 x 10^k step >= min_step; returns (step, k)"""
+    exponent = floor(log10(min_step))
+    for mantissa in (1, 2, 5, 10):
+        if mantissa * 10.0 ** exponent >= min_step:
+            break
+    if mantissa == 10:
+        mantissa, exponent = 1, exponent + 1
+    # Build the step from integers so 0.1, 0.2, ... stay as exact as possible
+    step = mantissa * 10 ** exponent if exponent >= 0 else mantissa / 10 ** -exponent
+    return step, exponent
+
+
+def tick_indices(lo, hi, step):
+    """Integer k for every tick k * step inside [lo, hi] - O(visible ticks)"""
+    return range(ceil(lo / step), floor(hi / step) + 1)
+
+
+def _format_tick(value, decimals):
+    """Tick label text without a trailing '.0' or a '-0'"""
+    text = f"{value:.{decimals}f}"
+    return "0" if text.strip("-0.") == "" else text
+
+
+def _format_zoom(zoom_level):
+    """Zoom badge text: one decimal, or two significant digits below 0.1x"""
+    return f"{zoom_level:.1f}" if zoom_level >= 0.1 else f"{zoom_level:.2g}"
+
 
+# Cached static grid layer (rebuilt only when the view changes)
+_grid_cache_key = None
+_grid_cache_surface = None
 
-def draw_grid(screen, canvas_width, center_x, center_y, height, zoom_level):
+
+def invalidate_grid_cache():
+    """Drop the cached grid layer so the next frame rebuilds it"""
+    global _grid_cache_key, _grid_cache_surface
+    _grid_cache_key = None
+    _grid_cache_surface = None
+
+
+def draw_grid(screen, canvas_width, center_x, center_y, height, zoom_level, damage=None):
+    """Draw Professional Grid and Axes from the cached background layer"""
+    global _grid_cache_key, _grid_cache_surface
+
+    key = (canvas_width, height, center_x, center_y, zoom_level)
+    if key != _grid_cache_key or _grid_cache_surface is None:
+        _grid_cache_surface = render_grid_layer(
+            screen, canvas_width, center_x, center_y, height, zoom_level
+        )
+        _grid_cache_key = key
+        if damage is not None:
+            damage.add(_grid_cache_surface.get_rect())
+
+    screen.blit(_grid_cache_surface, (0, 0))
+
+
+def render_grid_layer(screen, canvas_width, center_x, center_y, height, zoom_level):
+    """Render grid, axes, labels and zoom badge into an off-screen Surface"""
+    layer = pygame.Surface((max(canvas_width, 1), max(height, 1)), 0, screen)
+    layer.fill(CANVAS_BG)
+    _draw_grid_static(layer, canvas_width, center_x, center_y, height, zoom_level)
+    return layer
+
+
+def _draw_grid_static(screen, canvas_width, center_x, center_y, height, zoom_level):
     """Draw Professional Grid and Axes"""
-    tiny_font = pygame.font.Font(None, FONT_TINY)
-    quad_font = pygame.font.Font(None, FONT_SMALL)
-    
-    # Calculate grid spacing based on zoom
-    grid_spacing = int(50 * zoom_level)
+    scale = PIXELS_PER_UNIT * zoom_level
+    minor_step, exponent = nice_step(TICK_MINOR_MIN_PX / scale)
+    major_step = minor_step * TICKS_PER_MAJOR
+    decimals = max(0, -(exponent + 1))  # Digits needed by major tick labels
     
-    # Draw subtle grid lines (only on canvas area)
-    for x in range(0, canvas_width, grid_spacing):
-        if x == center_x:
+    # Draw subtle grid lines at major ticks (only on canvas area)
+    for k in tick_indices(-center_x / scale, (canvas_width - center_x) / scale, major_step):
+        if k == 0:
             continue  # Skip axis line
+        x = center_x + int(k * major_step * scale)
         pygame.draw.line(screen, GRID_COLOR, (x, 0), (x, height), 1)
-    for y in range(0, height, grid_spacing):
-        if y == center_y:
+    for k in tick_indices((center_y - height) / scale, center_y / scale, major_step):
+        if k == 0:
             continue  # Skip axis line
+        y = center_y - int(k * major_step * scale)
         pygame.draw.line(screen, GRID_COLOR, (0, y), (canvas_width, y), 1)
     
-    # Draw main axes with professional styling
-    pygame.draw.line(screen, AXIS_COLOR, (center_x, 0), (center_x, height), 3)
-    pygame.draw.line(screen, AXIS_COLOR, (0, center_y), (canvas_width, center_y), 3)
-    
-    # Draw axis arrows
-    arrow_size = 10
-    # Y-axis arrow (up)
-    pygame.draw.polygon(screen, AXIS_COLOR, [
-        (center_x, 5),
-        (center_x - arrow_size//2, 5 + arrow_size),
-        (center_x + arrow_size//2, 5 + arrow_size)
-    ])
-    # X-axis arrow (right)
-    pygame.draw.polygon(screen, AXIS_COLOR, [
-        (canvas_width - 5, center_y),
-        (canvas_width - 5 - arrow_size, center_y - arrow_size//2),
-        (canvas_width - 5 - arrow_size, center_y + arrow_size//2)
-    ])
-    
-    # Y-axis arrow (down)
-    pygame.draw.polygon(screen, AXIS_COLOR, [
-        (center_x, height - 5),                         # tip (down)
-        (center_x - arrow_size // 2, height - 5 - arrow_size),
-        (center_x + arrow_size // 2, height - 5 - arrow_size)
-    ])
-    # X-axis arrow (right)
-    pygame.draw.polygon(screen, AXIS_COLOR, [
-        (5, center_y),                                  # tip (left)
-        (5 + arrow_size, center_y - arrow_size // 2),
-        (5 + arrow_size, center_y + arrow_size // 2)
-    ])
+    # Panned off the canvas, an axis is not drawn but its ticks and numbers stay pinned to the edge
+    y_axis_shown = 0 <= center_x < canvas_width
+    x_axis_shown = 0 <= center_y < height
+    axis_x = min(max(center_x, 0), canvas_width - 40)
+    axis_y = min(max(center_y, 0), height - 30)
+    if y_axis_shown:
+        _draw_y_axis(screen, center_x, height)
+    if x_axis_shown:
+        _draw_x_axis(screen, canvas_width, center_y)
 
     # Draw axis numbers with professional styling
-    # X-axis numbers (horizontal) - Every 1 unit (but show every 5 units for clarity)
-    for i in range(X_MIN, X_MAX + 1):
-        x_pos = center_x + int(i * PIXELS_PER_UNIT * zoom_level)
+    # Only ticks inside the visible world interval are generated
+    x_lo = (20 - center_x) / scale
+    x_hi = (canvas_width - 20 - center_x) / scale
+    for k in tick_indices(x_lo, x_hi, minor_step):
+        x_pos = center_x + int(k * minor_step * scale)
         # Prevents drawing ticks Too close to edges
         if 20 < x_pos < canvas_width - 20:
-            if i % 10 == 0 and i != 0:
-                # Major tick marks every 10 units
-                pygame.draw.line(screen, AXIS_COLOR, (x_pos, center_y - 6), (x_pos, center_y + 6), 2)
-                num_text = tiny_font.render(str(i), True, DARK_GRAY)
-                text_rect = num_text.get_rect(center=(x_pos, center_y + 18))
+            if k % TICKS_PER_MAJOR == 0 and k != 0:
+                # Major tick marks
+                pygame.draw.line(screen, AXIS_COLOR, (x_pos, axis_y - 6), (x_pos, axis_y + 6), 2)
+                num_text = render_text(_format_tick(k * minor_step, decimals), FONT_TINY, DARK_GRAY)
+                text_rect = num_text.get_rect(center=(x_pos, axis_y + 18))
                 pygame.draw.rect(screen, CANVAS_BG, text_rect.inflate(4, 2))
                 screen.blit(num_text, text_rect)
-            elif i % 5 == 0:
-                # Medium tick marks every 5 units
-                pygame.draw.line(screen, AXIS_COLOR, (x_pos, center_y - 4), (x_pos, center_y + 4), 1)
+            elif k % TICKS_PER_MEDIUM == 0:
+                # Medium tick marks
+                pygame.draw.line(screen, AXIS_COLOR, (x_pos, axis_y - 4), (x_pos, axis_y + 4), 1)
             else:
-                # Minor tick marks every 1 unit
-                pygame.draw.line(screen, GRID_COLOR, (x_pos, center_y - 2), (x_pos, center_y + 2), 1)
+                # Minor tick marks
+                pygame.draw.line(screen, GRID_COLOR, (x_pos, axis_y - 2), (x_pos, axis_y + 2), 1)
     
-    # Y-axis numbers (vertical) - Every 1 unit (but show every 5 units for clarity)
-    for i in range(Y_MIN, Y_MAX + 1):
-        y_pos = center_y - int(i * PIXELS_PER_UNIT * zoom_level)
+    # Y-axis numbers (vertical)
+    y_lo = (center_y - height + 20) / scale
+    y_hi = (center_y - 20) / scale
+    for k in tick_indices(y_lo, y_hi, minor_step):
+        y_pos = center_y - int(k * minor_step * scale)
         if 20 < y_pos < height - 20:
-            if i % 10 == 0 and i != 0:
-                # Major tick marks every 10 units
-                pygame.draw.line(screen, AXIS_COLOR, (center_x - 6, y_pos), (center_x + 6, y_pos), 2)
-                num_text = tiny_font.render(str(i), True, DARK_GRAY)
-                text_rect = num_text.get_rect(center=(center_x + 20, y_pos))
+            if k % TICKS_PER_MAJOR == 0 and k != 0:
+                # Major tick marks
+                pygame.draw.line(screen, AXIS_COLOR, (axis_x - 6, y_pos), (axis_x + 6, y_pos), 2)
+                num_text = render_text(_format_tick(k * minor_step, decimals), FONT_TINY, DARK_GRAY)
+                text_rect = num_text.get_rect(center=(axis_x + 20, y_pos))
                 pygame.draw.rect(screen, CANVAS_BG, text_rect.inflate(4, 2))
                 screen.blit(num_text, text_rect)
-            elif i % 5 == 0:
-                # Medium tick marks every 5 units
-                pygame.draw.line(screen, AXIS_COLOR, (center_x - 4, y_pos), (center_x + 4, y_pos), 1)
+            elif k % TICKS_PER_MEDIUM == 0:
+                # Medium tick marks
+                pygame.draw.line(screen, AXIS_COLOR, (axis_x - 4, y_pos), (axis_x + 4, y_pos), 1)
             else:
-                # Minor tick marks every 1 unit
-                pygame.draw.line(screen, GRID_COLOR, (center_x - 2, y_pos), (center_x + 2, y_pos), 1)
+                # Minor tick marks
+                pygame.draw.line(screen, GRID_COLOR, (axis_x - 2, y_pos), (axis_x + 2, y_pos), 1)
     
     # Draw origin label with background
-    origin_text = tiny_font.render("0", True, AXIS_COLOR)
-    origin_rect = origin_text.get_rect(center=(center_x - 15, center_y + 15))
-    pygame.draw.rect(screen, CANVAS_BG, origin_rect.inflate(4, 2))
-    screen.blit(origin_text, origin_rect)
+    if x_axis_shown and y_axis_shown:
+        origin_text = render_text("0", FONT_TINY, AXIS_COLOR)
+        origin_rect = origin_text.get_rect(center=(center_x - 15, center_y + 15))
+        pygame.draw.rect(screen, CANVAS_BG, origin_rect.inflate(4, 2))
+        screen.blit(origin_text, origin_rect)
     
     # Draw zoom level indicator with modern styling
     from .renderer import draw_gradient_rect
     
-    small_font = pygame.font.Font(None, FONT_SMALL)
     zoom_rect = pygame.Rect(canvas_width - 120, 10, 110, 30)
     draw_gradient_rect(screen, zoom_rect, PANEL_HEADER, SECTION_BG, vertical=False)
     pygame.draw.rect(screen, ACCENT_BLUE, zoom_rect, 2, border_radius=6)
-    zoom_text = small_font.render(f" {zoom_level:.1f}x", True, WHITE)
+    zoom_text = render_text(f" {_format_zoom(zoom_level)}x", FONT_SMALL, WHITE)
     screen.blit(zoom_text, (canvas_width - 110, 18))
     
-    # Draw quadrant labels
-    q1_text = quad_font.render("Q1 (+,+)", True, DARK_GRAY)
-    q2_text = quad_font.render("Q2 (-,+)", True, DARK_GRAY)
-    q3_text = quad_font.render("Q3 (-,-)", True, DARK_GRAY)
-    q4_text = quad_font.render("Q4 (+,-)", True, DARK_GRAY)
+    # Draw quadrant labels (around the origin, so only while it is on the canvas)
+    if not (x_axis_shown and y_axis_shown):
+        return
+    q1_text = render_text("Q1 (+,+)", FONT_SMALL, DARK_GRAY)
+    q2_text = render_text("Q2 (-,+)", FONT_SMALL, DARK_GRAY)
+    q3_text = render_text("Q3 (-,-)", FONT_SMALL, DARK_GRAY)
+    q4_text = render_text("Q4 (+,-)", FONT_SMALL, DARK_GRAY)
     
     screen.blit(q1_text, (center_x + 10, 10))
     screen.blit(q2_text, (10, 10))
     screen.blit(q3_text, (10, height - 30))
     screen.blit(q4_text, (center_x + 10, height - 30))
+
+
+def _draw_y_axis(screen, center_x, height):
+    """Vertical axis line with its arrows at both ends"""
+    arrow_size = 10
+    pygame.draw.line(screen, AXIS_COLOR, (center_x, 0), (center_x, height), 3)
+    # Y-axis arrow (up)
+    pygame.draw.polygon(screen, AXIS_COLOR, [
+        (center_x, 5),
+        (center_x - arrow_size//2, 5 + arrow_size),
+        (center_x + arrow_size//2, 5 + arrow_size)
+    ])
+    # Y-axis arrow (down)
+    pygame.draw.polygon(screen, AXIS_COLOR, [
+        (center_x, height - 5),                         # tip (down)
+        (center_x - arrow_size // 2, height - 5 - arrow_size),
+        (center_x + arrow_size // 2, height - 5 - arrow_size)
+    ])
+
+
+def _draw_x_axis(screen, canvas_width, center_y):
+    """Horizontal axis line with its arrows at both ends"""
+    arrow_size = 10
+    pygame.draw.line(screen, AXIS_COLOR, (0, center_y), (canvas_width, center_y), 3)
+    # X-axis arrow (right)
+    pygame.draw.polygon(screen, AXIS_COLOR, [
+        (canvas_width - 5, center_y),
+        (canvas_width - 5 - arrow_size, center_y - arrow_size//2),
+        (canvas_width - 5 - arrow_size, center_y + arrow_size//2)
+    ])
+    # X-axis arrow (left)
+    pygame.draw.polygon(screen, AXIS_COLOR, [
+        (5, center_y),                                  # tip (left)
+        (5 + arrow_size, center_y - arrow_size // 2),
+        (5 + arrow_size, center_y + arrow_size // 2)
+    ])
@@ -0,0 +1,72 @@
+"""Screen-space label placement and point decimation"""
+
+from config import LABEL_CELL_SIZE_PX, POINT_RADIUS
+
+
+class LabelPlacer:
+    """Greedy per-frame placement: a label is dropped if it overlaps one already placed
+
+    Placed rects are bucketed into LABEL_CELL_SIZE_PX cells so each test only
+    looks at nearby labels. Accepted labels are queued and drawn by flush()
+    after all shape geometry, so outlines never cover them. The same object
+    also de-duplicates LOD points: a collapsed shape is skipped when its
+    point is already covered.
+
+    geometry=False makes shapes emit only their labels (the label pass over
+    cached tiles); labels=False makes them emit only geometry (tile rendering).
+    """
+    def __init__(self, geometry=True, labels=True):
+        self.geometry = geometry
+        self.labels = labels
+        self.cells = {}
+        self.points = set()
+        self.pending = []
+        self.offered = None  # Last rect offered to place(), placed or not
+
+    def _cells_for(self, rect):
+        size = LABEL_CELL_SIZE_PX
+        for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield (cx, cy)
+
+    def place(self, rect):
+        """Reserve rect for a label; False if it collides with a placed label"""
+        self.offered = rect
+        if not self.labels:
+            return False
+        cells = list(self._cells_for(rect))
+        for cell in cells:
+            for placed in self.cells.get(cell, ()):
+                if rect.colliderect(placed):
+                    return False
+        for cell in cells:
+            self.cells.setdefault(cell, []).append(rect)
+        return True
+
+    def reserve(self, rect):
+        """Mark rect as taken by a label without testing it (the display list's own placement)"""
+        for cell in self._cells_for(rect):
+            self.cells.setdefault(cell, []).append(rect)
+
+    def release(self, rect):
+        """Give back the space of a label placed or reserved earlier"""
+        for cell in self._cells_for(rect):
+            self.cells[cell].remove(rect)
+
+    def defer(self, draw, *args):
+        """Queue a label draw call for the label pass"""
+        self.pending.append((draw, args))
+
+    def flush(self):
+        """Draw every queued label (the label pass)"""
+        for draw, args in self.pending:
+            draw(*args)
+        self.pending = []
+
+    def claim_point(self, x, y):
+        """Reserve a LOD point; False if a point already covers that spot"""
+        key = (x // POINT_RADIUS, y // POINT_RADIUS)
+        if key in self.points:
+            return False
+        self.points.add(key)
+        return True
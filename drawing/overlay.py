@@ -0,0 +1,65 @@
+"""On-canvas frame profiler overlay"""
+
+import pygame
+from config import *
+from .fonts import get_font
+
+
+# Overlay surface, rebuilt at most every PROFILER_OVERLAY_REFRESH_MS
+_overlay = None
+_overlay_time = None
+_overlay_rect = None  # Where the overlay was last drawn (damaged when it goes away)
+
+
+def _render_overlay(profiler):
+    """Render the per-stage p50/p95/p99 table onto a translucent Surface"""
+    font = get_font(FONT_TINY)
+    rows = [("stage", "p50", "p95", "p99")]
+    for stage, values in profiler.summary().items():
+        rows.append((stage,) + tuple(f"{v:.2f}" for v in values))
+    if len(rows) == 1:
+        rows.append(("waiting for frames", "", "", ""))
+
+    # Plain font.render: these strings change constantly and would churn the text cache
+    cells = [[font.render(text, True, WHITE) for text in row] for row in rows]
+    columns = [max(cell[i].get_width() for cell in cells) for i in range(4)]
+    line_height = font.get_linesize()
+    padding = 6
+    width = sum(columns) + 12 * 3 + padding * 2
+    height = line_height * (len(rows) + 1) + padding * 2
+
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    surface.fill((0, 0, 0, 170))
+    y = padding
+    title = font.render(f"frame ms (last {min(profiler.frames, PROFILER_WINDOW)} frames)", True, HIGHLIGHT)
+    surface.blit(title, (padding, y))
+    for cell_row in cells:
+        y += line_height
+        x = padding
+        for i, cell in enumerate(cell_row):
+            # Stage names left-aligned, numbers right-aligned
+            offset = 0 if i == 0 else columns[i] - cell.get_width()
+            surface.blit(cell, (x + offset, y))
+            x += columns[i] + 12
+    return surface
+
+
+def draw_profiler_overlay(screen, profiler, visible, damage=None):
+    """Draw the profiler table in the canvas' top-left corner while visible"""
+    global _overlay, _overlay_time, _overlay_rect
+
+    if not visible:
+        if _overlay_rect is not None and damage is not None:
+            damage.add(_overlay_rect)  # Erase the last overlay
+        _overlay = _overlay_rect = None
+        return
+
+    now = pygame.time.get_ticks()
+    if _overlay is None or now - _overlay_time >= PROFILER_OVERLAY_REFRESH_MS:
+        _overlay = _render_overlay(profiler)
+        _overlay_time = now
+        rect = _overlay.get_rect(topleft=(8, 8))
+        if damage is not None:
+            damage.add(rect.union(_overlay_rect) if _overlay_rect else rect)
+        _overlay_rect = rect
+    screen.blit(_overlay, _overlay_rect)
@@ -0,0 +1,119 @@
+"""Scaled zoom preview while the new zoom's tiles rasterize in the background"""
+
+import threading
+from math import ceil, floor
+
+import pygame
+
+
+class ZoomPreview:
+    """Stand-in canvas for zoom changes, swapped out once the exact tiles are ready
+
+    begin() keeps a copy of the last exactly rendered canvas and starts a
+    worker thread that rasterizes the tiles the new view needs into the
+    TileCache; draw() shows the copy mapped from the view it was drawn at
+    to the new one (scaled, and moved with a cursor-anchored zoom) until
+    ready() says the tiles are in. A newer zoom cancels the running job,
+    and the worker checks between tiles (between batches with a
+    TilePool), so a stale render stops after at most one more tile or
+    batch.
+
+    lock guards the scene and the tile cache: the main loop holds it for
+    the whole frame except its idle wait, and the worker takes it per tile.
+    """
+    def __init__(self, tiles):
+        self.tiles = tiles
+        self.lock = threading.Lock()
+        self.active = False
+        self._snapshot = None
+        self._snapshot_view = None  # (center_x, center_y, zoom_level) the copy was drawn at
+        self._scaled = None  # (view, surface, position) cached for repeated frames
+        self._job = None  # (view, cancelled event, done event)
+
+    def begin(self, screen, shapes, canvas_width, height, center_x, center_y, zoom_level, from_view):
+        """Preview a zoom change (main thread, lock held) and rasterize the new view behind it
+
+        from_view is the (center_x, center_y, zoom_level) the screen was drawn at.
+        """
+        if not self.active:
+            # The screen still holds the last exact frame; later zoom steps scale this same copy
+            self._snapshot = screen.subsurface((0, 0, canvas_width, height)).copy()
+            self._snapshot_view = from_view
+            self.active = True
+        self._cancel_job()
+
+        view = (canvas_width, height, center_x, center_y, zoom_level)
+        keys = self.tiles.missing(shapes, canvas_width, height, center_x, center_y, zoom_level)
+        cancelled, done = threading.Event(), threading.Event()
+        self._job = (view, cancelled, done)
+        if not keys:
+            done.set()
+            return
+        threading.Thread(target=self._rasterize, args=(shapes, zoom_level, keys, cancelled, done),
+                         daemon=True).start()
+
+    def _rasterize(self, shapes, zoom_level, keys, cancelled, done):
+        """Worker: build the missing tiles a batch at a time until done or cancelled"""
+        step = self.tiles.batch_size
+        for start in range(0, len(keys), step):
+            with self.lock:
+                if cancelled.is_set():
+                    return
+                self.tiles.prefetch(shapes, zoom_level, keys[start:start + step])
+        done.set()
+
+    def _cancel_job(self):
+        if self._job is not None:
+            self._job[1].set()
+            self._job = None
+
+    def ready(self, canvas_width, height, center_x, center_y, zoom_level):
+        """True once every tile of this view has been rasterized"""
+        view = (canvas_width, height, center_x, center_y, zoom_level)
+        return self._job is not None and self._job[0] == view and self._job[2].is_set()
+
+    def cancel(self):
+        """Stop the preview and any running job (the exact frame is drawn instead)"""
+        self._cancel_job()
+        self.active = False
+        self._snapshot = self._snapshot_view = self._scaled = None
+
+    def draw(self, screen, canvas_width, height, center_x, center_y, zoom_level):
+        """Blit the last exact canvas mapped from its view to this one"""
+        view = (canvas_width, height, center_x, center_y, zoom_level)
+        if self._scaled is None or self._scaled[0] != view:
+            self._scaled = (view,) + self._scale(canvas_width, height, center_x, center_y, zoom_level)
+        _, surface, position = self._scaled
+        if surface is not None:
+            screen.blit(surface, position)
+
+    def _scale(self, canvas_width, height, center_x, center_y, zoom_level):
+        """(surface, position) covering the canvas; only the part of the copy that lands on it is scaled"""
+        # A copy pixel p lands at center + (p - from_center) * factor
+        from_x, from_y, from_zoom = self._snapshot_view
+        factor = zoom_level / from_zoom
+        # Canvas rect mapped back into the copy, clipped to the copy
+        left = max(0.0, from_x - center_x / factor)
+        top = max(0.0, from_y - center_y / factor)
+        right = min(float(canvas_width), from_x + (canvas_width - center_x) / factor)
+        bottom = min(float(height), from_y + (height - center_y) / factor)
+        if right <= left or bottom <= top:
+            return None, None
+        source = pygame.Rect(floor(left), floor(top), ceil(right) - floor(left), ceil(bottom) - floor(top))
+        source = source.clip(self._snapshot.get_rect())
+
+        x0 = round(center_x + (source.left - from_x) * factor)
+        y0 = round(center_y + (source.top - from_y) * factor)
+        x1 = round(center_x + (source.right - from_x) * factor)
+        y1 = round(center_y + (source.bottom - from_y) * factor)
+        if source.width <= 0 or source.height <= 0 or x1 <= x0 or y1 <= y0:
+            return None, None
+        if x1 - x0 > 4 * canvas_width or y1 - y0 > 4 * height:
+            return None, None  # A pixel or two blown up past the canvas: not worth the memory
+
+        region = self._snapshot.subsurface(source)
+        if region.get_bitsize() in (24, 32):
+            scaled = pygame.transform.smoothscale(region, (x1 - x0, y1 - y0))
+        else:
+            scaled = pygame.transform.scale(region, (x1 - x0, y1 - y0))
+        return scaled, (x0, y0)
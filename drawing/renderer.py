@@ -1,7 +1,10 @@
 """Rendering helper functions"""
 
+from collections import OrderedDict
+
 import pygame
 from config import *
+from .fonts import render_text
 
 
 def draw_rounded_rect(surface, color, rect, radius=10):
@@ -11,49 +14,99 @@ def draw_rounded_rect(surface, color, rect, radius=10):
 
 def draw_gradient_rect(surface, rect, color1, color2, vertical=True):
     """Draw a gradient rectangle"""
-    if vertical:
-        for i in range(rect.height):
-            alpha = i / rect.height
-            r = int(color1[0] * (1 - alpha) + color2[0] * alpha)
-            g = int(color1[1] * (1 - alpha) + color2[1] * alpha)
-            b = int(color1[2] * (1 - alpha) + color2[2] * alpha)
-            pygame.draw.rect(surface, (r, g, b), 
-                           (rect.x, rect.y + i, rect.width, 1))
-    else:
-        for i in range(rect.width):
-            alpha = i / rect.width
-            r = int(color1[0] * (1 - alpha) + color2[0] * alpha)
-            g = int(color1[1] * (1 - alpha) + color2[1] * alpha)
-            b = int(color1[2] * (1 - alpha) + color2[2] * alpha)
-            pygame.draw.rect(surface, (r, g, b), 
-                           (rect.x + i, rect.y, 1, rect.height))
-
-
-def draw_button_3d(surface, rect, color, text, font_obj, pressed=False):
+    rect = pygame.Rect(rect)
+    if rect.width <= 0 or rect.height <= 0:
+        return
+    surface.blit(get_gradient_surface(rect.size, color1, color2, vertical), rect.topleft)
+
+
+def draw_button_3d(surface, rect, color, text, font_size, pressed=False):
     """Draw a 3D button with shadow"""
-    # Shadow
-    if not pressed:
-        shadow_rect = rect.copy()
-        shadow_rect.y += 4
-        pygame.draw.rect(surface, VERY_DARK_GRAY, shadow_rect, border_radius=8)
-    
-    # Button
-    button_rect = rect.copy()
-    if pressed:
-        button_rect.y += 2
-    
-    # Gradient effect (lighter top, darker bottom)
-    for i in range(rect.height):
-        alpha = i / rect.height
-        r = int(color[0] * (1 - alpha * 0.2))
-        g = int(color[1] * (1 - alpha * 0.2))
-        b = int(color[2] * (1 - alpha * 0.2))
-        pygame.draw.rect(surface, (r, g, b), 
-                        (button_rect.x, button_rect.y + i, button_rect.width, 1))
-    
-    pygame.draw.rect(surface, BLACK, button_rect, 2, border_radius=8)
-    
-    # Text
-    text_surface = font_obj.render(text, True, WHITE)
-    text_rect = text_surface.get_rect(center=button_rect.center)
-    surface.blit(text_surface, text_rect)
+    rect = pygame.Rect(rect)
+    if rect.width <= 0 or rect.height <= 0:
+        return
+    surface.blit(get_button_surface(rect.size, color, text, font_size, pressed), rect.topleft)
+
+
+# =====================
+# Precomputed surfaces
+# =====================
+_surface_cache = OrderedDict()
+
+
+def _cached_surface(key, build):
+    """Return the memoized Surface for key, building it on first use"""
+    cached = _surface_cache.get(key)
+    if cached is not None:
+        _surface_cache.move_to_end(key)
+        return cached
+
+    cached = build()
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        # Match the display format so later blits are plain copies
+        if cached.get_flags() & pygame.SRCALPHA:
+            cached = cached.convert_alpha()
+        else:
+            cached = cached.convert()
+    _surface_cache[key] = cached
+    if len(_surface_cache) > SURFACE_CACHE_SIZE:
+        _surface_cache.popitem(last=False)
+    return cached
+
+
+def _gradient_strip(length, vertical, color_at):
+    """Build a 1-pixel strip with one interpolated color per row/column"""
+    pixels = bytearray()
+    for i in range(length):
+        pixels += bytes(color_at(i / length))
+    size = (1, length) if vertical else (length, 1)
+    return pygame.image.frombuffer(bytes(pixels), size, 'RGB')
+
+
+def get_gradient_surface(size, color1, color2, vertical=True):
+    """Return a memoized gradient Surface of the given size"""
+    width, height = size
+    key = ('gradient', width, height, tuple(color1), tuple(color2), vertical)
+
+    def build():
+        def color_at(alpha):
+            return tuple(int(c1 * (1 - alpha) + c2 * alpha) for c1, c2 in zip(color1, color2))
+
+        strip = _gradient_strip(height if vertical else width, vertical, color_at)
+        return pygame.transform.scale(strip, (width, height))
+
+    return _cached_surface(key, build)
+
+
+def get_button_surface(size, color, text, font_size, pressed=False):
+    """Return a memoized 3D button Surface (button plus its 4px shadow)"""
+    width, height = size
+    key = ('button', width, height, tuple(color), text, font_size, pressed)
+
+    def build():
+        button = pygame.Surface((width, height + 4), pygame.SRCALPHA)
+
+        # Shadow
+        if not pressed:
+            shadow_rect = pygame.Rect(0, 4, width, height)
+            pygame.draw.rect(button, VERY_DARK_GRAY, shadow_rect, border_radius=8)
+
+        # Button
+        button_rect = pygame.Rect(0, 2 if pressed else 0, width, height)
+
+        # Gradient effect (lighter top, darker bottom)
+        def color_at(alpha):
+            return tuple(int(c * (1 - alpha * 0.2)) for c in color[:3])
+
+        strip = _gradient_strip(height, True, color_at)
+        button.blit(pygame.transform.scale(strip, (width, height)), button_rect)
+
+        pygame.draw.rect(button, BLACK, button_rect, 2, border_radius=8)
+
+        # Text
+        text_surface = render_text(text, font_size, WHITE)
+        text_rect = text_surface.get_rect(center=button_rect.center)
+        button.blit(text_surface, text_rect)
+        return button
+
+    return _cached_surface(key, build)
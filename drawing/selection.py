@@ -0,0 +1,32 @@
+"""Hover and selection highlights for picked shapes"""
+
+import pygame
+from config import *
+from .viewport import coordinate_to_screen
+
+# Far past any canvas, well inside pygame.Rect's 32-bit fields (deep zoom boxes get cut to this)
+_RECT_LIMIT = 1 << 24
+
+
+def shape_screen_rect(shape, center_x, center_y, zoom_level):
+    """Screen rect around a shape's bounding box, padded by PICK_HIGHLIGHT_PAD_PX"""
+    xmin, ymin, xmax, ymax = shape.bounds()
+    left, top = (_limit(v) for v in coordinate_to_screen(xmin, ymax, center_x, center_y, zoom_level))
+    right, bottom = (_limit(v) for v in coordinate_to_screen(xmax, ymin, center_x, center_y, zoom_level))
+    rect = pygame.Rect(left, top, right - left + 1, bottom - top + 1)
+    return rect.inflate(PICK_HIGHLIGHT_PAD_PX * 2, PICK_HIGHLIGHT_PAD_PX * 2)
+
+
+def _limit(value):
+    return min(max(value, -_RECT_LIMIT), _RECT_LIMIT)
+
+
+def draw_highlight(screen, rect, color, canvas_width, height):
+    """Outline rect on the canvas; returns the changed screen area"""
+    canvas = pygame.Rect(0, 0, canvas_width, height)
+    previous_clip = screen.get_clip()
+    screen.set_clip(canvas.clip(previous_clip))
+    # Edges past the canvas are never seen: cut huge boxes down first
+    pygame.draw.rect(screen, color, rect.clip(canvas.inflate(8, 8)), 2, border_radius=4)
+    screen.set_clip(previous_clip)
+    return rect.clip(canvas)
@@ -0,0 +1,120 @@
+"""Shape tile rasterization on a process pool, into shared-memory pixel buffers"""
+
+import signal
+
+import pygame
+from config import TILE_SIZE_PX, TILE_MARGIN_PX
+from .labels import LabelPlacer
+from .viewport import visible_world_rect
+
+
+SLOTS_PER_WORKER = 2  # Tile buffers per worker, so every worker has a job queued behind its current one
+
+_memory = None  # Worker side: the shared block, attached once per process
+
+
+def _init_worker(name, backend):
+    """Attach the shared pixel block and use the main process's render backend"""
+    from multiprocessing import shared_memory
+    from shapes.raster import set_backend
+
+    global _memory
+    # A forked worker inherits SDL's handlers, which turn SIGTERM/SIGINT into quit events
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C is handled by the main process
+    _memory = shared_memory.SharedMemory(name=name)
+    set_backend(backend)
+
+
+def _slot_view(memory, slot, size):
+    nbytes = size * size * 4
+    return memory.buf[slot * nbytes:(slot + 1) * nbytes]
+
+
+def _rasterize(job):
+    """Worker: draw one tile's shapes into its slot; True when anything landed on it"""
+    from shapes.columnar import draw_columns  # shapes imports drawing, so not at module level
+
+    slot, size, zoom_level, tx, ty, palette, columns = job
+    surface = pygame.image.frombuffer(_slot_view(_memory, slot, size), (size, size), 'RGBA')
+    surface.fill((0, 0, 0, 0))
+    # Same draw calls, origin and per-tile placer as TileCache._render_tile
+    drawn = draw_columns(surface, palette, columns['circle'], columns['ellipse'], columns['line'],
+                         -tx * size, -ty * size, zoom_level, since=0, labels=LabelPlacer(labels=False))
+    return any(rect for rect in drawn)
+
+
+def tile_world_rect(tx, ty, zoom_level, size=TILE_SIZE_PX, margin_px=TILE_MARGIN_PX):
+    """World (xmin, ymin, xmax, ymax) a tile draws, margin included"""
+    return visible_world_rect(size, size, -tx * size, -ty * size, zoom_level, margin_px)
+
+
+class TilePool:
+    """Worker processes that rasterize shape tiles in parallel
+
+    render() queries the scene once for the union of the requested tiles
+    and gives each job its tile's world rect, the zoom and the columns of
+    the shapes overlapping it. Workers draw with the same draw_columns()
+    code as the in-process path, straight into a slot of one
+    SharedMemory block. The main process wraps each slot as a Surface
+    without copying and then converts it to the display format, which
+    in-process tiles get as well. Slots are reused batch after batch.
+    """
+    def __init__(self, workers, size=TILE_SIZE_PX):
+        from multiprocessing import Pool, shared_memory  # Only paid for when a pool is started
+        from shapes.raster import get_backend
+
+        self.workers = workers
+        self.size = size
+        self.slots = workers * SLOTS_PER_WORKER
+        self._memory = shared_memory.SharedMemory(create=True, size=self.slots * size * size * 4)
+        self._pool = Pool(workers, initializer=_init_worker, initargs=(self._memory.name, get_backend()))
+
+    def close(self):
+        """Stop the workers and free the shared block"""
+        self._pool.close()
+        self._pool.join()
+        self._memory.close()
+        self._memory.unlink()
+
+    def _surface(self, slot):
+        """The finished tile in slot as a Surface of its own (the slot is reused next batch)"""
+        wrapped = pygame.image.frombuffer(_slot_view(self._memory, slot, self.size),
+                                          (self.size, self.size), 'RGBA')
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            return wrapped.convert_alpha()
+        return wrapped.copy()
+
+    def render(self, shapes, zoom_level, keys):
+        """{(tx, ty): Surface, or None when nothing lands on the tile} for every key"""
+        from shapes.columnar import column_bounds
+
+        rects = {key: tile_world_rect(*key, zoom_level, self.size) for key in keys}
+        if not rects:
+            return {}
+        # One scene query for all tiles, then a vectorized overlap mask per tile
+        palette, columns = shapes.columns_in(min(r[0] for r in rects.values()), min(r[1] for r in rects.values()),
+                                             max(r[2] for r in rects.values()), max(r[3] for r in rects.values()))
+        bounds = {kind: column_bounds(kind, cols) for kind, cols in columns.items()}
+
+        tiles = {}
+        jobs = []
+        for key, (xmin, ymin, xmax, ymax) in rects.items():
+            tile_columns = {}
+            for kind, cols in columns.items():
+                lo_x, lo_y, hi_x, hi_y = bounds[kind]
+                mask = (hi_x >= xmin) & (lo_x <= xmax) & (hi_y >= ymin) & (lo_y <= ymax)
+                tile_columns[kind] = {name: array[mask] for name, array in cols.items()}
+            if any(len(cols['order']) for cols in tile_columns.values()):
+                jobs.append((key, tile_columns))
+            else:
+                tiles[key] = None  # Nothing overlaps it: no job needed
+
+        for start in range(0, len(jobs), self.slots):
+            batch = jobs[start:start + self.slots]
+            drawn = self._pool.map(_rasterize, [(slot, self.size, zoom_level, tx, ty, palette, tile_columns)
+                                                for slot, ((tx, ty), tile_columns) in enumerate(batch)],
+                                   chunksize=1)
+            for slot, ((key, _), landed) in enumerate(zip(batch, drawn)):
+                tiles[key] = self._surface(slot) if landed else None
+        return tiles
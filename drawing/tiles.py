@@ -0,0 +1,195 @@
+"""Zoom-level tile pyramid for the shape layer"""
+
+from collections import OrderedDict
+from math import floor
+
+import numpy as np
+import pygame
+from config import PIXELS_PER_UNIT, TILE_SIZE_PX, TILE_CACHE_SIZE, TILE_MARGIN_PX
+from .labels import LabelPlacer
+
+
+def _zoom_key(zoom_level):
+    """Zoom as a cache key (zoom steps drift in the last float digits)"""
+    return round(zoom_level, 9)
+
+
+class TileCache:
+    """Shape geometry rasterized into fixed-size tiles keyed by (zoom, tx, ty)
+
+    Tiles are laid out around the world origin, so tile (tx, ty) covers the
+    screen pixels [tx, tx + 1) * TILE_SIZE_PX right of and [ty, ty + 1) *
+    TILE_SIZE_PX below the origin at every canvas size. Only geometry is
+    cached; labels are drawn by a separate labels-only pass so they are never
+    cut at tile edges. Appended, removed and recolored shapes invalidate
+    just the tiles their bounds touch at each cached zoom; clearing the
+    scene (or opening another) drops every tile.
+    The least recently used tiles are evicted past TILE_CACHE_SIZE, or past
+    the visible tile count when a large canvas shows more than that. With a
+    TilePool, the tiles missing from a frame are rasterized in parallel.
+    """
+    def __init__(self, size=TILE_SIZE_PX, capacity=TILE_CACHE_SIZE, pool=None):
+        self.size = size
+        self.capacity = capacity
+        self.pool = pool
+        self.tiles = OrderedDict()  # (zoom, tx, ty) -> Surface, or None if empty
+        self.visible_count = 0  # Tiles the canvas showed last; never evicted below this
+        self.seen_scene = None
+        self.seen_shapes = 0
+        self.seen_generation = None
+        self.seen_edits = 0
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def clear(self):
+        """Drop every cached tile"""
+        self.tiles.clear()
+
+    # ---------------------
+    # Invalidation
+    # ---------------------
+    def sync(self, shapes):
+        """Invalidate tiles for shapes appended, removed or changed since the last call"""
+        if shapes is not self.seen_scene or shapes.generation != self.seen_generation:
+            self.clear()
+            self.seen_scene = shapes
+            self.seen_generation = shapes.generation
+            self.seen_shapes = len(shapes)
+            self.seen_edits = len(shapes.edits)
+            return
+        if len(shapes.edits) != self.seen_edits:
+            (_, _, *bounds), self.seen_shapes = shapes.edits.applied(self.seen_edits, self.seen_shapes)
+            if self.tiles:
+                self.invalidate_bounds(*bounds)
+            self.seen_edits = len(shapes.edits)
+        if len(shapes) > self.seen_shapes:
+            if self.tiles:
+                # One vectorized pass for the whole append (a bulk import included)
+                self.invalidate_bounds(*shapes.bounds_since(self.seen_shapes))
+            self.seen_shapes = len(shapes)
+
+    def _tile_range(self, xmin, ymin, xmax, ymax, zoom_level):
+        """Inclusive (tx0, ty0, tx1, ty1) arrays of the tiles world bboxes touch"""
+        scale = PIXELS_PER_UNIT * zoom_level
+        size = self.size
+        margin = TILE_MARGIN_PX
+        # Screen y grows downwards, so world ymax maps to the top row
+        return (np.floor((xmin * scale - margin) / size), np.floor((-ymax * scale - margin) / size),
+                np.floor((xmax * scale + margin) / size), np.floor((-ymin * scale + margin) / size))
+
+    def invalidate_bounds(self, xmin, ymin, xmax, ymax):
+        """Drop the cached tiles touched by any of the world bboxes, at every zoom
+
+        Takes scalars or equally long arrays.
+        """
+        xmin, ymin, xmax, ymax = (np.atleast_1d(np.asarray(v, np.float64))
+                                  for v in (xmin, ymin, xmax, ymax))
+        if not len(xmin):
+            return
+        ranges = {}
+        for key in list(self.tiles):
+            zoom, tx, ty = key
+            if zoom not in ranges:
+                ranges[zoom] = self._tile_range(xmin, ymin, xmax, ymax, zoom)
+            tx0, ty0, tx1, ty1 = ranges[zoom]
+            if np.any((tx0 <= tx) & (tx <= tx1) & (ty0 <= ty) & (ty <= ty1)):
+                del self.tiles[key]
+
+    # ---------------------
+    # Rendering
+    # ---------------------
+    def _render_tile(self, shapes, zoom_level, tx, ty):
+        """Rasterize the geometry of one tile; None when nothing lands on it"""
+        size = self.size
+        tile = pygame.Surface((size, size), pygame.SRCALPHA)
+        # Local origin of the world: the tile's top-left sits at (tx, ty) * size
+        drawn = shapes.draw_batch(tile, size, size, -tx * size, -ty * size, zoom_level,
+                                  TILE_MARGIN_PX, since=0, labels=LabelPlacer(labels=False))
+        if not any(rect for rect in drawn):
+            return None
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            tile = tile.convert_alpha()
+        return tile
+
+    def _render_tiles(self, shapes, zoom_level, keys):
+        """{(tx, ty): tile} for the keys, on the pool when there is more than one"""
+        if self.pool is not None and len(keys) > 1:
+            return self.pool.render(shapes, zoom_level, keys)
+        return {(tx, ty): self._render_tile(shapes, zoom_level, tx, ty) for tx, ty in keys}
+
+    @property
+    def batch_size(self):
+        """Tiles worth rasterizing per prefetch() call"""
+        return self.pool.slots if self.pool is not None else 1
+
+    def _visible_tiles(self, canvas_width, height, center_x, center_y):
+        """(tx, ty) of every tile overlapping the canvas"""
+        size = self.size
+        for tx in range(floor(-center_x / size), floor((canvas_width - 1 - center_x) / size) + 1):
+            for ty in range(floor(-center_y / size), floor((height - 1 - center_y) / size) + 1):
+                yield tx, ty
+
+    def _store(self, key, tile):
+        self.tiles[key] = tile
+        self._evict()
+
+    def _evict(self):
+        """Drop the least recently used tiles past the capacity (at least one canvas worth)"""
+        limit = max(self.capacity, self.visible_count)
+        while len(self.tiles) > limit:
+            self.tiles.popitem(last=False)
+
+    def missing(self, shapes, canvas_width, height, center_x, center_y, zoom_level):
+        """(tx, ty) of the visible tiles not cached at this zoom"""
+        self.sync(shapes)
+        zoom = _zoom_key(zoom_level)
+        visible = list(self._visible_tiles(canvas_width, height, center_x, center_y))
+        self.visible_count = max(self.visible_count, len(visible))  # Room for the view being prefetched
+        return [(tx, ty) for tx, ty in visible if (zoom, tx, ty) not in self.tiles]
+
+    def prefetch(self, shapes, zoom_level, keys):
+        """Rasterize (tx, ty) tiles ahead of draw(), skipping cached ones"""
+        zoom = _zoom_key(zoom_level)
+        keys = [(tx, ty) for tx, ty in keys if (zoom, tx, ty) not in self.tiles]
+        for (tx, ty), tile in self._render_tiles(shapes, zoom_level, keys).items():
+            self._store((zoom, tx, ty), tile)
+
+    def draw(self, screen, shapes, canvas_width, height, center_x, center_y, zoom_level, damage=None):
+        """Blit the shape layer from cached tiles, rasterizing missing ones
+
+        Tiles built this frame are reported to damage; everything else is
+        unchanged since the last frame at this zoom.
+        """
+        self.sync(shapes)
+        zoom = _zoom_key(zoom_level)
+        size = self.size
+        canvas = pygame.Rect(0, 0, canvas_width, height)
+
+        visible = list(self._visible_tiles(canvas_width, height, center_x, center_y))
+        self.visible_count = len(visible)
+        rendered = self._render_tiles(shapes, zoom_level,
+                                      [(tx, ty) for tx, ty in visible if (zoom, tx, ty) not in self.tiles])
+
+        # Blit everything before touching the LRU, so storing a new tile cannot evict a visible one
+        previous_clip = screen.get_clip()
+        screen.set_clip(canvas.clip(previous_clip))
+        for tx, ty in visible:
+            position = (center_x + tx * size, center_y + ty * size)
+            if (tx, ty) in rendered:
+                tile = rendered[(tx, ty)]
+                if damage is not None:
+                    damage.add(pygame.Rect(position, (size, size)).clip(canvas))
+            else:
+                tile = self.tiles[(zoom, tx, ty)]
+            if tile is not None:
+                screen.blit(tile, position)
+        screen.set_clip(previous_clip)
+
+        for tx, ty in visible:
+            key = (zoom, tx, ty)
+            if (tx, ty) in rendered:
+                self.tiles[key] = rendered[(tx, ty)]
+            else:
+                self.tiles.move_to_end(key)
+        self._evict()
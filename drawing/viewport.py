@@ -0,0 +1,163 @@
+"""Viewport - the view's pan and zoom, and every world <-> screen transform"""
+
+import numpy as np
+from config import PIXELS_PER_UNIT, DEFAULT_ZOOM, MIN_ZOOM, MAX_ZOOM, ZOOM_FACTOR
+
+
+# All drawing code transforms with these (scalar) or their array forms below,
+# so shapes, tiles, grid and picking agree on every pixel: a world value v
+# lands int(v * PIXELS_PER_UNIT * zoom) pixels from the world origin on screen.
+def screen_length(value, zoom_level):
+    """World length (or offset from the origin) in whole screen pixels"""
+    return int(value * PIXELS_PER_UNIT * zoom_level)
+
+
+def coordinate_to_screen(x, y, center_x, center_y, zoom_level):
+    """Convert mathematical coordinates to screen coordinates with zoom"""
+    screen_x = center_x + int(x * PIXELS_PER_UNIT * zoom_level)
+    screen_y = center_y - int(y * PIXELS_PER_UNIT * zoom_level)
+    return (screen_x, screen_y)
+
+
+def screen_to_coordinate(screen_x, screen_y, center_x, center_y, zoom_level):
+    """Convert screen coordinates to mathematical coordinates with zoom"""
+    x = int((screen_x - center_x) / (PIXELS_PER_UNIT * zoom_level))
+    y = int((center_y - screen_y) / (PIXELS_PER_UNIT * zoom_level))
+    return (x, y)
+
+
+def screen_to_world(screen_x, screen_y, center_x, center_y, zoom_level):
+    """Convert screen coordinates to unrounded world coordinates (for picking)"""
+    scale = PIXELS_PER_UNIT * zoom_level
+    return ((screen_x - center_x) / scale, (center_y - screen_y) / scale)
+
+
+def visible_world_rect(canvas_width, height, center_x, center_y, zoom_level, margin_px=0):
+    """World-space (xmin, ymin, xmax, ymax) covered by the canvas plus a pixel margin"""
+    scale = PIXELS_PER_UNIT * zoom_level
+    xmin = (-margin_px - center_x) / scale
+    xmax = (canvas_width + margin_px - center_x) / scale
+    ymin = (center_y - height - margin_px) / scale
+    ymax = (center_y + margin_px) / scale
+    return (xmin, ymin, xmax, ymax)
+
+
+def screen_lengths(values, zoom_level):
+    """screen_length() of a whole array, as int64 (same arithmetic order, so the same pixels)"""
+    return (np.asarray(values, np.float64) * PIXELS_PER_UNIT * zoom_level).astype(np.int64)
+
+
+def coordinates_to_screen(xs, ys, center_x, center_y, zoom_level):
+    """coordinate_to_screen() of whole arrays: (screen xs, screen ys) as int64"""
+    return center_x + screen_lengths(xs, zoom_level), center_y - screen_lengths(ys, zoom_level)
+
+
+def screens_to_world(screen_xs, screen_ys, center_x, center_y, zoom_level):
+    """screen_to_world() of whole arrays, as float64"""
+    scale = PIXELS_PER_UNIT * zoom_level
+    return ((np.asarray(screen_xs, np.float64) - center_x) / scale,
+            (center_y - np.asarray(screen_ys, np.float64)) / scale)
+
+
+class Viewport:
+    """Pan and zoom of the canvas
+
+    The view is kept as the world point at the canvas center, in float64,
+    plus the zoom level (MIN_ZOOM to MAX_ZOOM). Drawing code takes the
+    derived view (center_x, center_y, zoom_level): the world origin's
+    screen position, rounded to a whole pixel, and the zoom. Transforms
+    from it are exact integer sums, so precision holds at any pan and
+    zoom depth. Panning moves the center by screen pixels; zoom_at()
+    keeps the world point under the cursor fixed.
+    """
+    def __init__(self, canvas_width, height, zoom_level=DEFAULT_ZOOM, world_x=0.0, world_y=0.0):
+        self.canvas_width = canvas_width
+        self.height = height
+        self.zoom_level = _clamp_zoom(zoom_level)
+        self.world_x = float(world_x)  # World point at the canvas center
+        self.world_y = float(world_y)
+
+    @property
+    def scale(self):
+        """Screen pixels per world unit"""
+        return PIXELS_PER_UNIT * self.zoom_level
+
+    @property
+    def center_x(self):
+        """Screen x of the world origin"""
+        return self.canvas_width // 2 - round(self.world_x * self.scale)
+
+    @property
+    def center_y(self):
+        """Screen y of the world origin"""
+        return self.height // 2 + round(self.world_y * self.scale)
+
+    @property
+    def view(self):
+        """(center_x, center_y, zoom_level), the view every draw function takes"""
+        return self.center_x, self.center_y, self.zoom_level
+
+    # ---------------------
+    # Navigation
+    # ---------------------
+    def resize(self, canvas_width, height):
+        """New canvas size; the world point at the center stays there"""
+        self.canvas_width, self.height = canvas_width, height
+
+    def pan(self, dx, dy):
+        """Drag the view by (dx, dy) screen pixels"""
+        self.world_x -= dx / self.scale
+        self.world_y += dy / self.scale
+
+    def zoom_at(self, zoom_level, anchor=None):
+        """Zoom to zoom_level (clamped), keeping the world point under the anchor pixel in place
+
+        The anchor defaults to the canvas center.
+        """
+        if anchor is None:
+            self.zoom_level = _clamp_zoom(zoom_level)
+            return
+        # Anchor offset from the canvas center, in pixels; taken from the unrounded
+        # center so zooming in and back out at one spot returns to the same view
+        dx, dy = anchor[0] - self.canvas_width // 2, anchor[1] - self.height // 2
+        old_scale = self.scale
+        self.zoom_level = _clamp_zoom(zoom_level)
+        self.world_x += dx / old_scale - dx / self.scale
+        self.world_y -= dy / old_scale - dy / self.scale
+
+    def zoom_in(self, anchor=None):
+        """One ZOOM_FACTOR step in"""
+        self.zoom_at(self.zoom_level * ZOOM_FACTOR, anchor)
+
+    def zoom_out(self, anchor=None):
+        """One ZOOM_FACTOR step out"""
+        self.zoom_at(self.zoom_level / ZOOM_FACTOR, anchor)
+
+    def reset(self):
+        """Back to DEFAULT_ZOOM with the world origin at the canvas center"""
+        self.zoom_level = DEFAULT_ZOOM
+        self.world_x = self.world_y = 0.0
+
+    # ---------------------
+    # Transforms
+    # ---------------------
+    def to_screen(self, xs, ys):
+        """Screen positions of world points (scalars or arrays) as int64 arrays"""
+        return coordinates_to_screen(xs, ys, *self.view)
+
+    def to_world(self, screen_xs, screen_ys):
+        """World positions of screen points (scalars or arrays) as float64 arrays"""
+        return screens_to_world(screen_xs, screen_ys, *self.view)
+
+    def lengths(self, values):
+        """World lengths in whole screen pixels, as int64"""
+        return screen_lengths(values, self.zoom_level)
+
+    def world_rect(self, margin_px=0):
+        """World (xmin, ymin, xmax, ymax) on the canvas, plus a pixel margin"""
+        return visible_world_rect(self.canvas_width, self.height, *self.view, margin_px)
+
+
+def _clamp_zoom(zoom_level):
+    # 12 significant digits: stepping in and back out lands on the same zoom (and tile cache key)
+    return float(f"{min(max(float(zoom_level), MIN_ZOOM), MAX_ZOOM):.12g}")
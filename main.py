@@ -3,49 +3,68 @@ Professional Drawing Program - Input Based
 Main entry point
 """
 
+import time
+_started = time.perf_counter()  # --measure-startup counts from here
+
 import pygame
+import argparse
 import sys
 import os
-
-from config import *
-from drawing import draw_grid
+import threading
+
+from config import (CANVAS_BG, CULL_MARGIN_PX, DEFAULT_COLOR, DEFAULT_SCENE_FILE, DEFAULT_TOOL, DIRTY_RECTS,
+                    DISPLAY_LIST, FONT_LARGE, FONT_MEDIUM, FONT_NORMAL, FONT_SMALL, FONT_TINY,
+                    IMPORT_FILE_EXTS, INPUT_PANEL_WIDTH, PAN_DRAG_THRESHOLD_PX, PICK_HOVER_COLOR,
+                    PICK_SELECT_COLOR, PICK_TOLERANCE_PX, PROFILER_ENABLED, PROFILER_TRACE_FRAMES,
+                    PROFILE_CHROME_FILE, PROFILE_TRACE_FILE, RENDER_BACKEND, SCENE_FILE_EXT, SCENE_STORE,
+                    SHAPE_TILES, TILE_WORKERS, ZOOM_PREVIEW)
+from drawing import draw_grid, invalidate_grid_cache, DamageTracker, LabelPlacer, TileCache, TilePool, ZoomPreview
+from drawing import draw_profiler_overlay, shape_screen_rect, draw_highlight, Viewport, get_font
 from ui.panel import draw_input_panel, handle_panel_click, init_input_fields
-from utils.shapes_factory import create_shape_from_input
+from shapes import Scene, ColumnarScene, History, DisplayList, BACKENDS, set_backend
+from utils import screen_to_world
+from utils.shapes_factory import create_shape_from_input, import_shapes
+from utils.scene_io import load_scene, save_scene
+from utils.profiler import FrameProfiler
 
 
 # =====================
 # Initialization
 # =====================
-pygame.init()
-
-# Center window
-os.environ['SDL_VIDEO_CENTERED'] = '1'
-
-# Screen size (half of display)
-info = pygame.display.Info()
-WIDTH = info.current_w // 2
-HEIGHT = info.current_h // 2
-
-# Create window
-screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-pygame.display.set_caption("Professional Drawing Program - Input Based")
+# The window is opened by init_display() from main(); importing this module starts nothing
+screen = None
+WIDTH = HEIGHT = 0
 
 clock = pygame.time.Clock()
+damage = DamageTracker()
+
+# Frame stages in loop order; "idle" is the wait inside clock.tick
+profiler = FrameProfiler(("events", "grid", "shapes", "labels", "picking", "panel", "present", "idle"),
+                         PROFILER_ENABLED)
 
 # =====================
 # Application State
 # =====================
-CANVAS_WIDTH = WIDTH - INPUT_PANEL_WIDTH
-center_x = CANVAS_WIDTH // 2
-center_y = HEIGHT // 2
+CANVAS_WIDTH = 0
+viewport = Viewport(CANVAS_WIDTH, HEIGHT)  # Pan and zoom (drag the canvas to pan, wheel zooms at the cursor)
 
 current_tool = DEFAULT_TOOL
 current_color = DEFAULT_COLOR
 
-shapes = []
+shapes = ColumnarScene() if SCENE_STORE == "columnar" else Scene()
+shape_tiles = TileCache()
+display_list = DisplayList()  # Labels (and untiled geometry) compiled once per edit, zoom and canvas size
+zoom_preview = ZoomPreview(shape_tiles)  # Scaled canvas shown while a new zoom rasterizes
+history = History()  # Undo/redo of edits to shapes (Ctrl+Z / Ctrl+Y)
+scene_path = None  # File the scene was opened from (Ctrl+S saves back to it)
 
-# Zoom settings
-zoom_level = DEFAULT_ZOOM
+# Canvas picking
+hovered_shape = None
+selected_shape = None
+
+# Canvas drag: a left press selects on release unless it moved past PAN_DRAG_THRESHOLD_PX
+drag_start = None  # Where the button went down on the canvas
+drag_last = None  # Position the view was last panned to, None until the press turns into a pan
 
 # Scroll state for panel
 panel_scroll_offset = 0
@@ -58,28 +77,71 @@ active_field = None
 # =====================
 # Helpers Functions
 # =====================
+def init_display():
+    """Start the display and font subsystems only and open the window at half the desktop size"""
+    os.environ['SDL_VIDEO_CENTERED'] = '1'
+    pygame.display.init()
+    pygame.font.init()
+    info = pygame.display.Info()
+    update_window_size(info.current_w // 2, info.current_h // 2)
+    pygame.display.set_caption("Professional Drawing Program - Input Based")
+
+
+def prewarm_assets():
+    """Fill the font, gradient and grid caches on a background thread while the first frame is drawn
+
+    Each step takes zoom_preview.lock, which the main loop holds for the
+    whole frame, so the steps run before the first frame or in its idle
+    wait and never race it for the caches. A step the first frame already
+    did only hits the caches.
+    """
+    scratch = pygame.Surface((WIDTH, HEIGHT), 0, screen)
+
+    def fonts():
+        for size in (FONT_LARGE, FONT_MEDIUM, FONT_NORMAL, FONT_SMALL, FONT_TINY, 16):  # 16: point labels
+            get_font(size)
+
+    def panel():
+        draw_input_panel(scratch, CANVAS_WIDTH, HEIGHT, current_tool, current_color,
+                         input_fields, active_field, viewport.zoom_level, shapes, panel_scroll_offset)
+
+    def grid():
+        center_x, center_y, zoom_level = viewport.view  # Read late: an opened scene may set the zoom
+        draw_grid(scratch, CANVAS_WIDTH, center_x, center_y, HEIGHT, zoom_level)
+
+    def run():
+        for step in (fonts, panel, grid):
+            with zoom_preview.lock:
+                if scratch.get_size() == (WIDTH, HEIGHT):  # Stop once the window was resized
+                    step()
+
+    threading.Thread(target=run, name="prewarm", daemon=True).start()
+
+
 def update_window_size(w, h):
     """Update window dimensions"""
-    global WIDTH, HEIGHT, CANVAS_WIDTH, center_x, center_y, screen
+    global WIDTH, HEIGHT, CANVAS_WIDTH, screen
     WIDTH, HEIGHT = w, h
     screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
     CANVAS_WIDTH = WIDTH - INPUT_PANEL_WIDTH
-    center_x = CANVAS_WIDTH // 2
-    center_y = HEIGHT // 2
+    viewport.resize(CANVAS_WIDTH, HEIGHT)
+    zoom_preview.cancel()  # The kept canvas no longer matches the window
+    invalidate_grid_cache()
+    damage.invalidate_all()
 
 
 def handle_keyboard(event):
     """Handle keyboard shortcuts"""
-    global zoom_level, active_field, input_fields, shapes
+    global active_field, input_fields, shapes, selected_shape
 
     if event.key == pygame.K_RETURN:
         # ENTER -> create shape using Factory
         shape = create_shape_from_input(
             current_tool, input_fields, current_color,
-            center_x, center_y, zoom_level
+            *viewport.view
         )
         if shape:
-            shapes.append(shape)
+            history.append(shapes, [shape])
             reset_inputs()
 
     elif event.key == pygame.K_TAB and active_field:
@@ -93,19 +155,56 @@ def handle_keyboard(event):
 
     elif event.key == pygame.K_PLUS or event.key == pygame.K_EQUALS:
         # + or = -> zoom in
-        zoom_level = min(zoom_level + ZOOM_STEP, MAX_ZOOM)
+        viewport.zoom_in()
 
     elif event.key == pygame.K_MINUS and not active_field:
         # - -> zoom out ONLY if not typing
-        zoom_level = max(zoom_level - ZOOM_STEP, MIN_ZOOM)
+        viewport.zoom_out()
 
     elif event.key == pygame.K_F5:
-        # F5 -> reset zoom
-        zoom_level = DEFAULT_ZOOM
+        # F5 -> reset zoom and pan
+        viewport.reset()
+
+    elif event.key == pygame.K_F3:
+        # F3 -> toggle frame timing and its overlay
+        profiler.set_enabled(not profiler.enabled)
+
+    elif event.key == pygame.K_F4:
+        # F4 -> write the recorded frame traces
+        save_profile()
+
+    elif event.key == pygame.K_s and pygame.key.get_mods() & pygame.KMOD_CTRL:
+        # CTRL + S -> save the scene
+        path = scene_path or DEFAULT_SCENE_FILE
+        try:
+            save_scene(path, shapes, viewport.zoom_level)
+        except (OSError, ValueError) as e:
+            print(f"Could not save {path}: {e}")
+        else:
+            print(f"Saved {len(shapes)} shapes to {path}")
 
     elif event.key == pygame.K_DELETE and pygame.key.get_mods() & pygame.KMOD_CTRL:
         # CTRL + DELETE -> clear all shapes
-        shapes.clear()
+        history.clear(shapes)
+        selected_shape = None
+
+    elif event.key == pygame.K_DELETE and selected_shape is not None:
+        # DELETE -> delete the selected shape
+        edit_selected(history.delete)
+        selected_shape = None
+
+    elif event.key == pygame.K_z and pygame.key.get_mods() & pygame.KMOD_CTRL:
+        # CTRL + Z -> undo (CTRL + SHIFT + Z -> redo)
+        if pygame.key.get_mods() & pygame.KMOD_SHIFT:
+            history.redo(shapes)
+        else:
+            history.undo(shapes)
+        selected_shape = None
+
+    elif event.key == pygame.K_y and pygame.key.get_mods() & pygame.KMOD_CTRL:
+        # CTRL + Y -> redo
+        history.redo(shapes)
+        selected_shape = None
 
     elif event.unicode.isdigit() or event.unicode == '.' or event.unicode == '-':
         # Input numbers, dot or minus into active field
@@ -113,6 +212,101 @@ def handle_keyboard(event):
             input_fields[active_field] += event.unicode
 
 
+def pick_shape(pos):
+    """Topmost shape whose outline is within PICK_TOLERANCE_PX of a canvas position, or None"""
+    x, y = screen_to_world(pos[0], pos[1], *viewport.view)
+    return shapes.pick(x, y, PICK_TOLERANCE_PX / viewport.scale)
+
+
+def drag_canvas(pos):
+    """Pan along with a canvas drag; a left press pans only once it moves past PAN_DRAG_THRESHOLD_PX"""
+    global drag_last
+    if drag_start is None:
+        return
+    if drag_last is None:
+        if max(abs(pos[0] - drag_start[0]), abs(pos[1] - drag_start[1])) <= PAN_DRAG_THRESHOLD_PX:
+            return
+        drag_last = drag_start
+    viewport.pan(pos[0] - drag_last[0], pos[1] - drag_last[1])
+    drag_last = pos
+
+
+def edit_selected(action, *args):
+    """Apply a history edit (delete, recolor) to the selected shape"""
+    try:
+        action(shapes, shapes.index_of(selected_shape), *args)
+    except ValueError as e:
+        print(f"Cannot edit shape: {e}")
+
+
+def open_scene(path):
+    """Replace the canvas contents with a scene file (binary files load lazily)"""
+    global shapes, scene_path
+    store = None if path.endswith(SCENE_FILE_EXT) else (
+        ColumnarScene() if SCENE_STORE == "columnar" else Scene()
+    )
+    shapes, file_zoom = load_scene(path, store)
+    history.reset()
+    if file_zoom is not None:
+        viewport.zoom_at(file_zoom)
+    scene_path = path
+
+
+def import_file(path):
+    """Append the shapes of a CSV/TSV file to the canvas in one batch"""
+    batch, rejected = import_shapes(path, current_color)
+    for line, reason in rejected[:20]:
+        print(f"{path}:{line}: rejected - {reason}")
+    if len(rejected) > 20:
+        print(f"{path}: ... {len(rejected) - 20} more rows rejected")
+    history.append(shapes, batch)
+    print(f"Imported {len(batch)} shapes from {path}")
+
+
+def open_dropped_file(path):
+    """Import a dropped CSV/TSV file, or open a dropped scene file"""
+    try:
+        if path.lower().endswith(IMPORT_FILE_EXTS):
+            import_file(path)
+        else:
+            open_scene(path)
+    except (OSError, ValueError) as e:
+        print(f"Could not open {path}: {e}")
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Professional Drawing Program")
+    parser.add_argument("scene", nargs="?", help="scene file to open (.pds or .json)")
+    parser.add_argument("--import", dest="imports", action="append", default=[], metavar="FILE",
+                        help="append shapes from a CSV/TSV file (repeatable)")
+    parser.add_argument("--profile", action="store_true",
+                        help="start with the frame profiler on (F3 toggles it)")
+    parser.add_argument("--tile-workers", type=int, default=TILE_WORKERS, metavar="N",
+                        help=f"rasterize shape tiles on N worker processes (default: {TILE_WORKERS}, "
+                             "0 renders them in this process)")
+    parser.add_argument("--backend", choices=BACKENDS, default=RENDER_BACKEND,
+                        help=f"shape rasterizer (default: {RENDER_BACKEND}; numpy draws whole batches at once)")
+    parser.add_argument("--measure-startup", action="store_true",
+                        help="print the time to the first complete frame and exit")
+    args = parser.parse_args(argv)
+    if args.tile_workers < 0:
+        parser.error("tile-workers must be >= 0")
+    return args
+
+
+def save_profile():
+    """Write the profiler trace as JSON and as Chrome trace events"""
+    try:
+        profiler.export_json(PROFILE_TRACE_FILE)
+        profiler.export_chrome_trace(PROFILE_CHROME_FILE)
+    except OSError as e:
+        print(f"Could not save the profile: {e}")
+    else:
+        print(f"Saved {min(profiler.frames, PROFILER_TRACE_FRAMES)} frames to "
+              f"{PROFILE_TRACE_FILE} and {PROFILE_CHROME_FILE}")
+
+
 def reset_inputs():
     """Reset input fields for the current tool"""
     global input_fields, active_field
@@ -121,11 +315,39 @@ def reset_inputs():
 
 def main():
     """Main game loop"""
-    global current_tool, current_color, zoom_level, active_field, input_fields
-    global panel_scroll_offset, shapes, CANVAS_WIDTH
+    global current_tool, current_color, active_field, input_fields, drag_start, drag_last
+    global panel_scroll_offset, shapes, CANVAS_WIDTH, hovered_shape, selected_shape
+    
+    imported = time.perf_counter()
+    args = parse_args()
+    init_display()
+    window_open = time.perf_counter()
+    if args.profile:
+        profiler.set_enabled(True)
+    set_backend(args.backend)  # Before the tile pool starts, so its workers use it too
+    if args.tile_workers and SHAPE_TILES:
+        shape_tiles.pool = TilePool(args.tile_workers)  # Forked before any other thread runs
+    prewarm_assets()
+    if args.scene:
+        open_scene(args.scene)
+    for path in args.imports:
+        import_file(path)
+    
+    drawn_scene = shapes
+    drawn_shapes = 0
+    drawn_generation = shapes.generation
+    drawn_edits = len(shapes.edits)
+    drawn_view = viewport.view
+    drawn_size = (CANVAS_WIDTH, HEIGHT)
+    drawn_highlights = []
+    hover_pos = None  # Last cursor position over the window (picked once per frame)
+    picked_key = None
     
     running = True
     while running:
+        profiler.begin_frame()
+        # The zoom preview's worker only touches the scene while the frame idles
+        zoom_preview.lock.acquire()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
@@ -136,6 +358,16 @@ def main():
             elif event.type == pygame.KEYDOWN:
                 handle_keyboard(event)
 
+            elif event.type == pygame.DROPFILE:
+                open_dropped_file(event.file)
+
+            elif event.type == pygame.MOUSEMOTION:
+                hover_pos = event.pos
+                drag_canvas(event.pos)
+
+            elif event.type == pygame.WINDOWLEAVE:
+                hover_pos = None
+
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_pos = pygame.mouse.get_pos()
 
@@ -144,20 +376,26 @@ def main():
                     if mouse_pos[0] >= CANVAS_WIDTH:
                         panel_scroll_offset = max(0, panel_scroll_offset - 30)
                     else:
-                        zoom_level = min(zoom_level + ZOOM_STEP, MAX_ZOOM)
+                        viewport.zoom_in(mouse_pos)
 
                 elif event.button == 5:  # wheel down
                     if mouse_pos[0] >= CANVAS_WIDTH:
                         panel_scroll_offset += 30
                     else:
-                        zoom_level = max(zoom_level - ZOOM_STEP, MIN_ZOOM)
+                        viewport.zoom_out(mouse_pos)
 
-                elif event.button == 1:  # left click
+                elif event.button == 1 and mouse_pos[0] < CANVAS_WIDTH:  # left press on canvas
+                    drag_start, drag_last = mouse_pos, None  # Select on release, or pan once dragged
+
+                elif event.button == 2 and mouse_pos[0] < CANVAS_WIDTH:  # middle drag always pans
+                    drag_start = drag_last = mouse_pos
+
+                elif event.button == 1:  # left click on panel
                     tool, color, field = handle_panel_click(
                         mouse_pos, CANVAS_WIDTH, HEIGHT,
                         current_tool, input_fields,
                         panel_scroll_offset, shapes,
-                        center_x, center_y, zoom_level
+                        *viewport.view
                     )
 
                     if tool in ("circle", "ellipse", "line"):
@@ -167,52 +405,154 @@ def main():
                     elif tool == "draw_shape":
                         shape = create_shape_from_input(
                             current_tool, input_fields,
-                            current_color, center_x,
-                            center_y, zoom_level
+                            current_color, *viewport.view
                         )
                         if shape:
-                            shapes.append(shape)
+                            history.append(shapes, [shape])
                             reset_inputs()
 
                     elif tool == "clear_all":
-                        shapes.clear()
+                        history.clear(shapes)
+                        selected_shape = None
 
                     elif tool == "zoom_in":
-                        zoom_level = min(zoom_level + ZOOM_STEP, MAX_ZOOM)
+                        viewport.zoom_in()
 
                     elif tool == "zoom_out":
-                        zoom_level = max(zoom_level - ZOOM_STEP, MIN_ZOOM)
+                        viewport.zoom_out()
 
                     elif tool == "reset_zoom":
-                        zoom_level = DEFAULT_ZOOM
+                        viewport.reset()
 
                     if field:
                         active_field = field
 
                     if color:
                         current_color = color
+                        if selected_shape is not None:
+                            edit_selected(history.recolor, color)
+
+            elif event.type == pygame.MOUSEBUTTONUP and event.button in (1, 2) and drag_start is not None:
+                if event.button == 1 and drag_last is None:  # A click, not a pan
+                    selected_shape = pick_shape(drag_start)
+                drag_start = drag_last = None
+
+        profiler.mark("events")
 
         # =====================
         # Rendering
         # =====================
-        screen.fill(CANVAS_BG)
+        center_x, center_y, zoom_level = view = viewport.view
+        replaced = shapes is not drawn_scene or shapes.generation != drawn_generation
+        edited = replaced or len(shapes) != drawn_shapes or len(shapes.edits) != drawn_edits
+        if view != drawn_view or not DIRTY_RECTS:
+            damage.invalidate_all()
+        if replaced or (len(shapes.edits) != drawn_edits and not DISPLAY_LIST):
+            # Another scene was opened or it was cleared, or a shape was removed or changed with no
+            # display list to report what that touched - the whole canvas changed
+            damage.add(pygame.Rect(0, 0, CANVAS_WIDTH, HEIGHT))
+            drawn_shapes = 0
+        if shapes is not drawn_scene:
+            selected_shape = None
+
+        # A zoom or pan first shows the last frame scaled and moved, until its tiles are rasterized
+        if edited:
+            zoom_preview.cancel()  # The kept frame is out of date: draw the scene exactly now
+        elif ZOOM_PREVIEW and SHAPE_TILES and view != drawn_view and (CANVAS_WIDTH, HEIGHT) == drawn_size:
+            zoom_preview.begin(screen, shapes, CANVAS_WIDTH, HEIGHT, center_x, center_y,
+                               zoom_level, drawn_view)
+        if zoom_preview.active and zoom_preview.ready(CANVAS_WIDTH, HEIGHT, center_x, center_y, zoom_level):
+            zoom_preview.cancel()
+            damage.add(pygame.Rect(0, 0, CANVAS_WIDTH, HEIGHT))  # Swap the exact frame in
 
-        draw_grid(screen, CANVAS_WIDTH, center_x, center_y, HEIGHT, zoom_level)
+        screen.fill(CANVAS_BG)
 
-        for shape in shapes:
-            shape.draw(screen, center_x, center_y, zoom_level)
+        if zoom_preview.active:
+            # Grid, shapes and labels all come from the scaled copy of the last frame
+            profiler.mark("grid")
+            zoom_preview.draw(screen, CANVAS_WIDTH, HEIGHT, center_x, center_y, zoom_level)
+            profiler.mark("shapes")
+            profiler.mark("labels")
+        else:
+            draw_grid(screen, CANVAS_WIDTH, center_x, center_y, HEIGHT, zoom_level, damage)
+            profiler.mark("grid")
+
+            # Only shapes intersecting the visible world rect are drawn;
+            # overlapping coordinate labels are dropped by the label placer
+            if SHAPE_TILES:
+                # Geometry comes from the tile cache, labels from a labels-only pass
+                shape_tiles.draw(screen, shapes, CANVAS_WIDTH, HEIGHT, center_x, center_y,
+                                 zoom_level, damage)
+            if DISPLAY_LIST:
+                for dirty in display_list.update(screen, shapes, CANVAS_WIDTH, HEIGHT, center_x, center_y,
+                                                 zoom_level, geometry=not SHAPE_TILES):
+                    damage.add(dirty)  # Shapes appended, removed or changed, or everything after a rebuild
+                if not SHAPE_TILES:
+                    display_list.draw(screen)
+                profiler.mark("shapes")
+                display_list.draw_labels(screen)
+                profiler.mark("labels")
+            else:
+                labels = LabelPlacer(geometry=not SHAPE_TILES)
+                for dirty in shapes.draw_batch(screen, CANVAS_WIDTH, HEIGHT, center_x, center_y,
+                                               zoom_level, CULL_MARGIN_PX, since=drawn_shapes,
+                                               labels=labels):
+                    damage.add(dirty)  # Newly appended shape
+                profiler.mark("shapes")
+                labels.flush()
+                profiler.mark("labels")
+
+        # Re-pick only when the cursor, the scene or the zoom changed
+        hover_key = (hover_pos, shapes, shapes.generation, len(shapes), len(shapes.edits), zoom_level,
+                     center_x, center_y)
+        if hover_key != picked_key:
+            inside = hover_pos is not None and hover_pos[0] < CANVAS_WIDTH
+            hovered_shape = pick_shape(hover_pos) if inside else None
+            picked_key = hover_key
+        highlights = [draw_highlight(screen, shape_screen_rect(shape, center_x, center_y, zoom_level),
+                                     color, CANVAS_WIDTH, HEIGHT)
+                      for shape, color in ((hovered_shape, PICK_HOVER_COLOR),
+                                           (selected_shape, PICK_SELECT_COLOR))
+                      if shape is not None]
+        if highlights != drawn_highlights:
+            for rect in drawn_highlights + highlights:
+                damage.add(rect)
+        drawn_highlights = highlights
+        profiler.mark("picking")
 
         panel_scroll_offset = draw_input_panel(
             screen, CANVAS_WIDTH, HEIGHT,
             current_tool, current_color,
             input_fields, active_field,
             zoom_level, shapes,
-            panel_scroll_offset
+            panel_scroll_offset, damage
         )
-
-        pygame.display.flip()
+        draw_profiler_overlay(screen, profiler, profiler.enabled, damage)
+        profiler.mark("panel")
+
+        drawn_scene = shapes
+        drawn_shapes = len(shapes)
+        drawn_generation = shapes.generation
+        drawn_edits = len(shapes.edits)
+        drawn_view = view
+        drawn_size = (CANVAS_WIDTH, HEIGHT)
+        damage.present()
+        profiler.mark("present")
+        if args.measure_startup:
+            now = time.perf_counter()
+            print(f"First frame {(now - _started) * 1000:.1f} ms after start: imports "
+                  f"{(imported - _started) * 1000:.1f} ms, window {(window_open - imported) * 1000:.1f} ms, "
+                  f"scene and first frame {(now - window_open) * 1000:.1f} ms")
+            running = False
+        zoom_preview.lock.release()
         clock.tick(60)
+        profiler.mark("idle")
+        profiler.end_frame()
 
+    zoom_preview.cancel()
+    if shape_tiles.pool is not None:
+        with zoom_preview.lock:  # The preview worker may still be using the pool
+            shape_tiles.pool.close()
     pygame.quit()
     sys.exit()
 
@@ -0,0 +1,152 @@
+"""
+Headless Batch Renderer
+Renders scene files to PNG without opening a window.
+
+    python render.py scenes/*.json --out thumbs --size 800x600 --jobs 8
+"""
+
+import argparse
+import os
+import sys
+from multiprocessing import Pool
+
+# Must be set before pygame creates any video state
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+from config import *
+from drawing import draw_grid, LabelPlacer, Viewport
+from shapes import BACKENDS, set_backend
+from utils.scene_io import load_scene
+
+
+# =====================
+# Rendering
+# =====================
+def render_scene(shapes, width, height, zoom_level=DEFAULT_ZOOM, center=(0.0, 0.0)):
+    """Render grid and shapes into a new off-screen Surface (canvas only, no panel)
+
+    center is the world point shown in the middle of the image.
+    """
+    surface = pygame.Surface((width, height))
+    center_x, center_y, zoom_level = Viewport(width, height, zoom_level, *center).view
+
+    surface.fill(CANVAS_BG)
+    draw_grid(surface, width, center_x, center_y, height, zoom_level)
+
+    labels = LabelPlacer()
+    shapes.draw_batch(surface, width, height, center_x, center_y, zoom_level,
+                      CULL_MARGIN_PX, labels=labels)
+    labels.flush()
+    return surface
+
+
+def output_path(scene_path, out_dir):
+    """PNG path for a scene file (next to it unless out_dir is given)"""
+    base = os.path.splitext(os.path.basename(scene_path))[0] + ".png"
+    return os.path.join(out_dir or os.path.dirname(scene_path), base)
+
+
+def render_file(job):
+    """Render one scene file to PNG; returns (scene path, error message or None)"""
+    scene_path, out_dir, width, height, zoom_level, center = job
+    try:
+        shapes, scene_zoom = load_scene(scene_path)
+        if zoom_level is None:
+            zoom_level = scene_zoom if scene_zoom is not None else DEFAULT_ZOOM
+        surface = render_scene(shapes, width, height, zoom_level, center)
+        pygame.image.save(surface, output_path(scene_path, out_dir))
+    except (OSError, ValueError, pygame.error) as e:
+        return scene_path, str(e)
+    return scene_path, None
+
+
+def _init_worker(backend=RENDER_BACKEND):
+    """Per-process pygame setup (fonts only - no display is needed)"""
+    pygame.font.init()
+    set_backend(backend)
+
+
+# =====================
+# Command Line
+# =====================
+def parse_size(text):
+    """'800x600' -> (800, 600)"""
+    try:
+        width, height = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"size must look like 800x600, got {text!r}") from None
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError("size must be positive")
+    return width, height
+
+
+def parse_point(text):
+    """'12.5,-3' -> (12.5, -3.0)"""
+    try:
+        x, y = (float(part) for part in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"center must look like 12.5,-3, got {text!r}") from None
+    return x, y
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Render scene files to PNG without a window.")
+    parser.add_argument("scenes", nargs="+", help="scene files (.json)")
+    parser.add_argument("-o", "--out", default=None,
+                        help="output directory (default: next to each scene file)")
+    parser.add_argument("-s", "--size", type=parse_size, default=(800, 600),
+                        help="image size as WIDTHxHEIGHT (default: 800x600)")
+    parser.add_argument("-z", "--zoom", type=float, default=None,
+                        help=f"zoom level (default: the scene's own, else {DEFAULT_ZOOM})")
+    parser.add_argument("-c", "--center", type=parse_point, default=(0.0, 0.0), metavar="X,Y",
+                        help="world point in the middle of the image (default: 0,0)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="worker processes; 0 uses every core (default: 1)")
+    parser.add_argument("--backend", choices=BACKENDS, default=RENDER_BACKEND,
+                        help=f"shape rasterizer (default: {RENDER_BACKEND})")
+    args = parser.parse_args(argv)
+    if args.zoom is not None and not MIN_ZOOM <= args.zoom <= MAX_ZOOM:
+        parser.error(f"zoom must be between {MIN_ZOOM} and {MAX_ZOOM}")
+    if args.jobs < 0:
+        parser.error("jobs must be >= 0")
+    return args
+
+
+def main(argv=None):
+    """Render every scene file; returns the process exit code"""
+    args = parse_args(argv)
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+
+    width, height = args.size
+    jobs = [(path, args.out, width, height, args.zoom, args.center) for path in args.scenes]
+    workers = min(args.jobs or os.cpu_count() or 1, len(jobs))
+
+    if workers <= 1:
+        _init_worker(args.backend)
+        results = map(render_file, jobs)
+    else:
+        # Small chunks keep every core busy even when scene sizes vary
+        pool = Pool(workers, initializer=_init_worker, initargs=(args.backend,))
+        chunksize = max(1, len(jobs) // (workers * 8))
+        results = pool.imap_unordered(render_file, jobs, chunksize)
+
+    failed = 0
+    for scene_path, error in results:
+        if error:
+            failed += 1
+            print(f"error: {scene_path}: {error}", file=sys.stderr)
+
+    if workers > 1:
+        pool.close()
+        pool.join()
+    print(f"Rendered {len(jobs) - failed}/{len(jobs)} scenes")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
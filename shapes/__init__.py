@@ -4,5 +4,13 @@ from .base import Shape
 from .circle import Circle
 from .ellipse import Ellipse
 from .line import Line
+from .scene import Scene
+from .columnar import ColumnarScene, ShapeBatch
+from .mapped import MappedScene, write_mapped_scene
+from .history import History
+from .raster import BACKENDS, set_backend, get_backend
+from .display_list import DisplayList
 
-__all__ = ['Shape', 'Circle', 'Ellipse', 'Line']
+__all__ = ['Shape', 'Circle', 'Ellipse', 'Line', 'Scene', 'ColumnarScene', 'ShapeBatch',
+           'MappedScene', 'write_mapped_scene', 'History', 'BACKENDS', 'set_backend', 'get_backend',
+           'DisplayList']
@@ -1,5 +1,12 @@
 """Base Shape Class"""
 
+from math import floor
+
+import pygame
+from config import WHITE, POINT_RADIUS, CLIP_OVERSIZE_PX
+from drawing.fonts import render_text
+from .clipping import clip_segment, ellipse_arcs
+
 
 class Shape:
     """Base Shape Class"""
@@ -7,5 +14,164 @@ class Shape:
         self.color = color
     
     def draw(self, surface):
-        """Draw shape on surface - override in subclasses"""
+        """Draw shape on surface and return the changed Rect - override in subclasses"""
         pass
+    
+    def bounds(self):
+        """World-space bounding box (xmin, ymin, xmax, ymax) - override in subclasses"""
+        raise NotImplementedError
+
+    def distance(self, x, y):
+        """World-space distance from (x, y) to the outline - override in subclasses"""
+        raise NotImplementedError
+
+
+def pick_topmost(candidates, x, y, tolerance):
+    """Last (topmost) of the draw-ordered candidates whose outline is within tolerance"""
+    for shape in reversed(candidates):
+        if shape.distance(x, y) <= tolerance:
+            return shape
+    return None
+
+
+def union_rects(rects):
+    """Union of the non-empty rects (None when nothing was drawn)"""
+    rects = [rect for rect in rects if rect and rect.width > 0 and rect.height > 0]
+    if not rects:
+        return None
+    return rects[0].unionall(rects[1:])
+
+
+def draw_lod_point(surface, color, screen_x, screen_y, labels=None):
+    """Draw a shape collapsed to its center point (skipped if already covered)"""
+    if labels is not None and not (labels.geometry and labels.claim_point(screen_x, screen_y)):
+        return None
+    return draw_dot(surface, color, screen_x, screen_y, POINT_RADIUS)
+
+
+def draw_dot(surface, color, screen_x, screen_y, radius):
+    """pygame.draw.circle filled dot; ones far off the clip rect are skipped"""
+    if far_outside(surface.get_clip(), screen_x, screen_y):
+        return None
+    return pygame.draw.circle(surface, color, (screen_x, screen_y), radius, 0)
+
+
+def far_outside(rect, x, y):
+    """True when (x, y) lies more than CLIP_OVERSIZE_PX outside rect
+
+    Dots and labels anchored there cannot reach rect, and pygame would
+    wrap coordinates past 32 bits around onto it, so they are culled.
+    """
+    return (x < rect.left - CLIP_OVERSIZE_PX or x > rect.right + CLIP_OVERSIZE_PX
+            or y < rect.top - CLIP_OVERSIZE_PX or y > rect.bottom + CLIP_OVERSIZE_PX)
+
+
+def draw_ring(surface, color, screen_x, screen_y, radius, width):
+    """pygame.draw.circle outline; oversized ones only trace the arcs inside the clip rect"""
+    if radius <= CLIP_OVERSIZE_PX or _inside_clip(surface, screen_x, screen_y, radius, radius):
+        return pygame.draw.circle(surface, color, (screen_x, screen_y), radius, width)
+    return _draw_arcs(surface, color, screen_x - 0.25, screen_y - 0.25, radius - width / 2, radius - width / 2,
+                      width)
+
+
+def draw_oval(surface, color, screen_x, screen_y, rx, ry, width):
+    """pygame.draw.ellipse outline around a center; oversized ones only trace the visible arcs"""
+    if max(rx, ry) <= CLIP_OVERSIZE_PX or _inside_clip(surface, screen_x, screen_y, rx, ry):
+        return pygame.draw.ellipse(surface, color, pygame.Rect(screen_x - rx, screen_y - ry, rx * 2, ry * 2),
+                                   width)
+    # pygame.draw.ellipse centers the outline between the rect's middle pixels
+    inset = width / 2 + 0.5
+    return _draw_arcs(surface, color, screen_x - 0.5, screen_y - 0.5, rx - inset, ry - inset, width)
+
+
+def draw_segment(surface, color, start, end, width):
+    """pygame.draw.line; long lines are first cut down to the clip rect"""
+    (x1, y1), (x2, y2) = start, end
+    if max(abs(x2 - x1), abs(y2 - y1)) <= CLIP_OVERSIZE_PX:
+        return pygame.draw.line(surface, color, start, end, width)
+    left, top, right, bottom = _clip_box(surface, width)
+    clipped = clip_segment(x1, y1, x2, y2, left, top, right, bottom)
+    if clipped is None:
+        return None
+    x1, y1, x2, y2 = (round(value) for value in clipped)
+    return pygame.draw.line(surface, color, (x1, y1), (x2, y2), width)
+
+
+def _inside_clip(surface, screen_x, screen_y, rx, ry):
+    clip = surface.get_clip()
+    return (screen_x - rx >= clip.left and screen_y - ry >= clip.top
+            and screen_x + rx <= clip.right and screen_y + ry <= clip.bottom)
+
+
+def _clip_box(surface, width):
+    """Clip rect grown past the stroke width, so clipped strokes end off the visible area"""
+    clip = surface.get_clip()
+    pad = width + 1
+    return clip.left - pad, clip.top - pad, clip.right + pad, clip.bottom + pad
+
+
+def _draw_arcs(surface, color, x, y, rx, ry, width):
+    """The visible arcs of the ellipse through the middle of an outline's stroke, as wide polylines
+
+    pygame strokes outlines inward from the radius and widens lines
+    toward +x/+y, so callers pass the stroke's centerline nudged up and
+    left; the result lands within a pixel of pygame's own outline. A
+    stroke as wide as the radius leaves no centerline, so radii are kept
+    at 0.5 or more.
+    """
+    arcs = ellipse_arcs(x, y, max(rx, 0.5), max(ry, 0.5), *_clip_box(surface, width))
+    return union_rects([pygame.draw.lines(surface, color, False, [(floor(px), floor(py)) for px, py in points],
+                                          width) for points in arcs])
+
+
+def draws_geometry(labels):
+    """False while a placer is running a labels-only pass"""
+    return labels is None or labels.geometry
+
+
+def draws_labels(labels):
+    """False while a placer is running a geometry-only pass (tile rendering)"""
+    return labels is None or labels.labels
+
+
+def draw_center_label(surface, text, color, screen_x, text_y, labels=None):
+    """Draw a label centered above a shape (circle/ellipse style)"""
+    if not draws_labels(labels) or far_outside(surface.get_clip(), screen_x, text_y):
+        return None
+    text_surface = render_text(text, 18, WHITE)
+    text_x = screen_x - text_surface.get_width() // 2
+    
+    # Modern label background
+    bg_rect = text_surface.get_rect(topleft=(text_x - 4, text_y - 2))
+    bg_rect.inflate_ip(8, 6)
+    return _place_label(surface, color, bg_rect, text_surface, (text_x, text_y), 5, labels)
+
+
+def draw_point_label(surface, text, color, point_x, point_y, labels=None):
+    """Draw a label up and to the right of a point (line endpoint style)"""
+    if not draws_labels(labels) or far_outside(surface.get_clip(), point_x, point_y):
+        return None
+    text_surface = render_text(text, 16, WHITE)
+    label_x = point_x + 8
+    label_y = point_y - 22
+    bg_rect = text_surface.get_rect(topleft=(label_x - 3, label_y - 2))
+    bg_rect.inflate_ip(6, 4)
+    return _place_label(surface, color, bg_rect, text_surface, (label_x, label_y), 4, labels)
+
+
+def _place_label(surface, color, bg_rect, text_surface, text_pos, radius, labels):
+    """Draw a label now, or queue it on the placer for the label pass"""
+    if labels is None:
+        return draw_label_box(surface, color, bg_rect, text_surface, text_pos, radius)
+    if not labels.place(bg_rect):
+        return None  # Collides with a label already placed this frame
+    labels.defer(draw_label_box, surface, color, bg_rect, text_surface, text_pos, radius)
+    return bg_rect.clip(surface.get_rect())
+
+
+def draw_label_box(surface, color, bg_rect, text_surface, text_pos, radius):
+    """Draw a rounded, bordered label background with its text"""
+    dirty = pygame.draw.rect(surface, color, bg_rect, border_radius=radius)
+    pygame.draw.rect(surface, WHITE, bg_rect, 2, border_radius=radius)
+    surface.blit(text_surface, text_pos)
+    return dirty
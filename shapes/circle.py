@@ -1,8 +1,10 @@
 """Circle Shape Class"""
 
-import pygame
-from .base import Shape
-from config import PIXELS_PER_UNIT, POINT_RADIUS, WHITE
+from math import hypot
+
+from .base import Shape, union_rects, draw_center_label, draw_lod_point, draws_geometry, draw_ring, draw_dot
+from config import POINT_RADIUS, LOD_POINT_SIZE_PX, LABEL_MIN_SIZE_PX
+from drawing.viewport import coordinate_to_screen, screen_length
 
 
 class Circle(Shape):
@@ -16,30 +18,44 @@ class Circle(Shape):
         self.original_coords = original_coords
         self.zoom_level = zoom_level
     
-    def draw(self, surface, center_x, center_y, zoom_level=1.0):
+    def bounds(self):
+        r = abs(self.radius)
+        return (self.original_center_x - r, self.original_center_y - r,
+                self.original_center_x + r, self.original_center_y + r)
+    
+    def distance(self, x, y):
+        dx, dy = x - self.original_center_x, y - self.original_center_y
+        return abs(hypot(dx, dy) - abs(self.radius))
+    
+    def draw(self, surface, center_x, center_y, zoom_level=1.0, labels=None):
         if self.radius > 0:
             # Recalculate screen position based on current zoom
-            screen_x = center_x + int(self.original_center_x * PIXELS_PER_UNIT * zoom_level)
-            screen_y = center_y - int(self.original_center_y * PIXELS_PER_UNIT * zoom_level)
+            screen_x, screen_y = coordinate_to_screen(self.original_center_x, self.original_center_y,
+                                                      center_x, center_y, zoom_level)
             
             # Convert radius from coordinate units to pixels
-            scaled_radius = int(self.radius * PIXELS_PER_UNIT * zoom_level)
-            pygame.draw.circle(surface, self.color, (screen_x, screen_y), scaled_radius, 2)
-            
-            # Draw center point
-            pygame.draw.circle(surface, self.color, (screen_x, screen_y), POINT_RADIUS, 0)
-            
-            # Draw coordinates label with modern styling
-            if self.original_coords:
-                label_font = pygame.font.Font(None, 18)
-                coord_text = f"C({self.original_coords[0]},{self.original_coords[1]})"
-                text_surface = label_font.render(coord_text, True, WHITE)
-                text_x = screen_x - text_surface.get_width() // 2
-                text_y = screen_y - scaled_radius - 25
-                
-                # Modern label background
-                bg_rect = text_surface.get_rect(topleft=(text_x - 4, text_y - 2))
-                bg_rect.inflate_ip(8, 6)
-                pygame.draw.rect(surface, self.color, bg_rect, border_radius=5)
-                pygame.draw.rect(surface, WHITE, bg_rect, 2, border_radius=5)
-                surface.blit(text_surface, (text_x, text_y))
+            scaled_radius = screen_length(self.radius, zoom_level)
+            return draw_circle_screen(surface, self.color, screen_x, screen_y,
+                                      scaled_radius, self.original_coords, labels)
+        return None
+
+
+def draw_circle_screen(surface, color, screen_x, screen_y, scaled_radius, original_coords, labels=None):
+    """Draw a circle already transformed to screen space (with level of detail)"""
+    if scaled_radius * 2 < LOD_POINT_SIZE_PX:
+        return draw_lod_point(surface, color, screen_x, screen_y, labels)
+    
+    dirty = []
+    if draws_geometry(labels):
+        dirty.append(draw_ring(surface, color, screen_x, screen_y, scaled_radius, 2))
+        
+        # Draw center point
+        dirty.append(draw_dot(surface, color, screen_x, screen_y, POINT_RADIUS))
+    
+    # Draw coordinates label with modern styling
+    if original_coords and scaled_radius * 2 >= LABEL_MIN_SIZE_PX:
+        coord_text = f"C({original_coords[0]},{original_coords[1]})"
+        dirty.append(draw_center_label(surface, coord_text, color, screen_x,
+                                       screen_y - scaled_radius - 25, labels))
+    
+    return union_rects(dirty)
@@ -0,0 +1,81 @@
+"""Analytic clipping of lines and ellipse outlines to a screen box"""
+
+from math import acos, asin, ceil, cos, pi, sin
+
+TAU = 2 * pi
+
+
+def clip_segment(x1, y1, x2, y2, left, top, right, bottom):
+    """Part of the segment inside the box as (x1, y1, x2, y2), or None when it misses (Liang-Barsky)"""
+    dx, dy = x2 - x1, y2 - y1
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, x1 - left), (dx, right - x1), (-dy, y1 - top), (dy, bottom - y1)):
+        if p == 0:
+            if q < 0:
+                return None  # Parallel to this edge and outside it
+            continue
+        t = q / p
+        if p < 0:
+            if t > t1:
+                return None
+            t0 = max(t0, t)
+        else:
+            if t < t0:
+                return None
+            t1 = min(t1, t)
+    return (x1 + t0 * dx, y1 + t0 * dy, x1 + t1 * dx, y1 + t1 * dy)
+
+
+def ellipse_arcs(cx, cy, rx, ry, left, top, right, bottom, tolerance=0.5):
+    """Polylines tracing the parts of an axis-aligned ellipse outline inside the box
+
+    The outline is split at the angles where it crosses the box's edge
+    lines; only the pieces whose midpoint lies inside are flattened.
+    Chords stay within tolerance pixels of the curve, so the point count
+    depends on the visible arc, not on the radius. An ellipse with a
+    radius <= 0 is flattened onto its other axis (the clipped segment).
+    """
+    if rx <= 0 or ry <= 0:
+        rx, ry = max(rx, 0), max(ry, 0)
+        if not rx and not ry:
+            return []
+        segment = clip_segment(cx - rx, cy - ry, cx + rx, cy + ry, left, top, right, bottom)
+        return [[segment[:2], segment[2:]]] if segment else []
+
+    angles = [0.0, TAU]
+    for x in (left, right):
+        c = (x - cx) / rx
+        if -1 < c < 1:
+            a = acos(c)
+            angles += [a, TAU - a]
+    for y in (top, bottom):
+        s = (y - cy) / ry
+        if -1 < s < 1:
+            a = asin(s)
+            angles += [a % TAU, pi - a]
+    angles.sort()
+
+    # Sagitta of a unit-circle chord spanning step, scaled by the longer radius
+    step = min(2 * acos(max(1 - tolerance / max(rx, ry), -1.0)), pi / 8)
+    arcs = []
+    first_start = previous_end = None
+    for a0, a1 in zip(angles, angles[1:]):
+        if a1 - a0 <= 1e-12:
+            continue
+        mid = (a0 + a1) / 2
+        x, y = cx + rx * cos(mid), cy + ry * sin(mid)
+        if not (left <= x <= right and top <= y <= bottom):
+            continue
+        n = max(ceil((a1 - a0) / step), 1)
+        points = [(cx + rx * cos(a0 + (a1 - a0) * i / n), cy + ry * sin(a0 + (a1 - a0) * i / n))
+                  for i in range(n + 1)]
+        if previous_end == a0:
+            arcs[-1].extend(points[1:])  # Continues the arc before it
+        else:
+            arcs.append(points)
+            if first_start is None:
+                first_start = a0
+        previous_end = a1
+    if len(arcs) > 1 and first_start == 0.0 and previous_end == TAU:
+        arcs[0] = arcs.pop() + arcs[0][1:]  # The last arc runs on through angle 0
+    return arcs
@@ -0,0 +1,617 @@
+"""Columnar (structure-of-arrays) shape store backed by NumPy"""
+
+import numpy as np
+
+from config import PICK_INDEX_TAIL
+from drawing.viewport import screen_lengths
+from utils.coordinates import visible_world_rect
+from utils.spatial_index import SortedCellIndex
+from .base import pick_topmost
+from .edits import EditLog
+from .circle import Circle, draw_circle_screen
+from .ellipse import Ellipse, draw_ellipse_screen
+from .line import Line, draw_line_screen
+from .raster import rasterizes, rasterize_columns
+
+
+# Column layout per shape kind: name -> dtype
+CIRCLE_COLUMNS = {'order': np.int32, 'cx': np.int32, 'cy': np.int32, 'r': np.int32,
+                  'color': np.uint8, 'labelled': np.bool_}
+ELLIPSE_COLUMNS = {'order': np.int32, 'cx': np.int32, 'cy': np.int32, 'rx': np.int32,
+                   'ry': np.int32, 'color': np.uint8, 'labelled': np.bool_}
+LINE_COLUMNS = {'order': np.int32, 'x1': np.int32, 'y1': np.int32, 'x2': np.int32,
+                'y2': np.int32, 'color': np.uint8, 'labelled': np.bool_}
+
+
+class ColumnTable:
+    """Growable set of equally long NumPy columns"""
+    def __init__(self, columns, capacity=1024):
+        self.dtypes = columns
+        self.count = 0
+        self.arrays = {name: np.empty(capacity, dtype) for name, dtype in columns.items()}
+
+    def __len__(self):
+        return self.count
+
+    def reserve(self, extra):
+        """Make room for extra rows, doubling the capacity as needed"""
+        needed = self.count + extra
+        capacity = len(self.arrays['order'])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, array in self.arrays.items():
+            grown = np.empty(capacity, array.dtype)
+            grown[:self.count] = array[:self.count]
+            self.arrays[name] = grown
+
+    def append_rows(self, **values):
+        """Append one or more rows given as scalars or equally long arrays"""
+        n = len(np.atleast_1d(values['order']))
+        self.reserve(n)
+        start, end = self.count, self.count + n
+        for name, array in self.arrays.items():
+            array[start:end] = values[name]
+        self.count = end
+        return start
+
+    def delete_row(self, row):
+        """Remove one row, shifting the rows after it down"""
+        for array in self.arrays.values():
+            array[row:self.count - 1] = array[row + 1:self.count]
+        self.count -= 1
+
+    def insert_row(self, row, values):
+        """Insert one row given as {name: value} before position row"""
+        self.reserve(1)
+        for name, array in self.arrays.items():
+            array[row + 1:self.count + 1] = array[row:self.count]
+            array[row] = values[name]
+        self.count += 1
+
+    def column(self, name):
+        """View of the used part of a column"""
+        return self.arrays[name][:self.count]
+
+    def nbytes(self):
+        """Bytes used by the filled rows"""
+        return sum(np.dtype(dtype).itemsize for dtype in self.dtypes.values()) * self.count
+
+
+# =====================
+# Column helpers (shared with MappedScene)
+# =====================
+KINDS = ('circle', 'ellipse', 'line')
+
+
+def column_bounds(kind, columns):
+    """World-space (xmin, ymin, xmax, ymax) int64 arrays for the rows of one shape kind
+
+    int64 because center +- radius of int32 columns can leave the int32 range.
+    """
+    if kind == 'line':
+        x1, y1, x2, y2 = (np.asarray(columns[name], np.int64) for name in ('x1', 'y1', 'x2', 'y2'))
+        return np.minimum(x1, x2), np.minimum(y1, y2), np.maximum(x1, x2), np.maximum(y1, y2)
+    cx, cy = np.asarray(columns['cx'], np.int64), np.asarray(columns['cy'], np.int64)
+    if kind == 'circle':
+        rx = ry = np.abs(np.asarray(columns['r'], np.int64))
+    else:
+        rx, ry = np.abs(np.asarray(columns['rx'], np.int64)), np.abs(np.asarray(columns['ry'], np.int64))
+    return cx - rx, cy - ry, cx + rx, cy + ry
+
+
+def intersects(kind, columns, xmin, ymin, xmax, ymax):
+    """Boolean mask of the rows whose bounds intersect the world rect"""
+    lo_x, lo_y, hi_x, hi_y = column_bounds(kind, columns)
+    return (hi_x >= xmin) & (lo_x <= xmax) & (hi_y >= ymin) & (lo_y <= ymax)
+
+
+def draw_columns(surface, palette, circles, ellipses, lines, center_x, center_y, zoom_level,
+                 since=None, labels=None):
+    """Draw rows given as per-kind column mappings, in draw order
+
+    Each screen transform is one vectorized step per kind. Returns the
+    dirty rects of rows whose draw-order number is >= since. With the
+    numpy backend the whole batch is rasterized by rasterize_columns().
+    """
+    if rasterizes(surface):
+        return rasterize_columns(surface, palette, circles, ellipses, lines, center_x, center_y,
+                                 zoom_level, since, labels)
+
+    def to_len(values):
+        return screen_lengths(values, zoom_level)
+
+    def to_x(values):
+        return (center_x + to_len(values)).tolist()
+
+    def to_y(values):
+        return (center_y - to_len(values)).tolist()
+
+    # Build (order, draw call) tuples so z-order across kinds is preserved
+    calls = []
+    c, e, l = circles, ellipses, lines
+    for order, sx, sy, sr, r, cx, cy, color, labelled in zip(
+            c['order'].tolist(), to_x(c['cx']), to_y(c['cy']), to_len(c['r']).tolist(),
+            c['r'].tolist(), c['cx'].tolist(), c['cy'].tolist(),
+            c['color'].tolist(), c['labelled'].tolist()):
+        if r > 0:
+            calls.append((order, draw_circle_screen,
+                          (sx, sy, sr, (cx, cy) if labelled else None), color))
+
+    for order, sx, sy, srx, sry, rx, ry, cx, cy, color, labelled in zip(
+            e['order'].tolist(), to_x(e['cx']), to_y(e['cy']), to_len(e['rx']).tolist(), to_len(e['ry']).tolist(),
+            e['rx'].tolist(), e['ry'].tolist(), e['cx'].tolist(), e['cy'].tolist(),
+            e['color'].tolist(), e['labelled'].tolist()):
+        if rx > 0 and ry > 0:
+            calls.append((order, draw_ellipse_screen,
+                          (sx, sy, srx, sry, (cx, cy) if labelled else None), color))
+
+    for order, sx1, sy1, sx2, sy2, x1, y1, x2, y2, color, labelled in zip(
+            l['order'].tolist(), to_x(l['x1']), to_y(l['y1']), to_x(l['x2']), to_y(l['y2']),
+            l['x1'].tolist(), l['y1'].tolist(), l['x2'].tolist(), l['y2'].tolist(),
+            l['color'].tolist(), l['labelled'].tolist()):
+        calls.append((order, draw_line_screen,
+                      (sx1, sy1, sx2, sy2, (x1, y1, x2, y2) if labelled else None), color))
+
+    calls.sort(key=lambda call: call[0])
+    dirty = []
+    for order, draw, args, color in calls:
+        rect = draw(surface, palette[color], *args, labels)
+        if since is not None and order >= since:
+            dirty.append(rect)
+    return dirty
+
+
+# =====================
+# Lightweight shape views
+# =====================
+class CircleView(Circle):
+    """Circle proxy reading its fields from a ColumnarScene row"""
+    __slots__ = ('_table', '_palette', '_row')
+
+    def __init__(self, table, palette, row):
+        self._table = table
+        self._palette = palette
+        self._row = row
+
+    original_center_x = property(lambda self: int(self._table.arrays['cx'][self._row]))
+    original_center_y = property(lambda self: int(self._table.arrays['cy'][self._row]))
+    radius = property(lambda self: int(self._table.arrays['r'][self._row]))
+    color = property(lambda self: self._palette[self._table.arrays['color'][self._row]])
+    zoom_level = property(lambda self: 1.0)
+
+    @property
+    def original_coords(self):
+        if self._table.arrays['labelled'][self._row]:
+            return (self.original_center_x, self.original_center_y)
+        return None
+
+
+class EllipseView(Ellipse):
+    """Ellipse proxy reading its fields from a ColumnarScene row"""
+    __slots__ = ('_table', '_palette', '_row')
+
+    def __init__(self, table, palette, row):
+        self._table = table
+        self._palette = palette
+        self._row = row
+
+    original_center_x = property(lambda self: int(self._table.arrays['cx'][self._row]))
+    original_center_y = property(lambda self: int(self._table.arrays['cy'][self._row]))
+    rx = property(lambda self: int(self._table.arrays['rx'][self._row]))
+    ry = property(lambda self: int(self._table.arrays['ry'][self._row]))
+    color = property(lambda self: self._palette[self._table.arrays['color'][self._row]])
+    zoom_level = property(lambda self: 1.0)
+
+    @property
+    def original_coords(self):
+        if self._table.arrays['labelled'][self._row]:
+            return (self.original_center_x, self.original_center_y)
+        return None
+
+
+class LineView(Line):
+    """Line proxy reading its fields from a ColumnarScene row"""
+    __slots__ = ('_table', '_palette', '_row')
+
+    def __init__(self, table, palette, row):
+        self._table = table
+        self._palette = palette
+        self._row = row
+
+    x1 = property(lambda self: int(self._table.arrays['x1'][self._row]))
+    y1 = property(lambda self: int(self._table.arrays['y1'][self._row]))
+    x2 = property(lambda self: int(self._table.arrays['x2'][self._row]))
+    y2 = property(lambda self: int(self._table.arrays['y2'][self._row]))
+    color = property(lambda self: self._palette[self._table.arrays['color'][self._row]])
+    zoom_level = property(lambda self: 1.0)
+
+    @property
+    def original_coords(self):
+        if self._table.arrays['labelled'][self._row]:
+            return (self.x1, self.y1, self.x2, self.y2)
+        return None
+
+
+class ShapeBatch:
+    """Shapes built in bulk, held as columns until they are appended
+
+    Offers the palette / columns() interface of ColumnarScene, so a
+    ColumnarScene appends it with one copy per column; iterating yields
+    shape objects in draw order for the object store.
+    """
+    def __init__(self, palette, columns):
+        self.palette = palette
+        self._columns = columns
+        self._count = sum(len(cols['order']) for cols in columns.values())
+
+    def __len__(self):
+        return self._count
+
+    def columns(self):
+        """Per kind, every column: {kind: {name: array}}"""
+        return self._columns
+
+    def nbytes(self):
+        """Bytes held by the columns"""
+        return sum(array.nbytes for cols in self._columns.values() for array in cols.values())
+
+    def __iter__(self):
+        shapes = [None] * self._count
+        palette = self.palette
+        for kind, cols in self._columns.items():
+            rows = zip(*(cols[name].tolist() for name in cols))
+            names = list(cols)
+            for values in rows:
+                row = dict(zip(names, values))
+                color = palette[row['color']]
+                if kind == 'circle':
+                    shape = Circle(row['cx'], row['cy'], row['r'], color,
+                                   (row['cx'], row['cy']) if row['labelled'] else None)
+                elif kind == 'ellipse':
+                    shape = Ellipse(row['cx'], row['cy'], row['rx'], row['ry'], color,
+                                    (row['cx'], row['cy']) if row['labelled'] else None)
+                else:
+                    shape = Line(row['x1'], row['y1'], row['x2'], row['y2'], color,
+                                 (row['x1'], row['y1'], row['x2'], row['y2']) if row['labelled'] else None)
+                shapes[row['order']] = shape
+        return iter(shapes)
+
+
+class ColumnarScene:
+    """Scene storing circles, ellipses and lines as NumPy columns
+
+    Offers the same list-like interface as ``Scene`` (append, extend,
+    clear, len, iteration, indexing, visible) and hands out lightweight
+    view objects instead of storing one Python object per shape.
+    ``draw_batch`` transforms every visible shape to screen space in one
+    vectorized step per shape kind.
+    """
+    def __init__(self, shapes=()):
+        self.palette = []
+        self._palette_index = {}
+        self.generation = 0  # Bumped when the whole scene changes (single-shape edits go to edits)
+        self.edits = EditLog()
+        self._reset()
+        self.extend(shapes)
+
+    def _reset(self):
+        self.circles = ColumnTable(CIRCLE_COLUMNS)
+        self.ellipses = ColumnTable(ELLIPSE_COLUMNS)
+        self.lines = ColumnTable(LINE_COLUMNS)
+        self._kinds = [(self.circles, CircleView), (self.ellipses, EllipseView),
+                       (self.lines, LineView)]
+        self._pick_indexes = [None, None, None]  # Built on the first query
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def color_index(self, color):
+        """Palette index for a color (added to the palette on first use)"""
+        color = tuple(color)
+        index = self._palette_index.get(color)
+        if index is None:
+            if len(self.palette) >= 256:
+                raise ValueError("ColumnarScene palette is limited to 256 colors")
+            index = len(self.palette)
+            self.palette.append(color)
+            self._palette_index[color] = index
+        return index
+
+    # ---------------------
+    # Adding shapes
+    # ---------------------
+    def add_circles(self, cx, cy, r, color, labelled=True):
+        """Append circles from scalars or equally long arrays"""
+        n = len(np.atleast_1d(cx))
+        order = np.arange(self._count, self._count + n)
+        self.circles.append_rows(order=order, cx=cx, cy=cy, r=r,
+                                 color=self.color_index(color), labelled=labelled)
+        self._count += n
+
+    def add_ellipses(self, cx, cy, rx, ry, color, labelled=True):
+        """Append ellipses from scalars or equally long arrays"""
+        n = len(np.atleast_1d(cx))
+        order = np.arange(self._count, self._count + n)
+        self.ellipses.append_rows(order=order, cx=cx, cy=cy, rx=rx, ry=ry,
+                                  color=self.color_index(color), labelled=labelled)
+        self._count += n
+
+    def add_lines(self, x1, y1, x2, y2, color, labelled=True):
+        """Append lines from scalars or equally long arrays"""
+        n = len(np.atleast_1d(x1))
+        order = np.arange(self._count, self._count + n)
+        self.lines.append_rows(order=order, x1=x1, y1=y1, x2=x2, y2=y2,
+                               color=self.color_index(color), labelled=labelled)
+        self._count += n
+
+    def append(self, shape):
+        """Add a Circle, Ellipse or Line object (stored as columns)"""
+        labelled = bool(shape.original_coords)
+        if isinstance(shape, Circle):
+            self.add_circles(shape.original_center_x, shape.original_center_y,
+                             shape.radius, shape.color, labelled)
+        elif isinstance(shape, Ellipse):
+            self.add_ellipses(shape.original_center_x, shape.original_center_y,
+                              shape.rx, shape.ry, shape.color, labelled)
+        elif isinstance(shape, Line):
+            self.add_lines(shape.x1, shape.y1, shape.x2, shape.y2, shape.color, labelled)
+        else:
+            raise TypeError(f"Unsupported shape type: {type(shape).__name__}")
+
+    def extend(self, shapes):
+        """Add several shapes (column sources such as a ShapeBatch in one step)"""
+        if hasattr(shapes, 'columns'):
+            self.extend_columns(shapes.palette, shapes.columns())
+            return
+        for shape in shapes:
+            self.append(shape)
+
+    def extend_columns(self, palette, columns):
+        """Append rows given as {kind: {name: array}} with draw orders 0..n-1"""
+        lut = np.array([self.color_index(color) for color in palette], np.uint8)
+        total = 0
+        for kind, table in zip(KINDS, (self.circles, self.ellipses, self.lines)):
+            cols = columns.get(kind)
+            if cols is None or len(cols['order']) == 0:
+                continue
+            rows = np.argsort(cols['order'], kind='stable')  # Tables stay sorted by order
+            values = {name: cols[name][rows] for name in table.dtypes}
+            values['order'] = values['order'] + self._count
+            values['color'] = lut[values['color']]
+            table.append_rows(**values)
+            total += len(rows)
+        self._count += total
+
+    def clear(self):
+        """Remove every shape"""
+        self._reset()
+        self._replaced()
+
+    def _replaced(self):
+        """Every shape may have changed: caches rebuild, so the edit log starts over"""
+        self.edits.reset()
+        self.generation += 1
+
+    # ---------------------
+    # Edits (used by the undo history)
+    # ---------------------
+    def _kind_of(self, table):
+        return [t for t, _ in self._kinds].index(table)
+
+    def _edited(self, kind, position, change, values):
+        """Log the edit of one shape (values: its columns) for the caches"""
+        if not self.edits.record(position, change, *column_bounds(kind, values)):
+            self._replaced()
+
+    def index_of(self, shape):
+        """Draw-order position of a view handed out by this scene"""
+        for table, _ in self._kinds:
+            if shape._table is table:
+                return int(table.arrays['order'][shape._row])
+        raise ValueError("shape is not in this scene")
+
+    def truncate(self, length):
+        """Remove the shapes at positions >= length; returns them as a ShapeBatch"""
+        columns = {}
+        for i, (kind, (table, _)) in enumerate(zip(KINDS, self._kinds)):
+            first = int(np.searchsorted(table.column('order'), length))
+            columns[kind] = {name: table.column(name)[first:].copy() for name in table.dtypes}
+            table.count = first
+            index = self._pick_indexes[i]
+            if index is not None and len(index) > first:
+                self._pick_indexes[i] = None
+        self._count = min(self._count, length)
+        # Logged last shape first, so each position is the shape's own when it goes
+        orders = np.concatenate([columns[kind]['order'] for kind in KINDS]).astype(np.int64)
+        bounds = [np.concatenate(part) for part in zip(*(column_bounds(kind, columns[kind]) for kind in KINDS))]
+        last_first = np.argsort(-orders)
+        if not self.edits.record(orders[last_first], -1, *(part[last_first] for part in bounds)):
+            self._replaced()
+        for kind in KINDS:
+            columns[kind]['order'] -= length
+        return ShapeBatch(list(self.palette), columns)
+
+    def remove(self, position):
+        """Remove one shape; returns a (kind, row values) token that insert() puts back"""
+        table, _, row = self._locate([position])[0]
+        i = self._kind_of(table)
+        values = {name: table.arrays[name][row] for name in table.dtypes}
+        table.delete_row(row)
+        for other, _ in self._kinds:
+            orders = other.column('order')
+            orders[orders > position] -= 1
+        self._count -= 1
+        self._pick_indexes[i] = None  # Its rows moved
+        self._edited(KINDS[i], position, -1, values)
+        return KINDS[i], values
+
+    def insert(self, position, removed):
+        """Put back a shape taken out by remove() at the given position"""
+        kind, values = removed
+        for other, _ in self._kinds:
+            orders = other.column('order')
+            orders[orders >= position] += 1
+        i = KINDS.index(kind)
+        table = self._kinds[i][0]
+        row = int(np.searchsorted(table.column('order'), position))
+        table.insert_row(row, dict(values, order=position))
+        self._count += 1
+        self._pick_indexes[i] = None  # Its rows moved
+        self._edited(kind, position, 1, values)
+
+    def recolor(self, position, color):
+        """Change the color of one shape; returns the old color"""
+        table, _, row = self._locate([position])[0]
+        old = self.palette[table.arrays['color'][row]]
+        table.arrays['color'][row] = self.color_index(color)
+        self._edited(KINDS[self._kind_of(table)], position, 0,
+                     {name: table.arrays[name][row] for name in table.dtypes})
+        return old
+
+    def detach(self):
+        """Move every shape into a new ColumnarScene and return it, leaving this one empty"""
+        detached = ColumnarScene()
+        detached.palette, detached._palette_index = self.palette, self._palette_index  # Shared
+        self._move_contents(self, detached)
+        self._reset()
+        self._replaced()
+        return detached
+
+    def attach(self, other):
+        """Take over the shapes of a detached ColumnarScene (this scene must be empty)"""
+        self._move_contents(other, self)
+        other._reset()
+        self._replaced()
+
+    @staticmethod
+    def _move_contents(source, target):
+        for name in ('circles', 'ellipses', 'lines', '_kinds', '_pick_indexes', '_count'):
+            setattr(target, name, getattr(source, name))
+
+    # ---------------------
+    # Views
+    # ---------------------
+    def _locate(self, orders):
+        """Map global draw-order numbers to (table, view class, row) triples"""
+        found = {}
+        for table, view in self._kinds:
+            column = table.column('order')
+            rows = np.searchsorted(column, orders)
+            for order, row in zip(orders, rows):
+                if row < len(column) and column[row] == order:
+                    found[int(order)] = (table, view, int(row))
+        return [found[int(order)] for order in orders]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            orders = np.arange(self._count)[i]
+            return [view(table, self.palette, row) for table, view, row in self._locate(orders)]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("ColumnarScene index out of range")
+        table, view, row = self._locate([i])[0]
+        return view(table, self.palette, row)
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def _visible_rows(self, xmin, ymin, xmax, ymax):
+        """Per kind, the sorted row indices whose bounds intersect the world rect
+
+        Rows are found through a SortedCellIndex per kind, so the cost follows
+        the shapes near the rect rather than the table size. Rows appended
+        after an index was built are scanned directly until there are more
+        than PICK_INDEX_TAIL of them; then it is rebuilt.
+        """
+        found = []
+        for i, (kind, (table, _)) in enumerate(zip(KINDS, self._kinds)):
+            index = self._pick_indexes[i]
+            if index is None or len(table) - len(index) > PICK_INDEX_TAIL:
+                index = SortedCellIndex(*column_bounds(kind, {name: table.column(name) for name in table.dtypes}))
+                self._pick_indexes[i] = index
+            tail = {name: table.column(name)[len(index):] for name in table.dtypes}
+            tail_rows = np.nonzero(intersects(kind, tail, xmin, ymin, xmax, ymax))[0] + len(index)
+            found.append(np.concatenate([index.query(xmin, ymin, xmax, ymax), tail_rows]))
+        return tuple(found)
+
+    def _views_of(self, rows_per_kind):
+        """Views of the given rows of every kind, in draw order"""
+        views = []
+        for (table, view), rows in zip(self._kinds, rows_per_kind):
+            orders = table.column('order')[rows]
+            views.extend((order, view(table, self.palette, row)) for order, row in zip(orders.tolist(), rows.tolist()))
+        views.sort(key=lambda item: item[0])
+        return [view for _, view in views]
+
+    def query(self, xmin, ymin, xmax, ymax):
+        """Views of shapes whose bounds intersect the world rect, in draw order"""
+        return self._views_of(self._visible_rows(xmin, ymin, xmax, ymax))
+
+    def columns_in(self, xmin, ymin, xmax, ymax):
+        """(palette, {kind: {name: array}}) of the shapes whose bounds intersect the world rect"""
+        rows_per_kind = self._visible_rows(xmin, ymin, xmax, ymax)
+        return self.palette, {kind: {name: table.arrays[name][rows] for name in table.dtypes}
+                              for kind, (table, _), rows in zip(KINDS, self._kinds, rows_per_kind)}
+
+    def visible(self, canvas_width, height, center_x, center_y, zoom_level, margin_px=0):
+        """Views of shapes that may be visible on the canvas, in draw order"""
+        return self.query(*visible_world_rect(
+            canvas_width, height, center_x, center_y, zoom_level, margin_px
+        ))
+
+    def pick(self, x, y, tolerance):
+        """Topmost shape whose outline passes within tolerance (world units) of (x, y), or None"""
+        rows = self._visible_rows(x - tolerance, y - tolerance, x + tolerance, y + tolerance)
+        return pick_topmost(self._views_of(rows), x, y, tolerance)
+
+    # ---------------------
+    # Batched drawing
+    # ---------------------
+    def draw_batch(self, surface, canvas_width, height, center_x, center_y, zoom_level,
+                   margin_px=0, since=None, labels=None):
+        """Draw every visible shape with one vectorized transform per kind
+
+        Returns the dirty rects of shapes whose draw-order number is >= since.
+        """
+        circle_rows, ellipse_rows, line_rows = self._visible_rows(*visible_world_rect(
+            canvas_width, height, center_x, center_y, zoom_level, margin_px
+        ))
+
+        return draw_columns(
+            surface, self.palette,
+            {name: self.circles.arrays[name][circle_rows] for name in CIRCLE_COLUMNS},
+            {name: self.ellipses.arrays[name][ellipse_rows] for name in ELLIPSE_COLUMNS},
+            {name: self.lines.arrays[name][line_rows] for name in LINE_COLUMNS},
+            center_x, center_y, zoom_level, since, labels
+        )
+
+    def bounds_since(self, start):
+        """(xmin, ymin, xmax, ymax) arrays for the shapes with draw order >= start"""
+        parts = []
+        for kind, table in zip(KINDS, (self.circles, self.ellipses, self.lines)):
+            first = np.searchsorted(table.column('order'), start)
+            parts.append(column_bounds(kind, {name: table.column(name)[first:] for name in table.dtypes}))
+        return tuple(np.concatenate([part[i] for part in parts]).astype(np.float64) for i in range(4))
+
+    def columns(self):
+        """Per kind, the used part of every column: {kind: {name: array}}"""
+        return {kind: {name: table.column(name) for name in table.dtypes}
+                for kind, table in zip(KINDS, (self.circles, self.ellipses, self.lines))}
+
+    # ---------------------
+    # Memory accounting
+    # ---------------------
+    def nbytes(self):
+        """Bytes used by the shape columns (excluding spare capacity)"""
+        return self.circles.nbytes() + self.ellipses.nbytes() + self.lines.nbytes()
+
+    def bytes_per_shape(self):
+        """Average column bytes per stored shape"""
+        return self.nbytes() / self._count if self._count else 0.0
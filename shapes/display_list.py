@@ -0,0 +1,678 @@
+"""Display list - the visible shapes compiled into batched draw commands"""
+
+import heapq
+
+import numpy as np
+import pygame
+
+from config import (LINE_WIDTH, POINT_RADIUS, CULL_MARGIN_PX, DISPLAY_LIST_CELL_PX, DISPLAY_LIST_APPEND_MAX,
+                    CLIP_OVERSIZE_PX)
+from drawing.labels import LabelPlacer
+from utils.coordinates import visible_world_rect
+from .base import draw_label_box, draw_ring, draw_oval, draw_segment, far_outside, union_rects
+from .columnar import ColumnarScene
+from .raster import RING, OVAL, DOT, SEGMENT, rasterizes, split_stamp_columns, stamp_batch
+
+
+_dot_sprites = {}  # (color, radius) -> (sprite, offset of its center)
+
+
+def _dot_sprite(color, radius):
+    """A filled dot exactly as pygame.draw.circle draws it, as a colorkeyed sprite"""
+    key = (color, radius)
+    found = _dot_sprites.get(key)
+    if found is None:
+        center = radius + 2
+        sprite = pygame.Surface((2 * center + 1, 2 * center + 1))
+        background = (0, 0, 0) if tuple(color[:3]) != (0, 0, 0) else (255, 255, 255)
+        sprite.fill(background)
+        sprite.set_colorkey(background)
+        pygame.draw.circle(sprite, color, (center, center), radius, 0)
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            sprite = sprite.convert()
+        found = _dot_sprites[key] = (sprite, center)
+    return found
+
+
+def _label_sprite(surface, color, bg_rect, text_surface, text_pos, radius):
+    """A placed label (background, border and text) composited once, and its position"""
+    sprite = pygame.Surface(bg_rect.size, pygame.SRCALPHA)
+    draw_label_box(sprite, color, pygame.Rect((0, 0), bg_rect.size), text_surface,
+                   (text_pos[0] - bg_rect.x, text_pos[1] - bg_rect.y), radius)
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        sprite = sprite.convert_alpha()
+    return sprite, bg_rect.topleft
+
+
+def _clipped_outline(kind, color, x, y, a, b):
+    """Draw call of an outline or line too big to hand to pygame.draw whole"""
+    if kind == RING:
+        return draw_ring, (color, x, y, a, 2)
+    if kind == OVAL:
+        return draw_oval, (color, x, y, a, b, 2)
+    return draw_segment, (color, (x, y), (x + a, y + b), LINE_WIDTH)
+
+
+def _stamp_boxes(batch):
+    """(left, top, right, bottom) screen boxes covering each stamp's pixels"""
+    kind, x, y, a, b = batch['kind'], batch['x'], batch['y'], batch['a'], batch['b']
+    segment = kind == SEGMENT
+    ry = np.where(kind == OVAL, b, a)
+    left = np.where(segment, x + np.minimum(a, 0) - LINE_WIDTH, x - a - 1)
+    right = np.where(segment, x + np.maximum(a, 0) + LINE_WIDTH + 1, x + a + 2)
+    top = np.where(segment, y + np.minimum(b, 0) - LINE_WIDTH, y - ry - 1)
+    bottom = np.where(segment, y + np.maximum(b, 0) + LINE_WIDTH + 1, y + ry + 2)
+    return left, top, right, bottom
+
+
+_STAMP_FIELDS = ('order', 'kind', 'x', 'y', 'a', 'b', 'color')  # Columns of a stamp batch
+# One compiled shape: its draw-order position, cell span on the canvas (all 0 when off it),
+# layer and the screen box of its stamps
+_UNIT = np.dtype([('order', np.int64), ('id', np.int64), ('x0', np.int64), ('y0', np.int64),
+                  ('x1', np.int64), ('y1', np.int64), ('layer', np.int64), ('left', np.int64),
+                  ('top', np.int64), ('right', np.int64), ('bottom', np.int64)])
+# A shape collapsed to a LOD point, drawn only when it is the first in draw order on its spot
+_POINT = np.dtype([('order', np.int64), ('kx', np.int64), ('ky', np.int64), ('x', np.int64),
+                   ('y', np.int64), ('color', np.int64), ('won', np.bool_)])
+# A label offered to the placer and whether it was placed
+_LABEL = np.dtype([('order', np.int64), ('left', np.int64), ('top', np.int64), ('width', np.int64),
+                   ('height', np.int64), ('placed', np.bool_)])
+
+
+def _overlapping(units, unit):
+    """Mask of the units sharing a canvas cell with unit"""
+    return ((units['x0'] < unit['x1']) & (unit['x0'] < units['x1']) &
+            (units['y0'] < unit['y1']) & (unit['y0'] < units['y1']))
+
+
+def _colliding(labels, left, top, right, bottom):
+    """Mask of the label rects colliding with a rect (as Rect.colliderect)"""
+    return ((labels['left'] < right) & (left < labels['left'] + labels['width']) &
+            (labels['top'] < bottom) & (top < labels['top'] + labels['height']))
+
+
+def _edges(rect):
+    return rect.left, rect.top, rect.right, rect.bottom
+
+
+def _spliced(rows, new):
+    """Rows and new rows (both sorted by order) merged in order, new ones after equal orders"""
+    return np.insert(rows, np.searchsorted(rows['order'], new['order'], side='right'), new)
+
+
+def _table(columns, dtype):
+    """Columns (a mapping of equal-length arrays) as one structured array"""
+    table = np.zeros(len(columns['order']), dtype)
+    for name, values in columns.items():
+        table[name] = values
+    return table
+
+
+class DisplayList:
+    """The visible scene as batched draw commands, rebuilt only when shapes or the view change
+
+    update() compiles the shapes overlapping the canvas once per scene,
+    zoom and canvas size. Appending a few shapes only compiles those;
+    editing one (scene.edits) only drops and recompiles it and whatever
+    its cells, LOD spot or label rects touch. Every frame then replays the
+    list:
+
+    - Geometry is split into layers: a shape goes one layer above the
+      highest layer of any earlier shape sharing a DISPLAY_LIST_CELL_PX
+      cell with it. Shapes in one layer never overlap, so a layer draws
+      its outlines, then all its dots (center points, line ends, LOD
+      points) in one Surface.blits call. Z-order is kept wherever shapes
+      overlap. A shape inserted under others lifts the later shapes it
+      overlaps above itself. With the numpy backend the list keeps one
+      stamp batch in draw order instead and hands it to stamp_batch().
+    - Labels are placed once and composited into sprites (background,
+      border and text); all of them go out in one Surface.blits call.
+      Labels cut by the surface edge keep their three draw calls. Every
+      label offered is kept, placed or not, so an edit re-runs the greedy
+      placement only for the labels whose verdict it can change.
+
+    Output matches Scene.draw_batch with a LabelPlacer.
+    """
+    def __init__(self):
+        self.key = None
+        self.view = None  # (center_x, center_y, zoom_level) compiled for
+        self.compiled_shapes = 0  # Shapes the list has seen (len(shapes) when last brought up to date)
+        self.seen_edits = 0  # len(shapes.edits) when last brought up to date
+        self.placer = None
+        self.palette = []  # Colors of every compiled stamp
+        self.layers = []  # [(outline calls, dot blits)] in draw order
+        self.batch = None  # Stamp batch in draw order with the numpy backend, else None
+        self.labels = []  # (sprite, position) for Surface.blits
+        self.edge_labels = []  # draw_label_box() arguments of labels cut by the surface edge
+        self._colors = {}  # Color -> index in palette
+        self._units = np.zeros(0, _UNIT)  # Compiled shapes by order
+        self._owners = []  # Per layer: unit ids of its (outline calls, dot blits)
+        self._moved = {}  # Unit id -> layer its calls are still filed in, for units moved or dropped
+        self._next_id = 0
+        self._cells = None  # Highest layer drawn into each canvas cell (-1 for none)
+        self._points = np.zeros(0, _POINT)  # LOD points by order
+        self._spots = set()  # (kx, ky) of LOD spots whose winner may have changed
+        self._offers = np.zeros(0, _LABEL)  # Labels offered, by order
+        self._offer_calls = []  # (order, draw, text, color, x, y) label call of each offered label
+        self._offer_drawn = []  # (True, sprite entry) / (False, edge args) of each placed label, else None
+
+    def __len__(self):
+        """Draw calls one replay issues (a blits call counts once)"""
+        if self.batch is not None:
+            geometry = int(len(self.batch['order']) > 0)
+        else:
+            geometry = sum(len(outlines) + bool(dots) for outlines, dots in self.layers)
+        return geometry + bool(self.labels) + 3 * len(self.edge_labels)
+
+    def clear(self):
+        """Forget the compiled list; the next update() rebuilds it"""
+        self.key = None
+
+    # ---------------------
+    # Compiling
+    # ---------------------
+    def update(self, surface, shapes, canvas_width, height, center_x, center_y, zoom_level, geometry=True):
+        """Bring the list up to date with shapes and the view; returns the rects that changed
+
+        geometry=False compiles only the labels (the geometry comes from
+        the tile cache).
+        """
+        key = (shapes, shapes.generation, zoom_level, canvas_width, height, center_x, center_y,
+               geometry, rasterizes(surface))
+        canvas = pygame.Rect(0, 0, canvas_width, height)
+        rect = visible_world_rect(canvas_width, height, center_x, center_y, zoom_level, CULL_MARGIN_PX)
+        if key == self.key:
+            (positions, changes, *_), seen = shapes.edits.applied(self.seen_edits, self.compiled_shapes)
+            added = len(shapes) - seen
+        if (key != self.key or len(positions) > DISPLAY_LIST_APPEND_MAX
+                or not 0 <= added <= DISPLAY_LIST_APPEND_MAX):
+            self._reset(key, (center_x, center_y, zoom_level), canvas, geometry, rasterizes(surface))
+            palette, columns = shapes.columns_in(*rect)
+            self._compile(surface, palette, columns, canvas)
+            self.compiled_shapes, self.seen_edits = len(shapes), len(shapes.edits)
+            return [canvas]
+        self.seen_edits = len(shapes.edits)
+        self.compiled_shapes = len(shapes)
+
+        dirty = []
+        if len(positions):
+            dirty += self._edit(surface, shapes, positions.tolist(), changes.tolist(), rect, canvas)
+        new = self._shown(shapes, range(seen, len(shapes)), rect)
+        if new:
+            palette, columns = self._columns_of(shapes, new)
+            dirty.append(self._compile(surface, palette, columns, canvas))
+        dirty = union_rects(dirty)
+        return [dirty.clip(canvas)] if dirty else []
+
+    def _reset(self, key, view, canvas, geometry, batched):
+        self.key = key
+        self.view = view
+        self.placer = LabelPlacer(geometry=geometry)
+        self.palette = []
+        self.layers = []
+        self.batch = {name: np.zeros(0, np.int64) for name in _STAMP_FIELDS} if batched else None
+        self.labels = []
+        self.edge_labels = []
+        self._colors = {}
+        self._units = np.zeros(0, _UNIT)
+        self._owners = []
+        self._moved = {}
+        size = DISPLAY_LIST_CELL_PX
+        self._cells = np.full((-(-canvas.height // size), -(-canvas.width // size)), -1, np.int64)
+        self._points = np.zeros(0, _POINT)
+        self._spots = set()
+        self._offers = np.zeros(0, _LABEL)
+        self._offer_calls = []
+        self._offer_drawn = []
+
+    @staticmethod
+    def _shown(shapes, positions, rect):
+        """The positions whose shape bounds intersect the world rect"""
+        xmin, ymin, xmax, ymax = rect
+        shown = []
+        for i in positions:
+            x0, y0, x1, y1 = shapes[i].bounds()
+            if x1 >= xmin and x0 <= xmax and y1 >= ymin and y0 <= ymax:
+                shown.append(i)
+        return shown
+
+    @staticmethod
+    def _columns_of(shapes, positions):
+        """(palette, {kind: columns}) of the shapes at positions, ordered by position"""
+        found = ColumnarScene(shapes[i] for i in positions)
+        positions = np.array(positions, np.int64)
+        return found.palette, {kind: dict(cols, order=positions[cols['order']])
+                               for kind, cols in found.columns().items()}
+
+    def _stamps_of(self, palette, columns):
+        """split_stamp_columns() of rows given as {kind: columns}, their colors indexing self.palette"""
+        lut = np.array([self._color_index(color) for color in palette] or [0], np.int64)
+        columns = {kind: dict(cols, color=lut[cols['color']]) for kind, cols in columns.items()}
+        return split_stamp_columns(columns['circle'], columns['ellipse'], columns['line'], *self.view, self.placer)
+
+    def _color_index(self, color):
+        color = tuple(color)
+        index = self._colors.get(color)
+        if index is None:
+            index = self._colors[color] = len(self.palette)
+            self.palette.append(color)
+        return index
+
+    def _compile(self, surface, palette, columns, canvas):
+        """Add rows drawn after everything compiled so far; the union of what they cover"""
+        batch, points, texts = self._stamps_of(palette, columns)
+        dirty = []
+        if batch is not None:
+            batch = self._won_points(batch, *points)
+            if len(batch['order']):
+                dirty.append(self._add_units(batch, canvas))
+
+        placer, palette, calls = self.placer, self.palette, self._offer_calls
+        offers = []
+        for call in texts:
+            order, draw, text, color, x, y = call
+            placer.offered = None
+            rect = draw(surface, text, palette[color], x, y, placer)
+            if placer.offered is not None:
+                offers.append((order, *placer.offered, rect is not None))
+                calls.append(call)
+                dirty.append(rect)
+        self._offers = np.concatenate([self._offers, np.array(offers, _LABEL)])
+        pending = iter(placer.pending)
+        placer.pending = []
+        for *_, placed in offers:
+            entry = None
+            if placed:
+                entry = self._label_entry(surface, next(pending)[1])
+                (self.labels if entry[0] else self.edge_labels).append(entry[1])
+            self._offer_drawn.append(entry)
+        return union_rects(dirty)
+
+    def _won_points(self, batch, order, x, y, color):
+        """Keep the LOD points of rows after everything compiled; batch with the ones drawn added
+
+        As raster._claim_points: a point is drawn when it is the first in
+        draw order on its spot.
+        """
+        if not len(order):
+            return batch
+        points = _table({'order': order, 'kx': x // POINT_RADIUS, 'ky': y // POINT_RADIUS, 'x': x, 'y': y,
+                         'color': color}, _POINT)
+        points = points[np.argsort(order, kind='stable')]
+        _, first = np.unique(np.stack([points['kx'], points['ky']]), axis=1, return_index=True)
+        first.sort()
+        keys = list(zip(points['kx'][first].tolist(), points['ky'][first].tolist()))
+        taken = self.placer.points
+        fresh = np.array([key not in taken for key in keys], np.bool_)
+        taken.update(keys)
+        points['won'][first[fresh]] = True
+        self._points = np.concatenate([self._points, points])
+        won = points[points['won']]
+        columns = {name: np.concatenate([batch[name], values]) for name, values in (
+            ('order', won['order']), ('kind', np.full(len(won), DOT)), ('x', won['x']), ('y', won['y']),
+            ('a', np.full(len(won), POINT_RADIUS)), ('b', np.zeros(len(won), np.int64)),
+            ('color', won['color']))}
+        rows = np.argsort(columns['order'], kind='stable')
+        return {name: values[rows] for name, values in columns.items()}
+
+    # ---------------------
+    # Edits
+    # ---------------------
+    def _edit(self, surface, shapes, positions, changes, rect, canvas):
+        """Replay single-shape edits (scene.edits entries) on the list; the rects they change"""
+        dirty = []
+        seeds = []  # Rects of placed labels dropped
+        pending = []  # Positions to compile once every edit is replayed
+        for position, change in zip(positions, changes):
+            if position in pending:
+                if change < 0:
+                    pending.remove(position)
+            elif change <= 0:
+                dirty += self._drop(position, seeds)
+            if change:
+                start = position + 1 if change < 0 else position
+                self._shift(start, change)
+                pending = [p + change if p >= start else p for p in pending]
+                if change > 0:
+                    pending.append(position)
+            elif position not in pending:
+                pending.append(position)
+
+        fresh = []
+        shown = self._shown(shapes, sorted(pending), rect)
+        if shown:
+            batch, points, texts = self._stamps_of(*self._columns_of(shapes, shown))
+            if batch is not None:
+                self._insert_points(*points)
+                if len(batch['order']):
+                    dirty.append(self._add_units(batch, canvas))
+            fresh = self._insert_offers(surface, texts)
+        dirty += self._settle_points(canvas)
+        dirty += self._settle_labels(surface, fresh, seeds)
+        self._flatten()
+        return dirty
+
+    def _drop(self, position, seeds):
+        """Forget the shape at position: its unit, LOD point and labels; the rects it covered"""
+        dirty = []
+        at = int(np.searchsorted(self._units['order'], position))
+        if at < len(self._units) and self._units['order'][at] == position:
+            dirty.append(self._drop_unit(at))
+
+        at = int(np.searchsorted(self._points['order'], position))
+        if at < len(self._points) and self._points['order'][at] == position:
+            point = self._points[at]
+            if point['won']:
+                self._spots.add((int(point['kx']), int(point['ky'])))
+            self._points = np.delete(self._points, at)
+
+        first, last = np.searchsorted(self._offers['order'], [position, position + 1]).tolist()
+        if last > first:
+            for offer in self._offers[first:last]:
+                if offer['placed']:
+                    rect = pygame.Rect(offer[['left', 'top', 'width', 'height']].tolist())
+                    self.placer.release(rect)
+                    seeds.append(rect)
+                    dirty.append(rect)
+            self._offers = np.delete(self._offers, np.s_[first:last])
+            del self._offer_calls[first:last]
+            del self._offer_drawn[first:last]
+        return dirty
+
+    def _shift(self, start, change):
+        """Renumber everything compiled at order >= start by change (a shape inserted or removed)"""
+        for rows in (self._units, self._points, self._offers, self.batch):
+            if rows is not None:
+                rows['order'][rows['order'] >= start] += change
+
+    def _insert_points(self, order, x, y, color):
+        """Add LOD points of shapes anywhere in the order; their spots are settled later"""
+        if not len(order):
+            return
+        points = _table({'order': order, 'kx': x // POINT_RADIUS, 'ky': y // POINT_RADIUS, 'x': x, 'y': y,
+                         'color': color}, _POINT)
+        points = points[np.argsort(order, kind='stable')]
+        self._points = _spliced(self._points, points)
+        self._spots.update(zip(points['kx'].tolist(), points['ky'].tolist()))
+
+    def _settle_points(self, canvas):
+        """Draw the first point in draw order on every spot an edit touched; the rects that changed"""
+        dirty = []
+        taken = self.placer.points
+        for kx, ky in self._spots:
+            points = self._points
+            rows = np.flatnonzero((points['kx'] == kx) & (points['ky'] == ky))
+            if not len(rows):
+                taken.discard((kx, ky))
+                continue
+            taken.add((kx, ky))
+            first = rows[0]
+            if points['won'][first]:
+                continue
+            for row in rows[points['won'][rows]].tolist():  # A point was put in front of the one drawn
+                points['won'][row] = False
+                dirty.append(self._drop_unit(int(np.searchsorted(self._units['order'], points['order'][row]))))
+            points['won'][first] = True
+            point = points[first:first + 1]
+            dirty.append(self._add_units({'order': point['order'], 'kind': np.array([DOT]), 'x': point['x'],
+                                          'y': point['y'], 'a': np.array([POINT_RADIUS]), 'b': np.array([0]),
+                                          'color': point['color']}, canvas))
+        self._spots = set()
+        return dirty
+
+    # ---------------------
+    # Geometry units
+    # ---------------------
+    def _add_units(self, batch, canvas):
+        """File the stamps of a batch (in draw order) as one unit per shape; the union of their boxes"""
+        order = batch['order']
+        starts = np.flatnonzero(np.r_[True, order[1:] != order[:-1]])  # First stamp of each shape
+        counts = np.diff(np.r_[starts, len(order)])
+        boxes = _stamp_boxes(batch)
+        units = np.zeros(len(starts), _UNIT)
+        units['order'] = order[starts]
+        units['id'] = np.arange(self._next_id, self._next_id + len(starts))
+        self._next_id += len(starts)
+        units['left'], units['top'] = (np.minimum.reduceat(values, starts) for values in boxes[:2])
+        units['right'], units['bottom'] = (np.maximum.reduceat(values, starts) for values in boxes[2:])
+        # Only overlaps on the canvas matter; everything else is covered by the panel or off screen
+        size = DISPLAY_LIST_CELL_PX
+        x0 = np.maximum(units['left'], canvas.left) // size
+        y0 = np.maximum(units['top'], canvas.top) // size
+        x1 = (np.minimum(units['right'], canvas.right) - 1) // size + 1
+        y1 = (np.minimum(units['bottom'], canvas.bottom) - 1) // size + 1
+        on = (x1 > x0) & (y1 > y0)
+        units['x0'], units['y0'], units['x1'], units['y1'] = (np.where(on, v, 0) for v in (x0, y0, x1, y1))
+        left, top = int(units['left'].min()), int(units['top'].min())
+        dirty = pygame.Rect(left, top, int(units['right'].max()) - left, int(units['bottom'].max()) - top)
+
+        if self.batch is not None:
+            at = np.searchsorted(self.batch['order'], batch['order'], side='right')
+            if at[0] == len(self.batch['order']):
+                self.batch = {name: np.concatenate([values, batch[name]]) for name, values in self.batch.items()}
+            else:
+                self.batch = {name: np.insert(values, at, batch[name]) for name, values in self.batch.items()}
+            self._units = _spliced(self._units, units)
+        elif not len(self._units) or units['order'][0] > self._units['order'][-1]:
+            cells = self._cells
+            layers = []
+            for x0, y0, x1, y1 in zip(units['x0'].tolist(), units['y0'].tolist(), units['x1'].tolist(),
+                                      units['y1'].tolist()):
+                if x1 <= x0:
+                    layers.append(0)
+                    continue
+                span = cells[y0:y1, x0:x1]
+                layer = int(span.max()) + 1
+                span[...] = layer
+                layers.append(layer)
+            units['layer'] = layers
+            self._units = np.concatenate([self._units, units])
+            self._file(batch, units, canvas)
+        else:
+            for i, (start, count) in enumerate(zip(starts.tolist(), counts.tolist())):
+                self._insert_unit(units[i:i + 1], {name: values[start:start + count]
+                                                   for name, values in batch.items()}, canvas)
+        return dirty
+
+    def _insert_unit(self, unit, batch, canvas):
+        """File one shape drawn before others, lifting the later shapes it overlaps above it"""
+        at = int(np.searchsorted(self._units['order'], unit['order'][0]))
+        earlier = self._units[:at]
+        under = earlier['layer'][_overlapping(earlier, unit[0])]
+        unit['layer'] = under.max() + 1 if len(under) else 0
+        self._units = np.insert(self._units, at, unit)
+        self._file(batch, unit, canvas)
+        self._cover(unit[0])
+
+        units = self._units
+        queue = [at]
+        while queue:
+            i = heapq.heappop(queue)
+            layer = units['layer'][i]
+            later = units[i + 1:]
+            for j in (np.flatnonzero(_overlapping(later, units[i]) & (later['layer'] <= layer)) + i + 1).tolist():
+                self._move_unit(j, layer + 1)
+                heapq.heappush(queue, j)
+
+    def _file(self, batch, units, canvas):
+        """Add the draw calls of new units to their layers (pygame backend)"""
+        order, kind = batch['order'], batch['kind']
+        owner = np.cumsum(np.r_[0, order[1:] != order[:-1]])  # Unit of each stamp
+        layer = units['layer'][owner]
+        self.layers.extend(([], []) for _ in range(int(layer.max()) + 1 - len(self.layers)))
+        self._owners.extend(([], []) for _ in range(len(self.layers) - len(self._owners)))
+        # Made in replay order, which keeps the calls a replay walks close together in memory
+        rows = np.lexsort((kind == DOT, layer))
+        palette = self.palette
+        for unit_id, layer_, kind_, x, y, a, b, color in zip(
+                units['id'][owner[rows]].tolist(), layer[rows].tolist(), kind[rows].tolist(),
+                batch['x'][rows].tolist(), batch['y'][rows].tolist(), batch['a'][rows].tolist(),
+                batch['b'][rows].tolist(), batch['color'][rows].tolist()):
+            outlines, dots = self.layers[layer_]
+            outline_owners, dot_owners = self._owners[layer_]
+            color = palette[color]
+            if kind_ == DOT:
+                if far_outside(canvas, x, y):
+                    continue
+                sprite, offset = _dot_sprite(color, a)
+                dots.append((sprite, (x - offset, y - offset)))
+                dot_owners.append(unit_id)
+                continue
+            if max(abs(a), abs(b)) > CLIP_OVERSIZE_PX:
+                outlines.append(_clipped_outline(kind_, color, x, y, a, b))
+            elif kind_ == RING:
+                outlines.append((pygame.draw.circle, (color, (x, y), a, 2)))
+            elif kind_ == OVAL:
+                outlines.append((pygame.draw.ellipse, (color, pygame.Rect(x - a, y - b, a * 2, b * 2), 2)))
+            else:
+                outlines.append((pygame.draw.line, (color, (x, y), (x + a, y + b), LINE_WIDTH)))
+            outline_owners.append(unit_id)
+
+    def _cover(self, unit):
+        """Raise the cells of a unit to its layer"""
+        span = self._cells[unit['y0']:unit['y1'], unit['x0']:unit['x1']]
+        np.maximum(span, unit['layer'], out=span)
+
+    def _move_unit(self, i, layer):
+        unit = self._units[i]
+        self._moved.setdefault(int(unit['id']), int(unit['layer']))
+        self._units['layer'][i] = layer
+        self._cover(self._units[i])
+
+    def _drop_unit(self, i):
+        """Forget the unit at index i; the box it covered"""
+        unit = self._units[i]
+        if self.batch is not None:
+            keep = self.batch['order'] != unit['order']
+            self.batch = {name: values[keep] for name, values in self.batch.items()}
+        else:
+            self._moved.setdefault(int(unit['id']), int(unit['layer']))
+        self._units = np.delete(self._units, i)
+        return self._rect_of(unit)
+
+    def _flatten(self):
+        """Take the calls of moved and dropped units out of their old layers, filing moved ones anew"""
+        if not self._moved:
+            return
+        units = self._units
+        moved = np.isin(units['id'], list(self._moved))
+        target = dict(zip(units['id'][moved].tolist(), units['layer'][moved].tolist()))
+        self.layers.extend(([], []) for _ in range(max(target.values(), default=0) + 1 - len(self.layers)))
+        self._owners.extend(([], []) for _ in range(len(self.layers) - len(self._owners)))
+        carried = []  # (layer, 0 for an outline or 1 for a dot, call, unit id)
+        for layer in set(self._moved.values()):
+            for side in (0, 1):
+                calls, owners = self.layers[layer][side], self._owners[layer][side]
+                kept_calls, kept_owners = [], []
+                for call, owner in zip(calls, owners):
+                    if owner not in self._moved:
+                        kept_calls.append(call)
+                        kept_owners.append(owner)
+                    elif owner in target:
+                        carried.append((target[owner], side, call, owner))
+                calls[:] = kept_calls
+                owners[:] = kept_owners
+        for layer, side, call, owner in carried:
+            self.layers[layer][side].append(call)
+            self._owners[layer][side].append(owner)
+        self._moved = {}
+
+    @staticmethod
+    def _rect_of(row):
+        return pygame.Rect(int(row['left']), int(row['top']), int(row['right'] - row['left']),
+                           int(row['bottom'] - row['top']))
+
+    # ---------------------
+    # Labels
+    # ---------------------
+    def _insert_offers(self, surface, texts):
+        """Add the labels of shapes anywhere in the order, not yet placed; their indices"""
+        probe = LabelPlacer(geometry=self.placer.geometry)
+        orders = set()
+        for order, draw, text, color, x, y in texts:
+            probe.offered = None
+            draw(surface, text, self.palette[color], x, y, probe)
+            if probe.offered is None:
+                continue
+            rect = probe.offered
+            at = int(np.searchsorted(self._offers['order'], order, side='right'))
+            self._offers = np.insert(self._offers, at, np.array([(order, *rect, False)], _LABEL))
+            self._offer_calls.insert(at, (order, draw, text, color, x, y))
+            self._offer_drawn.insert(at, None)
+            orders.add(order)
+        return np.flatnonzero(np.isin(self._offers['order'], list(orders))).tolist()
+
+    def _settle_labels(self, surface, fresh, seeds):
+        """Re-run the greedy placement where an edit can change it; the rects that changed
+
+        A label is placed when no earlier placed label collides with it, so
+        only new labels and the ones colliding with a label placed or
+        dropped need their verdict again, taken in draw order.
+        """
+        offers = self._offers
+        queue = list(fresh)
+        for rect in seeds:
+            queue.extend(np.flatnonzero(_colliding(offers, *_edges(rect))).tolist())
+        if not queue and not seeds:
+            return []
+        heapq.heapify(queue)
+        dirty = []
+        last = -1
+        while queue:
+            i = heapq.heappop(queue)
+            if i == last:
+                continue
+            last = i
+            rect = pygame.Rect(offers[['left', 'top', 'width', 'height']][i].tolist())
+            earlier = offers[:i]
+            placed = not (earlier['placed'] & _colliding(earlier, *_edges(rect))).any()
+            if placed == offers['placed'][i]:
+                continue
+            offers['placed'][i] = placed
+            if placed:
+                self.placer.reserve(rect)
+                _, draw, text, color, x, y = self._offer_calls[i]
+                probe = LabelPlacer(geometry=self.placer.geometry)
+                draw(surface, text, self.palette[color], x, y, probe)
+                self._offer_drawn[i] = self._label_entry(surface, probe.pending[0][1])
+            else:
+                self.placer.release(rect)
+                self._offer_drawn[i] = None
+            dirty.append(rect)
+            later = offers[i + 1:]
+            for j in (np.flatnonzero(_colliding(later, *_edges(rect))) + i + 1).tolist():
+                heapq.heappush(queue, j)
+
+        self.labels = [entry[1] for entry in self._offer_drawn if entry is not None and entry[0]]
+        self.edge_labels = [entry[1] for entry in self._offer_drawn if entry is not None and not entry[0]]
+        return dirty
+
+    @staticmethod
+    def _label_entry(surface, args):
+        """(True, sprite blit) of a placed label, or (False, draw_label_box arguments) if the edge cuts it"""
+        if surface.get_rect().contains(args[2]):
+            return True, _label_sprite(*args)
+        # pygame.draw.rect outlines a cut rect differently, so these keep their own calls
+        return False, args
+
+    # ---------------------
+    # Replay
+    # ---------------------
+    def draw(self, surface):
+        """Draw the compiled geometry"""
+        if self.batch is not None:
+            if len(self.batch['order']):
+                stamp_batch(surface, self.palette, self.batch)
+            return
+        for outlines, dots in self.layers:
+            for draw, args in outlines:
+                draw(surface, *args)
+            if dots:
+                surface.blits(dots, False)
+
+    def draw_labels(self, surface):
+        """Draw the compiled labels (after all geometry, as LabelPlacer.flush does)"""
+        if self.labels:
+            surface.blits(self.labels, False)
+        for args in self.edge_labels:
+            draw_label_box(surface, *args[1:])
@@ -0,0 +1,60 @@
+"""Edit log - where single-shape edits happened, for caches that redraw only that"""
+
+import numpy as np
+
+from config import EDIT_LOG_MAX
+
+
+class EditLog:
+    """Draw-order positions and world bounds of the shapes a scene removed, put back or changed
+
+    Each entry is one shape: its position at the time, the change in
+    shape count (-1 removed, +1 put back, 0 changed in place) and its
+    bounds. Caches remember len() and read the later entries with
+    applied(), as they follow appends with bounds_since(). A scene starts
+    over with reset() whenever it bumps its generation (caches rebuild
+    then anyway), and bumps it when record() reports the log full.
+    """
+    def __init__(self):
+        self.reset()
+
+    def __len__(self):
+        return self.count
+
+    def reset(self):
+        """Forget every entry"""
+        self.parts = []
+        self.count = 0
+
+    def record(self, positions, changes, xmin, ymin, xmax, ymax):
+        """Add entries from scalars or equally long arrays; False once past EDIT_LOG_MAX entries"""
+        part = tuple(np.atleast_1d(np.asarray(values, dtype))
+                     for values, dtype in zip((positions, changes, xmin, ymin, xmax, ymax),
+                                              (np.int64, np.int64) + (np.float64,) * 4))
+        self.parts.append(tuple(np.broadcast_to(values, part[0].shape) for values in part))
+        self.count += len(part[0])
+        return self.count <= EDIT_LOG_MAX
+
+    def since(self, start):
+        """(positions, changes, xmin, ymin, xmax, ymax) arrays of the entries from number start on"""
+        if not self.parts:
+            return tuple(np.empty(0, dtype) for dtype in (np.int64, np.int64) + (np.float64,) * 4)
+        if len(self.parts) > 1:
+            self.parts = [tuple(np.concatenate(column) for column in zip(*self.parts))]
+        return tuple(column[start:] for column in self.parts[0])
+
+    def applied(self, start, seen):
+        """The entries from number start on that touch the first seen shapes, and seen after them
+
+        For a cache holding the scene's leading seen shapes: an entry at or
+        past that count only touches shapes appended since the cache last
+        looked, which it picks up through bounds_since() instead. Returns
+        (entries, seen) with entries shaped as since() returns them.
+        """
+        entries = self.since(start)
+        keep = np.zeros(len(entries[0]), np.bool_)
+        for i, (position, change) in enumerate(zip(entries[0].tolist(), entries[1].tolist())):
+            if position < seen:
+                keep[i] = True
+                seen += change
+        return tuple(column[keep] for column in entries), seen
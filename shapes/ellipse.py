@@ -1,8 +1,10 @@
 """Ellipse Shape Class"""
 
-import pygame
-from .base import Shape
-from config import PIXELS_PER_UNIT, POINT_RADIUS, WHITE
+from math import hypot, sqrt
+
+from .base import Shape, union_rects, draw_center_label, draw_lod_point, draws_geometry, draw_oval, draw_dot
+from config import POINT_RADIUS, LOD_POINT_SIZE_PX, LABEL_MIN_SIZE_PX
+from drawing.viewport import coordinate_to_screen, screen_length
 
 
 class Ellipse(Shape):
@@ -17,36 +19,93 @@ class Ellipse(Shape):
         self.original_coords = original_coords
         self.zoom_level = zoom_level
     
-    def draw(self, surface, center_x, center_y, zoom_level=1.0):
+    def bounds(self):
+        rx, ry = abs(self.rx), abs(self.ry)
+        return (self.original_center_x - rx, self.original_center_y - ry,
+                self.original_center_x + rx, self.original_center_y + ry)
+    
+    def distance(self, x, y):
+        return ellipse_distance(x - self.original_center_x, y - self.original_center_y,
+                                abs(self.rx), abs(self.ry))
+    
+    def draw(self, surface, center_x, center_y, zoom_level=1.0, labels=None):
         if self.rx > 0 and self.ry > 0:
             # Recalculate screen position based on current zoom
-            screen_x = center_x + int(self.original_center_x * PIXELS_PER_UNIT * zoom_level)
-            screen_y = center_y - int(self.original_center_y * PIXELS_PER_UNIT * zoom_level)
+            screen_x, screen_y = coordinate_to_screen(self.original_center_x, self.original_center_y,
+                                                      center_x, center_y, zoom_level)
             
             # Convert radii from coordinate units to pixels
-            scaled_rx = int(self.rx * PIXELS_PER_UNIT * zoom_level)
-            scaled_ry = int(self.ry * PIXELS_PER_UNIT * zoom_level)
-            rect = pygame.Rect(
-                screen_x - scaled_rx,
-                screen_y - scaled_ry,
-                scaled_rx * 2,
-                scaled_ry * 2
-            )
-            pygame.draw.ellipse(surface, self.color, rect, 2)
-            
-            # Draw center point
-            pygame.draw.circle(surface, self.color, (screen_x, screen_y), POINT_RADIUS, 0)
-            
-            # Draw coordinates label with modern styling
-            if self.original_coords:
-                label_font = pygame.font.Font(None, 18)
-                coord_text = f"C({self.original_coords[0]},{self.original_coords[1]})"
-                text_surface = label_font.render(coord_text, True, WHITE)
-                text_x = screen_x - text_surface.get_width() // 2
-                text_y = screen_y - scaled_ry - 25
-                
-                bg_rect = text_surface.get_rect(topleft=(text_x - 4, text_y - 2))
-                bg_rect.inflate_ip(8, 6)
-                pygame.draw.rect(surface, self.color, bg_rect, border_radius=5)
-                pygame.draw.rect(surface, WHITE, bg_rect, 2, border_radius=5)
-                surface.blit(text_surface, (text_x, text_y))
+            scaled_rx = screen_length(self.rx, zoom_level)
+            scaled_ry = screen_length(self.ry, zoom_level)
+            return draw_ellipse_screen(surface, self.color, screen_x, screen_y,
+                                       scaled_rx, scaled_ry, self.original_coords, labels)
+        return None
+
+
+def draw_ellipse_screen(surface, color, screen_x, screen_y, scaled_rx, scaled_ry, original_coords,
+                        labels=None):
+    """Draw an ellipse already transformed to screen space (with level of detail)"""
+    size = max(scaled_rx, scaled_ry) * 2
+    if size < LOD_POINT_SIZE_PX:
+        return draw_lod_point(surface, color, screen_x, screen_y, labels)
+    
+    dirty = []
+    if draws_geometry(labels):
+        dirty.append(draw_oval(surface, color, screen_x, screen_y, scaled_rx, scaled_ry, 2))
+        
+        # Draw center point
+        dirty.append(draw_dot(surface, color, screen_x, screen_y, POINT_RADIUS))
+    
+    # Draw coordinates label with modern styling
+    if original_coords and size >= LABEL_MIN_SIZE_PX:
+        coord_text = f"C({original_coords[0]},{original_coords[1]})"
+        dirty.append(draw_center_label(surface, coord_text, color, screen_x,
+                                       screen_y - scaled_ry - 25, labels))
+    
+    return union_rects(dirty)
+
+
+def ellipse_distance(x, y, a, b):
+    """Exact distance from (x, y) to the outline of an origin-centered ellipse with radii a, b
+
+    Eberly's method: the closest point is found by bisecting on the
+    Lagrange multiplier, which converges for every point (no Newton
+    failure near the axes).
+    """
+    x, y = abs(x), abs(y)  # Symmetric in all four quadrants
+    if a < b:
+        a, b, x, y = b, a, y, x
+    if b <= 0:
+        return hypot(x - min(x, a), y)  # Degenerate: the segment [-a, a] on the x-axis
+
+    if y > 0:
+        if x > 0:
+            z0, z1 = x / a, y / b
+            g = z0 * z0 + z1 * z1 - 1
+            if g == 0:
+                return 0.0
+            r0 = (a / b) ** 2
+            n0 = r0 * z0
+            s0, s1 = z1 - 1, (0.0 if g < 0 else hypot(n0, z1) - 1)
+            s = s0
+            for _ in range(100):
+                s = (s0 + s1) / 2
+                if s == s0 or s == s1:
+                    break
+                ratio0, ratio1 = n0 / (s + r0), z1 / (s + 1)
+                g = ratio0 * ratio0 + ratio1 * ratio1 - 1
+                if g > 0:
+                    s0 = s
+                elif g < 0:
+                    s1 = s
+                else:
+                    break
+            return hypot(r0 * x / (s + r0) - x, y / (s + 1) - y)
+        return abs(y - b)
+
+    # On the major axis: the closest point is off-axis when inside the evolute
+    numerator, denominator = a * x, a * a - b * b
+    if numerator < denominator:
+        t = numerator / denominator
+        return hypot(a * t - x, b * sqrt(1 - t * t))
+    return abs(x - a)
@@ -0,0 +1,177 @@
+"""Undo/redo history of scene edits
+
+Each edit records only what it changed: an append remembers a count, a
+delete the one removed shape, a recolor two colors. Clearing detaches
+the scene's contents into a separate scene object instead of copying
+them, so a version shares every shape with the one before it. Undo and
+redo replay one edit each, and the history drops its oldest edits once
+the memory they hold passes HISTORY_MAX_BYTES (never the newest one, so
+the last edit can be undone however much it holds).
+"""
+
+from collections import deque
+
+from config import HISTORY_MAX_BYTES, OBJECT_SHAPE_BYTES
+
+
+EDIT_BYTES = 64  # Bookkeeping cost of one edit record
+
+
+def payload_nbytes(payload):
+    """Approximate bytes held by removed shapes or a detached scene"""
+    if payload is None:
+        return 0
+    if hasattr(payload, 'nbytes'):
+        return payload.nbytes()
+    return len(payload) * OBJECT_SHAPE_BYTES
+
+
+class AppendEdit:
+    """Shapes added on top of the scene"""
+    def __init__(self, start, count):
+        self.start = start
+        self.count = count
+        self.removed = None  # The shapes, while the edit is undone
+
+    def undo(self, scene):
+        self.removed = scene.truncate(self.start)
+
+    def redo(self, scene):
+        scene.extend(self.removed)
+        self.removed = None
+
+    def nbytes(self):
+        return EDIT_BYTES + payload_nbytes(self.removed)
+
+
+class ClearEdit:
+    """Every shape removed at once"""
+    def __init__(self, cleared):
+        self.cleared = cleared  # Detached scene holding the old contents, while done
+
+    def undo(self, scene):
+        scene.attach(self.cleared)
+        self.cleared = None
+
+    def redo(self, scene):
+        self.cleared = scene.detach()
+
+    def nbytes(self):
+        return EDIT_BYTES + payload_nbytes(self.cleared)
+
+
+class DeleteEdit:
+    """One shape removed from its place in the draw order"""
+    def __init__(self, position, removed):
+        self.position = position
+        self.removed = removed
+
+    def undo(self, scene):
+        scene.insert(self.position, self.removed)
+
+    def redo(self, scene):
+        self.removed = scene.remove(self.position)
+
+    def nbytes(self):
+        return EDIT_BYTES + OBJECT_SHAPE_BYTES
+
+
+class RecolorEdit:
+    """One shape given a new color"""
+    def __init__(self, position, old_color, new_color):
+        self.position = position
+        self.old_color = old_color
+        self.new_color = new_color
+
+    def undo(self, scene):
+        scene.recolor(self.position, self.old_color)
+
+    def redo(self, scene):
+        scene.recolor(self.position, self.new_color)
+
+    def nbytes(self):
+        return EDIT_BYTES
+
+
+class History:
+    """Undo and redo stacks of edits to one scene
+
+    Edits are made through the history (append, clear, delete, recolor)
+    so it can record them. Making a new edit discards the redo stack.
+    """
+    def __init__(self, max_bytes=HISTORY_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.reset()
+
+    def reset(self):
+        """Forget every edit (e.g. after another scene was opened)"""
+        self.undo_stack = deque()
+        self.redo_stack = deque()
+        self.nbytes = 0  # Sum of nbytes() over both stacks
+
+    def _push(self, edit):
+        for undone in self.redo_stack:
+            self.nbytes -= undone.nbytes()
+        self.redo_stack.clear()
+        self.undo_stack.append(edit)
+        self.nbytes += edit.nbytes()
+        self._trim()
+
+    def _trim(self):
+        """Drop the oldest edits, then the furthest redos, until under max_bytes
+
+        The newest edit of each stack stays even when it alone holds more:
+        a clear of a huge scene can still be undone, and then redone.
+        """
+        while self.nbytes > self.max_bytes and len(self.undo_stack) > 1:
+            self.nbytes -= self.undo_stack.popleft().nbytes()
+        while self.nbytes > self.max_bytes and len(self.redo_stack) > 1:
+            self.nbytes -= self.redo_stack.popleft().nbytes()
+
+    def _move(self, source, target, step, scene):
+        """Run step ('undo' or 'redo') on the newest edit of source and push it onto target"""
+        if not source:
+            return False
+        edit = source.pop()
+        before = edit.nbytes()
+        getattr(edit, step)(scene)
+        self.nbytes += edit.nbytes() - before
+        target.append(edit)
+        self._trim()
+        return True
+
+    # ---------------------
+    # Recorded edits
+    # ---------------------
+    def append(self, scene, shapes):
+        """Add shapes (a list, a ShapeBatch, ...) on top of the scene"""
+        start = len(scene)
+        scene.extend(shapes)
+        if len(scene) > start:
+            self._push(AppendEdit(start, len(scene) - start))
+
+    def clear(self, scene):
+        """Remove every shape"""
+        if scene:
+            self._push(ClearEdit(scene.detach()))
+
+    def delete(self, scene, position):
+        """Remove the shape at a draw-order position"""
+        self._push(DeleteEdit(position, scene.remove(position)))
+
+    def recolor(self, scene, position, color):
+        """Give the shape at a draw-order position a new color"""
+        old_color = scene.recolor(position, color)
+        if tuple(old_color) != tuple(color):
+            self._push(RecolorEdit(position, old_color, color))
+
+    # ---------------------
+    # Undo / redo
+    # ---------------------
+    def undo(self, scene):
+        """Revert the newest edit; False when there is nothing to undo"""
+        return self._move(self.undo_stack, self.redo_stack, 'undo', scene)
+
+    def redo(self, scene):
+        """Re-apply the newest undone edit; False when there is nothing to redo"""
+        return self._move(self.redo_stack, self.undo_stack, 'redo', scene)
@@ -1,8 +1,11 @@
 """Line Shape Class"""
 
-import pygame
-from .base import Shape
-from config import LINE_WIDTH, POINT_SIZE, WHITE, PIXELS_PER_UNIT
+from math import hypot
+
+from .base import (Shape, union_rects, draw_point_label, draw_lod_point, draws_geometry, draw_segment,
+                   draw_dot)
+from config import LINE_WIDTH, POINT_SIZE, LOD_POINT_SIZE_PX, LABEL_MIN_SIZE_PX
+from drawing.viewport import coordinate_to_screen
 
 
 class Line(Shape):
@@ -17,41 +20,52 @@ class Line(Shape):
         self.original_coords = original_coords  # (x1, y1, x2, y2)
         self.zoom_level = zoom_level
     
-    def draw(self, surface, center_x, center_y, zoom_level=1.0):
+    def bounds(self):
+        return (min(self.x1, self.x2), min(self.y1, self.y2),
+                max(self.x1, self.x2), max(self.y1, self.y2))
+    
+    def distance(self, x, y):
+        return segment_distance(x, y, self.x1, self.y1, self.x2, self.y2)
+    
+    def draw(self, surface, center_x, center_y, zoom_level=1.0, labels=None):
         # Recalculate screen positions based on current zoom
-        start_x = center_x + int(self.x1 * PIXELS_PER_UNIT * zoom_level)
-        start_y = center_y - int(self.y1 * PIXELS_PER_UNIT * zoom_level)
-        end_x = center_x + int(self.x2 * PIXELS_PER_UNIT * zoom_level)
-        end_y = center_y - int(self.y2 * PIXELS_PER_UNIT * zoom_level)
-        
-        pygame.draw.line(surface, self.color, (start_x, start_y), (end_x, end_y), LINE_WIDTH)
+        start_x, start_y = coordinate_to_screen(self.x1, self.y1, center_x, center_y, zoom_level)
+        end_x, end_y = coordinate_to_screen(self.x2, self.y2, center_x, center_y, zoom_level)
+        return draw_line_screen(surface, self.color, start_x, start_y, end_x, end_y,
+                                self.original_coords, labels)
+
+
+def draw_line_screen(surface, color, start_x, start_y, end_x, end_y, original_coords, labels=None):
+    """Draw a line already transformed to screen space (with level of detail)"""
+    size = max(abs(end_x - start_x), abs(end_y - start_y))
+    if size < LOD_POINT_SIZE_PX:
+        return draw_lod_point(surface, color, start_x, start_y, labels)
+    
+    dirty = []
+    if draws_geometry(labels):
+        dirty.append(draw_segment(surface, color, (start_x, start_y), (end_x, end_y), LINE_WIDTH))
         
         # Draw start and end points
-        pygame.draw.circle(surface, self.color, (start_x, start_y), POINT_SIZE, 0)
-        pygame.draw.circle(surface, self.color, (end_x, end_y), POINT_SIZE, 0)
+        dirty.append(draw_dot(surface, color, start_x, start_y, POINT_SIZE))
+        dirty.append(draw_dot(surface, color, end_x, end_y, POINT_SIZE))
+    
+    # Draw coordinates labels with modern styling
+    if original_coords and size >= LABEL_MIN_SIZE_PX:
+        # Start point label
+        start_text = f"({original_coords[0]},{original_coords[1]})"
+        dirty.append(draw_point_label(surface, start_text, color, start_x, start_y, labels))
         
-        # Draw coordinates labels with modern styling
-        if self.original_coords:
-            label_font = pygame.font.Font(None, 16)
-            
-            # Start point label
-            start_text = f"({self.original_coords[0]},{self.original_coords[1]})"
-            start_surface = label_font.render(start_text, True, WHITE)
-            label_start_x = start_x + 8
-            label_start_y = start_y - 22
-            bg_rect = start_surface.get_rect(topleft=(label_start_x - 3, label_start_y - 2))
-            bg_rect.inflate_ip(6, 4)
-            pygame.draw.rect(surface, self.color, bg_rect, border_radius=4)
-            pygame.draw.rect(surface, WHITE, bg_rect, 2, border_radius=4)
-            surface.blit(start_surface, (label_start_x, label_start_y))
-            
-            # End point label
-            end_text = f"({self.original_coords[2]},{self.original_coords[3]})"
-            end_surface = label_font.render(end_text, True, WHITE)
-            label_end_x = end_x + 8
-            label_end_y = end_y - 22
-            bg_rect = end_surface.get_rect(topleft=(label_end_x - 3, label_end_y - 2))
-            bg_rect.inflate_ip(6, 4)
-            pygame.draw.rect(surface, self.color, bg_rect, border_radius=4)
-            pygame.draw.rect(surface, WHITE, bg_rect, 2, border_radius=4)
-            surface.blit(end_surface, (label_end_x, label_end_y))
+        # End point label
+        end_text = f"({original_coords[2]},{original_coords[3]})"
+        dirty.append(draw_point_label(surface, end_text, color, end_x, end_y, labels))
+    
+    return union_rects(dirty)
+
+
+def segment_distance(x, y, x1, y1, x2, y2):
+    """Distance from (x, y) to the segment (x1, y1)-(x2, y2)"""
+    dx, dy = x2 - x1, y2 - y1
+    length_sq = dx * dx + dy * dy
+    # Parameter of the closest point, clamped to the segment
+    t = 0.0 if length_sq == 0 else min(1.0, max(0.0, ((x - x1) * dx + (y - y1) * dy) / length_sq))
+    return hypot(x - (x1 + t * dx), y - (y1 + t * dy))
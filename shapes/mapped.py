@@ -0,0 +1,498 @@
+"""Binary scene files, memory-mapped and materialized chunk by chunk
+
+File layout (little-endian), version 1::
+
+    header       SCENE_HEADER, 48 bytes
+    palette      palette_size x (r, g, b) uint8
+    chunk data   per chunk, `count` fixed-width records of one shape kind
+    chunk index  chunk_count x CHUNK_INDEX entries (kind, count, offset, bounds)
+
+Records use the ColumnarScene column layout (int32 coordinates and
+draw order, uint8 palette index, bool label flag). The writer sorts each
+kind along a Z-order curve before cutting it into chunks, so a chunk
+covers a compact world area and its bounds in the index let a viewport
+skip it without touching its pages.
+"""
+
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from config import MAPPED_CHUNK_SHAPES, MAPPED_CHUNK_CACHE, PIXELS_PER_UNIT, POINT_RADIUS, LOD_POINT_SIZE_PX
+from utils.coordinates import visible_world_rect
+from .base import pick_topmost
+from .columnar import (ColumnarScene, CircleView, EllipseView, LineView, KINDS,
+                       CIRCLE_COLUMNS, ELLIPSE_COLUMNS, LINE_COLUMNS,
+                       column_bounds, intersects, draw_columns)
+from .edits import EditLog
+
+
+SCENE_MAGIC = b'PDSCENE\0'
+SCENE_VERSION = 1
+
+SCENE_HEADER = np.dtype([
+    ('magic', 'S8'), ('version', '<u2'), ('palette_size', '<u2'), ('chunk_count', '<u4'),
+    ('shape_count', '<u8'), ('zoom', '<f4'), ('reserved', '<u4'),
+    ('palette_offset', '<u8'), ('index_offset', '<u8'),
+])
+
+CHUNK_INDEX = np.dtype([
+    ('kind', 'u1'), ('count', '<u4'), ('offset', '<u8'),
+    ('xmin', '<i8'), ('ymin', '<i8'), ('xmax', '<i8'), ('ymax', '<i8'),
+    ('order_min', '<u4'), ('order_max', '<u4'),
+])
+
+
+def _record_dtype(columns):
+    """Packed little-endian record with one field per column"""
+    return np.dtype([(name, np.dtype(dtype).newbyteorder('<')) for name, dtype in columns.items()])
+
+
+RECORDS = {
+    'circle': _record_dtype(CIRCLE_COLUMNS),
+    'ellipse': _record_dtype(ELLIPSE_COLUMNS),
+    'line': _record_dtype(LINE_COLUMNS),
+}
+VIEWS = {'circle': CircleView, 'ellipse': EllipseView, 'line': LineView}
+
+
+def _shape_sizes(kind, records):
+    """World extent each record is given for level of detail (diameter, or a line's longest side)"""
+    if kind == 'circle':
+        return 2 * records['r'].astype(np.int64)
+    if kind == 'ellipse':
+        return 2 * np.maximum(records['rx'], records['ry']).astype(np.int64)
+    return np.maximum(np.abs(records['x2'].astype(np.int64) - records['x1']),
+                      np.abs(records['y2'].astype(np.int64) - records['y1']))
+
+
+def _lod_points(kind, records, cell):
+    """Zero-length line records standing in for the LOD points of records, one per world cell
+
+    Each cell keeps the first drawn shape's point, as a LabelPlacer does
+    per screen cell. Shapes that are not drawn at all are left out.
+    """
+    if kind == 'circle':
+        drawn = records[records['r'] > 0]
+        x, y = drawn['cx'], drawn['cy']
+    elif kind == 'ellipse':
+        drawn = records[(records['rx'] > 0) & (records['ry'] > 0)]
+        x, y = drawn['cx'], drawn['cy']
+    else:
+        drawn = records
+        x, y = drawn['x1'], drawn['y1']  # Lines collapse onto their start
+    rows = np.argsort(drawn['order'], kind='stable')
+    keys = np.stack([np.floor(x[rows] / cell), np.floor(y[rows] / cell)])
+    _, first = np.unique(keys, axis=1, return_index=True)
+    rows = rows[np.sort(first)]
+    points = np.zeros(len(rows), RECORDS['line'])
+    points['x1'] = points['x2'] = x[rows]
+    points['y1'] = points['y2'] = y[rows]
+    points['color'] = drawn['color'][rows]
+    points['order'] = drawn['order'][rows]
+    return points
+
+
+def _morton_keys(x, y):
+    """Z-order keys for coordinates scaled to a 1024 x 1024 grid"""
+    def spread(v):
+        v = v.astype(np.uint32)
+        v = (v | (v << 8)) & 0x00FF00FF
+        v = (v | (v << 4)) & 0x0F0F0F0F
+        v = (v | (v << 2)) & 0x33333333
+        return (v | (v << 1)) & 0x55555555
+
+    def cells(v):
+        lo, hi = v.min(), v.max()
+        return ((v - lo) * (1023.0 / max(hi - lo, 1))).astype(np.uint32)
+
+    return spread(cells(x)) | (spread(cells(y)) << 1)
+
+
+def write_mapped_scene(path, shapes, zoom_level=None, chunk_shapes=MAPPED_CHUNK_SHAPES):
+    """Write any scene (or iterable of shapes) as a binary scene file
+
+    The file is written next to path and then renamed over it, so a scene
+    that is memory-mapping path can be saved back to the same file.
+    """
+    store = shapes if hasattr(shapes, 'columns') else ColumnarScene(shapes)
+    palette = list(store.palette)
+    columns = store.columns()
+
+    header = np.zeros(1, SCENE_HEADER)
+    header['magic'] = SCENE_MAGIC
+    header['version'] = SCENE_VERSION
+    header['palette_size'] = len(palette)
+    header['shape_count'] = len(store)
+    header['zoom'] = np.nan if zoom_level is None else zoom_level
+    header['palette_offset'] = SCENE_HEADER.itemsize
+
+    index = []
+    offset = SCENE_HEADER.itemsize + 3 * len(palette)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(bytes(SCENE_HEADER.itemsize))  # Filled in once the index is known
+        f.write(np.asarray(palette, np.uint8).reshape(-1, 3).tobytes())
+
+        for kind_id, kind in enumerate(KINDS):
+            cols = columns.get(kind)
+            if cols is None or len(cols['order']) == 0:
+                continue
+            n = len(cols['order'])
+            records = np.empty(n, RECORDS[kind])
+            for name in records.dtype.names:
+                records[name] = cols[name]
+            xmin, ymin, xmax, ymax = (np.asarray(b, np.int64) for b in column_bounds(kind, records))
+            keys = _morton_keys((xmin + xmax) // 2, (ymin + ymax) // 2)
+            ordering = np.lexsort((records['order'], keys))
+            records = records[ordering]
+            bounds = [b[ordering] for b in (xmin, ymin, xmax, ymax)]
+
+            for start in range(0, n, chunk_shapes):
+                chunk = records[start:start + chunk_shapes]
+                part = [b[start:start + chunk_shapes] for b in bounds]
+                index.append((kind_id, len(chunk), offset,
+                              part[0].min(), part[1].min(), part[2].max(), part[3].max(),
+                              chunk['order'].min(), chunk['order'].max()))
+                f.write(chunk.tobytes())
+                offset += chunk.nbytes
+
+        header['chunk_count'] = len(index)
+        header['index_offset'] = offset
+        f.write(np.array(index, CHUNK_INDEX).tobytes())
+        f.seek(0)
+        f.write(header.tobytes())
+    os.replace(temp_path, path)
+
+
+class _RecordTable:
+    """Adapter so the columnar views can read rows of a structured array"""
+    __slots__ = ('arrays',)
+
+    def __init__(self, records):
+        self.arrays = records
+
+
+class MappedScene:
+    """Scene backed by a memory-mapped binary scene file
+
+    Opening reads only the header, palette and chunk index. Chunks are
+    copied out of the mapping (materialized) the first time a query or
+    draw touches them, and at most MAPPED_CHUNK_CACHE of them are kept.
+    Zoomed out, a chunk whose shapes all collapse to LOD points is drawn
+    from a small cached set of points instead, so the view need not
+    materialize every chunk it covers on each frame.
+    Shapes appended after opening go to an in-memory ColumnarScene that
+    shares the file's palette and is drawn on top of the file's shapes.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._map = np.memmap(path, dtype=np.uint8, mode='r')
+        if len(self._map) < SCENE_HEADER.itemsize:
+            raise ValueError(f"{path} is not a scene file")
+        header = self._map[:SCENE_HEADER.itemsize].view(SCENE_HEADER)[0]
+        if self._map[:len(SCENE_MAGIC)].tobytes() != SCENE_MAGIC:
+            raise ValueError(f"{path} is not a scene file")
+        if header['version'] != SCENE_VERSION:
+            raise ValueError(f"{path}: unsupported scene version {header['version']}")
+
+        start = int(header['palette_offset'])
+        colors = self._map[start:start + 3 * int(header['palette_size'])].reshape(-1, 3)
+        start = int(header['index_offset'])
+        self.index = np.array(self._map[start:start + CHUNK_INDEX.itemsize * int(header['chunk_count'])]
+                              .view(CHUNK_INDEX))
+        self.file_count = int(header['shape_count'])
+        self.zoom_level = None if np.isnan(header['zoom']) else float(header['zoom'])
+
+        self.overlay = ColumnarScene()
+        for color in colors.tolist():
+            self.overlay.color_index(color)
+        self.palette = self.overlay.palette  # Shared, so indices agree
+        self._chunks = OrderedDict()
+        self._reset_lod()
+        self.generation = 0  # Bumped when the whole scene changes (single-shape edits go to edits)
+        self.edits = EditLog()
+
+    def _reset_lod(self):
+        self._sizes = np.full(len(self.index), -1, np.int64)  # Largest shape per chunk (-1: not read yet)
+        self._lod_cell = None  # World cell size (so zoom level) the cached LOD points were built for
+        self._lod_points = {}  # Chunk -> its LOD points as zero-length line records
+
+    def __len__(self):
+        return self.file_count + len(self.overlay)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    # ---------------------
+    # Chunks
+    # ---------------------
+    def _read_chunk(self, i):
+        """Copy chunk i out of the mapping (bypasses the cache)"""
+        entry = self.index[i]
+        start = int(entry['offset'])
+        dtype = RECORDS[KINDS[entry['kind']]]
+        return np.array(self._map[start:start + dtype.itemsize * int(entry['count'])].view(dtype))
+
+    def _chunk(self, i):
+        """Materialized records of chunk i (least recently used chunks are dropped)"""
+        records = self._chunks.get(i)
+        if records is None:
+            records = self._chunks[i] = self._read_chunk(i)
+            if len(self._chunks) > MAPPED_CHUNK_CACHE:
+                self._chunks.popitem(last=False)
+        else:
+            self._chunks.move_to_end(i)
+        return records
+
+    def _file_rows(self, xmin, ymin, xmax, ymax, zoom_level=None):
+        """Per kind, the file records whose bounds intersect the world rect
+
+        Given the zoom level they are drawn at, chunks small enough on
+        screen to collapse entirely to LOD points contribute their cached
+        LOD points (as lines) instead of their records.
+        """
+        index = self.index
+        hits = np.nonzero((index['xmax'] >= xmin) & (index['xmin'] <= xmax) &
+                          (index['ymax'] >= ymin) & (index['ymin'] <= ymax))[0]
+        found = {kind: [] for kind in KINDS}
+        cell = self._lod_cell_for(zoom_level)
+        for i in hits.tolist():
+            kind = KINDS[index['kind'][i]]
+            if cell is not None:
+                points = self._chunk_lod(i, kind, cell, zoom_level)
+                if points is not None:
+                    found['line'].append(points[(points['x1'] >= xmin) & (points['x1'] <= xmax) &
+                                                (points['y1'] >= ymin) & (points['y1'] <= ymax)])
+                    continue
+            records = self._chunk(i)
+            found[kind].append(records[intersects(kind, records, xmin, ymin, xmax, ymax)])
+        return [np.concatenate(found[kind]) if found[kind] else np.empty(0, RECORDS[kind])
+                for kind in KINDS]
+
+    def _lod_cell_for(self, zoom_level):
+        """World size of POINT_RADIUS pixels (the placer's point cell), or None zoomed in further"""
+        if zoom_level is None:
+            return None
+        cell = POINT_RADIUS / (PIXELS_PER_UNIT * zoom_level)
+        if cell < 2:
+            return None  # Shapes a world unit apart are apart on screen; points would not merge
+        if cell != self._lod_cell:
+            self._lod_cell, self._lod_points = cell, {}
+        return cell
+
+    def _chunk_lod(self, i, kind, cell, zoom_level):
+        """Cached LOD points of chunk i, or None when some of its shapes are drawn in full"""
+        points = self._lod_points.get(i)
+        if points is not None:
+            return points
+        records = None
+        if self._sizes[i] < 0:
+            records = self._chunk(i)
+            self._sizes[i] = _shape_sizes(kind, records).max()
+        # Conservative: int() rounding moves a line's ends by under a pixel each
+        if self._sizes[i] * PIXELS_PER_UNIT * zoom_level + 1 > LOD_POINT_SIZE_PX:
+            return None
+        if records is None:
+            records = self._chunks.get(i)
+        if records is None:
+            records = self._read_chunk(i)  # Its points stand in for it, so it skips the cache
+        points = self._lod_points[i] = _lod_points(kind, records, cell)
+        return points
+
+    # ---------------------
+    # Scene interface
+    # ---------------------
+    def append(self, shape):
+        """Add a shape on top of the scene (kept in memory until saved)"""
+        self.overlay.append(shape)
+
+    def extend(self, shapes):
+        """Add several shapes on top of the scene"""
+        self.overlay.extend(shapes)
+
+    def clear(self):
+        """Remove every shape, including the file's"""
+        self.index = np.empty(0, CHUNK_INDEX)
+        self.file_count = 0
+        self._chunks.clear()
+        self._reset_lod()
+        self.overlay.clear()
+        self._replaced()
+
+    def _replaced(self):
+        """Every shape may have changed: caches rebuild, so the edit log starts over"""
+        self.edits.reset()
+        self.generation += 1
+
+    # ---------------------
+    # Edits (used by the undo history)
+    # ---------------------
+    def _file_shape(self, position):
+        """Refuse edits of shapes stored in the file (they are read-only)"""
+        if position < self.file_count:
+            raise ValueError("shapes stored in the scene file cannot be edited")
+        return position - self.file_count
+
+    def index_of(self, shape):
+        """Draw-order position of a view handed out by this scene"""
+        if isinstance(shape._table, _RecordTable):
+            return int(shape._table.arrays['order'][shape._row])
+        return self.file_count + self.overlay.index_of(shape)
+
+    def _overlay_edit(self, method, position, *args):
+        """Run an overlay edit and log its entries past the file's shapes"""
+        start, generation = len(self.overlay.edits), self.overlay.generation
+        result = getattr(self.overlay, method)(self._file_shape(position), *args)
+        if self.overlay.generation != generation:
+            self._replaced()  # The overlay's log was full
+        else:
+            positions, changes, *bounds = self.overlay.edits.since(start)
+            if not self.edits.record(positions + self.file_count, changes, *bounds):
+                self._replaced()
+        return result
+
+    def truncate(self, length):
+        """Remove the appended shapes at positions >= length; returns them as a ShapeBatch"""
+        return self._overlay_edit('truncate', length)
+
+    def remove(self, position):
+        """Remove one appended shape; returns a token that insert() puts back"""
+        return self._overlay_edit('remove', position)
+
+    def insert(self, position, removed):
+        """Put back a shape taken out by remove()"""
+        self._overlay_edit('insert', position, removed)
+
+    def recolor(self, position, color):
+        """Change the color of one appended shape; returns the old color"""
+        return self._overlay_edit('recolor', position, color)
+
+    def detach(self):
+        """Move the file and the appended shapes into a new MappedScene, leaving this one empty"""
+        detached = object.__new__(MappedScene)
+        detached.__dict__.update(self.__dict__)
+        detached.overlay = self.overlay.detach()
+        detached.palette = detached.overlay.palette
+        detached.edits = EditLog()
+        self.index = np.empty(0, CHUNK_INDEX)
+        self.file_count = 0
+        self._chunks = OrderedDict()
+        self._reset_lod()
+        self._replaced()
+        return detached
+
+    def attach(self, other):
+        """Take over the file and shapes of a detached MappedScene (this scene must be empty)"""
+        self._map, self.index, self.file_count, self._chunks = (
+            other._map, other.index, other.file_count, other._chunks)
+        self._sizes, self._lod_cell, self._lod_points = other._sizes, other._lod_cell, other._lod_points
+        self.overlay.attach(other.overlay)
+        self._replaced()
+
+    def nbytes(self):
+        """Bytes held in memory (appended shapes, materialized chunks and LOD points; the file is mapped)"""
+        return (self.overlay.nbytes() + sum(records.nbytes for records in self._chunks.values())
+                + sum(points.nbytes for points in self._lod_points.values()))
+
+    def _views(self, kind, records):
+        table = _RecordTable(records)
+        view = VIEWS[kind]
+        return [(order, view(table, self.palette, row))
+                for row, order in enumerate(records['order'].tolist())]
+
+    def query(self, xmin, ymin, xmax, ymax):
+        """Views of shapes whose bounds intersect the world rect, in draw order"""
+        views = []
+        for kind, records in zip(KINDS, self._file_rows(xmin, ymin, xmax, ymax)):
+            views.extend(self._views(kind, records))
+        views.sort(key=lambda item: item[0])
+        return [view for _, view in views] + self.overlay.query(xmin, ymin, xmax, ymax)
+
+    def columns_in(self, xmin, ymin, xmax, ymax):
+        """(palette, {kind: {name: array}}) of the shapes whose bounds intersect the world rect"""
+        palette, overlay = self.overlay.columns_in(xmin, ymin, xmax, ymax)
+        columns = {}
+        for kind, records in zip(KINDS, self._file_rows(xmin, ymin, xmax, ymax)):
+            cols = dict(overlay[kind], order=overlay[kind]['order'] + self.file_count)
+            columns[kind] = {name: np.concatenate([records[name], cols[name]]) for name in cols}
+        return palette, columns
+
+    def visible(self, canvas_width, height, center_x, center_y, zoom_level, margin_px=0):
+        """Views of shapes that may be visible on the canvas, in draw order"""
+        return self.query(*visible_world_rect(
+            canvas_width, height, center_x, center_y, zoom_level, margin_px
+        ))
+
+    def pick(self, x, y, tolerance):
+        """Topmost shape whose outline passes within tolerance (world units) of (x, y), or None"""
+        shape = self.overlay.pick(x, y, tolerance)  # Appended shapes are drawn on top
+        if shape is not None:
+            return shape
+        rect = (x - tolerance, y - tolerance, x + tolerance, y + tolerance)
+        views = []
+        for kind, records in zip(KINDS, self._file_rows(*rect)):
+            views.extend(self._views(kind, records))
+        views.sort(key=lambda item: item[0])
+        return pick_topmost([view for _, view in views], x, y, tolerance)
+
+    def draw_batch(self, surface, canvas_width, height, center_x, center_y, zoom_level,
+                   margin_px=0, since=None, labels=None):
+        """Draw every visible shape, materializing only the chunks in view
+
+        Returns the dirty rects of shapes whose draw-order number is >= since.
+        """
+        rect = visible_world_rect(canvas_width, height, center_x, center_y, zoom_level, margin_px)
+        dirty = draw_columns(surface, self.palette, *self._file_rows(*rect, zoom_level),
+                             center_x, center_y, zoom_level, since, labels)
+        overlay_since = None if since is None else max(0, since - self.file_count)
+        return dirty + self.overlay.draw_batch(surface, canvas_width, height, center_x, center_y,
+                                               zoom_level, margin_px, overlay_since, labels)
+
+    def bounds_since(self, start):
+        """Bounds arrays of shapes appended since position start (the overlay part)"""
+        return self.overlay.bounds_since(max(0, start - self.file_count))
+
+    def _shape_at(self, order):
+        if order >= self.file_count:
+            return self.overlay[order - self.file_count]
+        index = self.index
+        for i in np.nonzero((index['order_min'] <= order) & (index['order_max'] >= order))[0].tolist():
+            records = self._chunk(i)
+            rows = np.nonzero(records['order'] == order)[0]
+            if len(rows):
+                kind = KINDS[index['kind'][i]]
+                return VIEWS[kind](_RecordTable(records), self.palette, int(rows[0]))
+        raise IndexError("MappedScene index out of range")
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._shape_at(order) for order in range(len(self))[i]]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("MappedScene index out of range")
+        return self._shape_at(i)
+
+    def __iter__(self):
+        # Reads the whole file - meant for export, not for drawing
+        views = []
+        for i in range(len(self.index)):
+            views.extend(self._views(KINDS[self.index['kind'][i]], self._read_chunk(i)))
+        views.sort(key=lambda item: item[0])
+        return iter([view for _, view in views] + self.overlay[:])
+
+    def columns(self):
+        """Per kind, every column of the file plus the overlay: {kind: {name: array}}"""
+        found = {kind: [] for kind in KINDS}
+        for i in range(len(self.index)):
+            found[KINDS[self.index['kind'][i]]].append(self._read_chunk(i))
+        columns = {}
+        for kind, overlay in self.overlay.columns().items():
+            records = np.concatenate(found[kind]) if found[kind] else np.empty(0, RECORDS[kind])
+            columns[kind] = {name: np.concatenate([records[name],
+                                                   overlay[name] + self.file_count
+                                                   if name == 'order' else overlay[name]])
+                             for name in overlay}
+        return columns
@@ -0,0 +1,485 @@
+"""Batched NumPy rasterizer for circles, ellipses and lines
+
+The "numpy" render backend. Instead of one pygame.draw call per outline
+and dot, a batch of shapes is expanded into flat pixel indices with array
+math and written through a pixels2d view of the (32-bit) surface, one
+assignment per chunk of up to RASTER_CHUNK_PIXELS pixels.
+
+Every outline, dot and short line is stamped from a cached stencil, the
+pixel offsets of one circle radius, ellipse size, dot or line vector.
+Outline and dot stencils are traced once with pygame.draw itself. Lines
+are stepped in closed form with pygame.draw.line's Bresenham decisions
+and width spans; longer ones have too many distinct vectors to cache and
+are stepped chunk by chunk instead. Output therefore matches the pygame
+backend pixel for pixel, except:
+
+- Rare pixels of lines cut by the surface's clip rect. Both backends
+  step them again from the point where pygame clips their start, but a
+  line grazing a clip corner may still be kept here where pygame drops
+  it: about 5 in 1,000,000 of their pixels differ.
+- Without a LabelPlacer, labels are drawn after all geometry of the batch
+  instead of right after their own shape.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+from config import (LINE_WIDTH, POINT_RADIUS, POINT_SIZE, LOD_POINT_SIZE_PX, LABEL_MIN_SIZE_PX,
+                    RENDER_BACKEND, RASTER_STENCIL_MAX_PX, RASTER_LINE_MAX_PX, RASTER_LINE_STENCIL_PX,
+                    RASTER_STENCIL_CACHE, RASTER_CHUNK_PIXELS)
+from drawing.viewport import screen_lengths
+from .base import (draws_geometry, draws_labels, draw_center_label, draw_point_label, draw_ring, draw_oval,
+                   draw_segment, union_rects)
+
+
+BACKENDS = ('pygame', 'numpy')
+
+# Stamp kinds: a and b are the size (radius, or rx and ry) or a line's end relative to its start
+RING, OVAL, DOT, SEGMENT = range(4)
+
+_SPREAD = 1 - LINE_WIDTH % 2 - LINE_WIDTH // 2  # Offset of a line's first pixel across its width
+
+_backend = RENDER_BACKEND
+
+
+def set_backend(name):
+    """Select how every scene store rasterizes shapes ('pygame' or 'numpy')"""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown render backend {name!r} (expected one of: {', '.join(BACKENDS)})")
+    _backend = name
+
+
+def get_backend():
+    """Name of the selected render backend"""
+    return _backend
+
+
+def rasterizes(surface):
+    """True when batches drawn onto surface go through the numpy backend"""
+    return _backend == 'numpy' and surface.get_bytesize() == 4
+
+
+# =====================
+# Stencils
+# =====================
+_stencils = OrderedDict()  # Packed (kind, a, b) -> (dx, dy, box): int32 offsets from the stamp position
+
+# Stamp keys packed into one int64: kind, then a and b (which may be negative for lines)
+_KEY_BITS = 21
+_KEY_BIAS = 1 << (_KEY_BITS - 1)
+_KEY_MASK = (1 << _KEY_BITS) - 1
+
+
+def _pack_keys(kind, a, b):
+    return (kind << (2 * _KEY_BITS)) | ((a + _KEY_BIAS) << _KEY_BITS) | (b + _KEY_BIAS)
+
+
+def _unpack_key(code):
+    return code >> (2 * _KEY_BITS), ((code >> _KEY_BITS) & _KEY_MASK) - _KEY_BIAS, (code & _KEY_MASK) - _KEY_BIAS
+
+
+def _built_stencil(kind, a, b):
+    """Offsets pygame.draw covers for one outline, dot or line"""
+    if kind == SEGMENT:
+        k = np.arange((max(abs(a), abs(b)) + 1) * LINE_WIDTH)
+        xs, ys = _segment_offsets(np.full(len(k), a), np.full(len(k), b), k)
+        return xs.astype(np.int32), ys.astype(np.int32)
+    # Outlines and dots are read back from a scratch surface
+    pad = LINE_WIDTH + 2
+    width, height = 2 * (a + pad), 2 * ((b if kind == OVAL else a) + pad)
+    scratch = pygame.Surface((width, height), depth=8)
+    origin = (width // 2, height // 2)
+    if kind == RING:
+        pygame.draw.circle(scratch, 1, origin, a, 2)
+    elif kind == OVAL:
+        pygame.draw.ellipse(scratch, 1, (origin[0] - a, origin[1] - b, 2 * a, 2 * b), 2)
+    else:
+        pygame.draw.circle(scratch, 1, origin, a, 0)
+    xs, ys = np.nonzero(pygame.surfarray.array2d(scratch))
+    return (xs - origin[0]).astype(np.int32), (ys - origin[1]).astype(np.int32)
+
+
+def _segment_offsets(dx, dy, k):
+    """Offsets of pixel k of LINE_WIDTH lines from (0, 0) to (dx, dy), stepped as pygame.draw.line does
+
+    All three are arrays with one entry per pixel.
+    """
+    adx, ady = np.abs(dx), np.abs(dy)
+    major, minor = np.maximum(adx, ady), np.minimum(adx, ady)
+    step, spread = k // LINE_WIDTH, k % LINE_WIDTH + _SPREAD
+    # Bresenham in closed form: the minor coordinate at step k is ceil((k * minor - major // 2) / major)
+    drift = -((major // 2 - step * minor) // np.maximum(major, 1))
+    along_x = adx > ady  # The width spreads across the major axis
+    sign_x, sign_y = np.where(dx > 0, 1, -1), np.where(dy > 0, 1, -1)
+    xs = sign_x * np.where(along_x, step, drift) + np.where(along_x, 0, spread)
+    ys = sign_y * np.where(along_x, drift, step) + np.where(along_x, spread, 0)
+    return xs, ys
+
+
+def _boxed(dx, dy):
+    """A stencil as (dx, dy, (left, top, right, bottom)) with its bounding box"""
+    if not len(dx):
+        return dx, dy, (0, 0, 0, 0)
+    return dx, dy, (int(dx.min()), int(dy.min()), int(dx.max()) + 1, int(dy.max()) + 1)
+
+
+_EMPTY = _boxed(np.empty(0, np.int32), np.empty(0, np.int32))
+
+
+def _stencils_for(codes):
+    """(dx, dy, box) for each packed stamp key, building and caching the missing ones"""
+    found = [_stencils.get(code) for code in codes]
+    missing = [i for i, stencil in enumerate(found) if stencil is None]
+    for i in missing:
+        found[i] = _stencils[codes[i]] = _boxed(*_built_stencil(*_unpack_key(codes[i])))
+    for code in codes:
+        _stencils.move_to_end(code)
+    while len(_stencils) > RASTER_STENCIL_CACHE:
+        _stencils.popitem(last=False)
+    return found
+
+
+# =====================
+# Batches
+# =====================
+class _Stamps:
+    """Column lists of the stamps of a batch, sorted into draw order by build()"""
+    FIELDS = ('order', 'kind', 'x', 'y', 'a', 'b', 'color')
+
+    def __init__(self):
+        self.parts = {name: [] for name in self.FIELDS}
+
+    def add(self, order, kind, x, y, a, b, color):
+        n = len(order)
+        for name, values in zip(self.FIELDS, (order, kind, x, y, a, b, color)):
+            self.parts[name].append(np.broadcast_to(np.asarray(values, np.int64), (n,)))
+
+    def build(self):
+        if not self.parts['order']:
+            return None
+        columns = {name: np.concatenate(values) for name, values in self.parts.items()}
+        rows = np.argsort(columns['order'], kind='stable')  # Parts of one shape keep their order
+        return {name: values[rows] for name, values in columns.items()}
+
+
+def rasterize_columns(surface, palette, circles, ellipses, lines, center_x, center_y, zoom_level,
+                      since=None, labels=None):
+    """Draw rows given as per-kind column mappings (as draw_columns), a batch at a time
+
+    Returns at most one dirty rect covering the rows whose draw-order
+    number is >= since.
+    """
+    batch, texts = stamp_columns(circles, ellipses, lines, center_x, center_y, zoom_level, labels)
+    dirty = stamp_batch(surface, palette, batch, since) if batch is not None else []
+    for order, draw, text, color, x, y in texts:
+        rect = draw(surface, text, palette[color], x, y, labels)
+        if since is not None and order >= since:
+            dirty.append(rect)
+
+    if since is None:
+        return []
+    rect = union_rects(dirty)
+    return [rect] if rect else []
+
+
+def stamp_columns(circles, ellipses, lines, center_x, center_y, zoom_level, labels=None):
+    """The stamps and coordinate labels of rows given as per-kind column mappings
+
+    Returns (batch, texts): the stamps as columns sorted into draw order
+    (None without geometry to draw) and (order, draw, text, color, x, y)
+    label calls, also in draw order. LOD points are claimed on the placer.
+    """
+    stamps, points, texts = _stamp_parts(circles, ellipses, lines, center_x, center_y, zoom_level, labels)
+    batch = None
+    if draws_geometry(labels):
+        order, x, y, color = points
+        if labels is not None:
+            order, x, y, color = _claim_points(labels, order, x, y, color)
+        stamps.add(order, DOT, x, y, POINT_RADIUS, 0, color)
+        batch = stamps.build()
+    return batch, texts
+
+
+def split_stamp_columns(circles, ellipses, lines, center_x, center_y, zoom_level, labels=None):
+    """As stamp_columns, but with the LOD points kept out of the batch and left unclaimed
+
+    Returns (batch, points, texts) with points the (order, x, y, color)
+    arrays of every shape collapsed to a LOD point.
+    """
+    stamps, points, texts = _stamp_parts(circles, ellipses, lines, center_x, center_y, zoom_level, labels)
+    return (stamps.build() if draws_geometry(labels) else None), points, texts
+
+
+def _stamp_parts(circles, ellipses, lines, center_x, center_y, zoom_level, labels):
+    """(stamps, points, texts) of stamp_columns before the LOD points are claimed and added"""
+    def to_len(values):
+        return screen_lengths(values, zoom_level)
+
+    stamps = _Stamps()
+    points = []  # (order, x, y, color) of shapes collapsed to a LOD point
+    texts = []  # (order, draw, text, color, x, y) of coordinate labels
+
+    c = circles
+    keep = c['r'] > 0
+    order, color = c['order'][keep], c['color'][keep]
+    sx, sy, sr = center_x + to_len(c['cx'][keep]), center_y - to_len(c['cy'][keep]), to_len(c['r'][keep])
+    lod = sr * 2 < LOD_POINT_SIZE_PX
+    points.append((order[lod], sx[lod], sy[lod], color[lod]))
+    full = ~lod
+    stamps.add(order[full], RING, sx[full], sy[full], sr[full], 0, color[full])
+    stamps.add(order[full], DOT, sx[full], sy[full], POINT_RADIUS, 0, color[full])
+    if draws_labels(labels):
+        texted = full & c['labelled'][keep] & (sr * 2 >= LABEL_MIN_SIZE_PX)
+        for order_, cx, cy, x, text_y, color_ in zip(
+                order[texted].tolist(), c['cx'][keep][texted].tolist(), c['cy'][keep][texted].tolist(),
+                sx[texted].tolist(), (sy - sr - 25)[texted].tolist(), color[texted].tolist()):
+            texts.append((order_, draw_center_label, f"C({cx},{cy})", color_, x, text_y))
+
+    e = ellipses
+    keep = (e['rx'] > 0) & (e['ry'] > 0)
+    order, color = e['order'][keep], e['color'][keep]
+    sx, sy = center_x + to_len(e['cx'][keep]), center_y - to_len(e['cy'][keep])
+    srx, sry = to_len(e['rx'][keep]), to_len(e['ry'][keep])
+    size = np.maximum(srx, sry) * 2
+    lod = size < LOD_POINT_SIZE_PX
+    points.append((order[lod], sx[lod], sy[lod], color[lod]))
+    full = ~lod
+    stamps.add(order[full], OVAL, sx[full], sy[full], srx[full], sry[full], color[full])
+    stamps.add(order[full], DOT, sx[full], sy[full], POINT_RADIUS, 0, color[full])
+    if draws_labels(labels):
+        texted = full & e['labelled'][keep] & (size >= LABEL_MIN_SIZE_PX)
+        for order_, cx, cy, x, text_y, color_ in zip(
+                order[texted].tolist(), e['cx'][keep][texted].tolist(), e['cy'][keep][texted].tolist(),
+                sx[texted].tolist(), (sy - sry - 25)[texted].tolist(), color[texted].tolist()):
+            texts.append((order_, draw_center_label, f"C({cx},{cy})", color_, x, text_y))
+
+    l = lines
+    order, color = l['order'], l['color']
+    sx1, sy1 = center_x + to_len(l['x1']), center_y - to_len(l['y1'])
+    sx2, sy2 = center_x + to_len(l['x2']), center_y - to_len(l['y2'])
+    size = np.maximum(np.abs(sx2 - sx1), np.abs(sy2 - sy1))
+    lod = size < LOD_POINT_SIZE_PX
+    points.append((order[lod], sx1[lod], sy1[lod], color[lod]))
+    full = ~lod
+    stamps.add(order[full], SEGMENT, sx1[full], sy1[full], (sx2 - sx1)[full], (sy2 - sy1)[full], color[full])
+    stamps.add(order[full], DOT, sx1[full], sy1[full], POINT_SIZE, 0, color[full])
+    stamps.add(order[full], DOT, sx2[full], sy2[full], POINT_SIZE, 0, color[full])
+    if draws_labels(labels):
+        texted = full & l['labelled'] & (size >= LABEL_MIN_SIZE_PX)
+        for order_, x1, y1, x2, y2, px1, py1, px2, py2, color_ in zip(
+                order[texted].tolist(), l['x1'][texted].tolist(), l['y1'][texted].tolist(),
+                l['x2'][texted].tolist(), l['y2'][texted].tolist(), sx1[texted].tolist(),
+                sy1[texted].tolist(), sx2[texted].tolist(), sy2[texted].tolist(), color[texted].tolist()):
+            texts.append((order_, draw_point_label, f"({x1},{y1})", color_, px1, py1))
+            texts.append((order_, draw_point_label, f"({x2},{y2})", color_, px2, py2))
+
+    texts.sort(key=lambda text: text[0])
+    return stamps, tuple(np.concatenate(part) for part in zip(*points)), texts
+
+
+def _claim_points(labels, order, x, y, color):
+    """Keep the LOD points the placer lets through (first in draw order per spot), claiming them"""
+    if not len(order):
+        return order, x, y, color
+    rows = np.argsort(order, kind='stable')
+    order, x, y, color = order[rows], x[rows], y[rows], color[rows]
+    kx, ky = x // POINT_RADIUS, y // POINT_RADIUS
+    _, first = np.unique(np.stack([kx, ky]), axis=1, return_index=True)
+    first.sort()
+    keys = list(zip(kx[first].tolist(), ky[first].tolist()))
+    taken = labels.points
+    if taken:
+        fresh = np.array([key not in taken for key in keys], np.bool_)
+        first = first[fresh]
+        keys = [key for key, keep in zip(keys, fresh.tolist()) if keep]
+    taken.update(keys)
+    return order[first], x[first], y[first], color[first]
+
+
+# =====================
+# Pixel writes
+# =====================
+def stamp_batch(surface, palette, batch, since=None):
+    """Write the stamps in draw order; the dirty rects of stamps at order >= since"""
+    kind, x, y, a, b, order = batch['kind'], batch['x'], batch['y'], batch['a'], batch['b'], batch['order']
+    clip = surface.get_clip()
+    colors = np.array([surface.map_rgb(color) for color in palette], np.int64).astype(np.uint32)
+    # Outlines and lines too big to expand cheaply go to pygame.draw, in their place in the order
+    big = (((kind == RING) | (kind == OVAL)) & (np.maximum(a, b) > RASTER_STENCIL_MAX_PX)) | \
+          ((kind == SEGMENT) & (np.maximum(np.abs(a), np.abs(b)) > RASTER_LINE_MAX_PX))
+
+    # Stencil bank: the offsets of every distinct stamp key, back to back (big stamps and lines
+    # stepped in closed form get an empty one)
+    segment = (kind == SEGMENT) & ~big & (np.maximum(np.abs(a), np.abs(b)) > RASTER_LINE_STENCIL_PX)
+    stenciled = ~big & ~segment
+    unique, inverse = np.unique(_pack_keys(kind[stenciled], a[stenciled], b[stenciled]), return_inverse=True)
+    stencils = _stencils_for(unique.tolist()) + [_EMPTY]
+    stencil_of = np.full(len(kind), len(stencils) - 1, np.int64)
+    stencil_of[stenciled] = inverse.reshape(-1)
+    sizes = np.array([len(dx) for dx, _, _ in stencils], np.int64)
+    bank_dx = np.concatenate([dx for dx, _, _ in stencils]).astype(np.int64)
+    bank_dy = np.concatenate([dy for _, dy, _ in stencils]).astype(np.int64)
+    bank_start = np.cumsum(sizes) - sizes
+    box = np.array([box for _, _, box in stencils], np.int64)[stencil_of]
+    counts = sizes[stencil_of]
+
+    # Lines: pixel count and box in closed form, the width spanning the minor axis
+    la, lb = a[segment], b[segment]
+    along_x = np.abs(la) > np.abs(lb)
+    counts[segment] = (np.maximum(np.abs(la), np.abs(lb)) + 1) * LINE_WIDTH
+    box[segment] = np.stack([np.minimum(la, 0) + np.where(along_x, 0, _SPREAD),
+                             np.minimum(lb, 0) + np.where(along_x, _SPREAD, 0),
+                             np.maximum(la, 0) + np.where(along_x, 1, _SPREAD + LINE_WIDTH),
+                             np.maximum(lb, 0) + np.where(along_x, _SPREAD + LINE_WIDTH, 1)], axis=1)
+    left, top, right, bottom = x + box[:, 0], y + box[:, 1], x + box[:, 2], y + box[:, 3]
+
+    counts[(right <= clip.left) | (left >= clip.right) | (bottom <= clip.top) | (top >= clip.bottom)] = 0
+    crossing = (counts > 0) & ((left < clip.left) | (right > clip.right) |
+                               (top < clip.top) | (bottom > clip.bottom))
+
+    # Lines cut by the clip are stepped again from where pygame clips their start
+    cut = np.nonzero(crossing & (kind == SEGMENT) & ~big & ((a != 0) | (b != 0)))[0]
+    if len(cut):
+        x, y = x.copy(), y.copy()
+        x[cut], y[cut], steps = _clipped_starts(x[cut], y[cut], a[cut], b[cut], clip)
+        counts[cut] = (steps + 1) * LINE_WIDTH
+        segment[cut] = True
+
+    flat, row = _flat_pixels(surface)
+    bank_flat = bank_dy * row + bank_dx
+    origin = y * row + x
+    dirty = []
+
+    # Chunks of whole stamps, bounded in expanded pixels and cut short before each big stamp
+    ends = np.cumsum(counts)
+    big_at = np.nonzero(big)[0].tolist() + [len(kind)]
+    first = next_big = 0
+    while first < len(kind):
+        done = ends[first - 1] if first else 0
+        last = min(max(first + 1, int(np.searchsorted(ends, done + RASTER_CHUNK_PIXELS, side='right'))),
+                   big_at[next_big])
+        if last > first:
+            part = slice(first, last)
+            _write(flat, row, clip, colors[batch['color'][part]], counts[part], crossing[part], origin[part],
+                   x[part], y[part], segment[part], a[part], b[part], bank_start[stencil_of[part]],
+                   bank_flat, bank_dx, bank_dy)
+        if last == big_at[next_big] < len(kind):
+            stamp = {name: int(values[last]) for name, values in batch.items()}
+            rect = _draw_big(surface, palette, stamp)
+            if since is not None and stamp['order'] >= since:
+                dirty.append(rect)
+            next_big += 1
+            last += 1
+        first = last
+    del flat  # Unlock the surface
+
+    if since is not None:
+        newer = (order >= since) & (counts > 0)
+        if newer.any():
+            rect = pygame.Rect(int(left[newer].min()), int(top[newer].min()), 0, 0)
+            rect.width, rect.height = int(right[newer].max()) - rect.left, int(bottom[newer].max()) - rect.top
+            dirty.append(rect.clip(clip))
+    return dirty
+
+
+def _clipped_starts(x, y, a, b, clip):
+    """Where pygame.draw.line starts lines from (x, y) to (x + a, y + b) cut by clip, and its step count
+
+    The start moves to where the exact line enters the clip, its other
+    coordinate rounded half away from zero; from there the line is stepped
+    with its original vector until it reaches its end. Lines missing the
+    clip get -1 steps (no pixels).
+    """
+    t0, t1 = np.zeros(len(x)), np.ones(len(x))
+    start_x, start_y = x.copy(), y.copy()
+    missed = np.zeros(len(x), np.bool_)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for p, q, edge, on_x in ((-a, x - clip.left, clip.left, True), (a, clip.right - x, clip.right, True),
+                                 (-b, y - clip.top, clip.top, False), (b, clip.bottom - y, clip.bottom, False)):
+            missed |= (p == 0) & (q < 0)
+            t = q / p
+            enter = (p < 0) & (t > t0)
+            t0 = np.where(enter, t, t0)
+            t1 = np.where(p > 0, np.minimum(t1, t), t1)
+            if on_x:
+                start_x[enter] = edge
+                start_y[enter] = y[enter] + _round_half_out(t[enter] * b[enter])
+            else:
+                start_x[enter] = x[enter] + _round_half_out(t[enter] * a[enter])
+                start_y[enter] = edge
+    along_x = np.abs(a) > np.abs(b)
+    major, minor = np.maximum(np.abs(a), np.abs(b)), np.minimum(np.abs(a), np.abs(b))
+    start_major, start_minor = np.where(along_x, start_x, start_y), np.where(along_x, start_y, start_x)
+    end_major, end_minor = np.where(along_x, x + a, y + b), np.where(along_x, y + b, x + a)
+    steps = np.abs(end_major - start_major)
+    # pygame only stops on the exact end: a line stepped past it runs on out of the clip
+    drift = -((major // 2 - steps * minor) // major)
+    overrun = start_minor + np.where(along_x, np.sign(b), np.sign(a)) * drift != end_minor
+    forward = np.where(along_x, a, b) > 0
+    beyond = np.where(forward, np.where(along_x, clip.right, clip.bottom) - start_major,
+                      start_major - np.where(along_x, clip.left, clip.top) + 1)
+    steps = np.where(overrun, np.maximum(steps, beyond), steps)
+    return start_x, start_y, np.where(missed | (t0 > t1), -1, steps)
+
+
+def _round_half_out(values):
+    return np.sign(values) * np.floor(np.abs(values) + 0.5)
+
+
+def _draw_big(surface, palette, stamp):
+    """One oversized outline or line drawn directly (clipped to the view there, not expanded)"""
+    color, x, y, a, b = palette[stamp['color']], stamp['x'], stamp['y'], stamp['a'], stamp['b']
+    if stamp['kind'] == RING:
+        return draw_ring(surface, color, x, y, a, 2)
+    if stamp['kind'] == OVAL:
+        return draw_oval(surface, color, x, y, a, b, 2)
+    return draw_segment(surface, color, (x, y), (x + a, y + b), LINE_WIDTH)
+
+
+def _flat_pixels(surface):
+    """The surface's 32-bit pixels as one flat array indexed by y * row + x (and row)"""
+    pixels = pygame.surfarray.pixels2d(surface)
+    row = surface.get_pitch() // 4
+    width, height = surface.get_size()
+    flat = np.lib.stride_tricks.as_strided(pixels, shape=((height - 1) * row + width,), strides=(4,))
+    return flat, row
+
+
+def _write(flat, row, clip, colors, counts, crossing, origin, x, y, segment, a, b, start, bank_flat, bank_dx,
+           bank_dy):
+    """Expand one chunk of stamps into flat pixel indices and store their colors"""
+    first = np.cumsum(counts) - counts
+    index = np.arange(counts.sum()) + np.repeat(start - first, counts)
+    values = np.repeat(colors, counts)
+    if segment.any():
+        # Stencil pixels and stepped line pixels side by side, then tested against the clip as one
+        lines = np.repeat(segment, counts)
+        stenciled = ~lines
+        px, py = np.empty(len(index), np.int64), np.empty(len(index), np.int64)
+        px[stenciled], py[stenciled] = bank_dx[index[stenciled]], bank_dy[index[stenciled]]
+        local = index[lines] - np.repeat(start, counts)[lines]  # Pixel number within its line
+        px[lines], py[lines] = _segment_offsets(np.repeat(a, counts)[lines], np.repeat(b, counts)[lines], local)
+        px += np.repeat(x, counts)
+        py += np.repeat(y, counts)
+        if crossing.any():
+            keep = ~np.repeat(crossing, counts) | ((px >= clip.left) & (px < clip.right) &
+                                                    (py >= clip.top) & (py < clip.bottom))
+            px, py, values = px[keep], py[keep], values[keep]
+        target = py * row + px
+    else:
+        target = np.repeat(origin, counts) + bank_flat[index]
+        cut = np.nonzero(crossing)[0]
+        if len(cut):
+            # Only stamps reaching past the clip rect need their pixels tested
+            m = counts[cut]
+            at = np.arange(m.sum()) + np.repeat(first[cut] - (np.cumsum(m) - m), m)
+            px = np.repeat(x[cut], m) + bank_dx[index[at]]
+            py = np.repeat(y[cut], m) + bank_dy[index[at]]
+            keep = np.ones(len(target), np.bool_)
+            keep[at[(px < clip.left) | (px >= clip.right) | (py < clip.top) | (py >= clip.bottom)]] = False
+            target, values = target[keep], values[keep]
+
+    # Later stamps overwrite earlier ones: NumPy assigns repeated indices in sequence
+    flat[target] = values
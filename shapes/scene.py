@@ -0,0 +1,178 @@
+"""Scene - ordered shape collection with a spatial index"""
+
+import numpy as np
+
+from utils.coordinates import visible_world_rect
+from utils.spatial_index import GridIndex
+from .base import pick_topmost
+from .columnar import ColumnarScene, draw_columns
+from .edits import EditLog
+from .raster import rasterizes
+
+
+class Scene:
+    """Ordered list of shapes kept in sync with a spatial index
+
+    Supports the list operations the application uses (append, extend,
+    clear, iteration, len, indexing) so it can stand in for the old
+    plain ``shapes`` list.
+    """
+    def __init__(self, shapes=()):
+        self._shapes = []
+        self._keys = []  # Index key of each shape (increasing, so keys keep draw order)
+        self._index = GridIndex()
+        self._next_key = 0
+        self.generation = 0  # Bumped when the whole scene changes (single-shape edits go to edits)
+        self.edits = EditLog()
+        self.extend(shapes)
+
+    def __len__(self):
+        return len(self._shapes)
+
+    def __iter__(self):
+        return iter(self._shapes)
+
+    def __getitem__(self, i):
+        return self._shapes[i]
+
+    def __bool__(self):
+        return bool(self._shapes)
+
+    def append(self, shape):
+        """Add a shape on top of the scene"""
+        key = self._next_key
+        self._next_key += 1
+        self._shapes.append(shape)
+        self._keys.append(key)
+        self._index.insert(key, shape, shape.bounds())
+
+    def extend(self, shapes):
+        """Add several shapes on top of the scene"""
+        for shape in shapes:
+            self.append(shape)
+
+    def clear(self):
+        """Remove every shape"""
+        self._shapes = []
+        self._keys = []
+        self._index = GridIndex()
+        self._replaced()
+
+    def _replaced(self):
+        """Every shape may have changed: caches rebuild, so the edit log starts over"""
+        self.edits.reset()
+        self.generation += 1
+
+    def _edited(self, positions, changes, xmin, ymin, xmax, ymax):
+        """Log single-shape edits for the caches (scalars or arrays, as EditLog.record)"""
+        if not self.edits.record(positions, changes, xmin, ymin, xmax, ymax):
+            self._replaced()
+
+    # ---------------------
+    # Edits (used by the undo history)
+    # ---------------------
+    def index_of(self, shape):
+        """Position of a shape in draw order (ValueError if it is not in the scene)"""
+        return self._shapes.index(shape)
+
+    def truncate(self, length):
+        """Remove the shapes at positions >= length; returns them as a list"""
+        removed = self._shapes[length:]
+        for key in self._keys[length:]:
+            self._index.remove(key)
+        del self._shapes[length:], self._keys[length:]
+        if removed:
+            # Last shape first, so each position is the shape's own when it goes
+            bounds = np.array([shape.bounds() for shape in reversed(removed)], np.float64)
+            self._edited(np.arange(length + len(removed) - 1, length - 1, -1), -1, *bounds.T)
+        return removed
+
+    def remove(self, position):
+        """Remove one shape; returns a token that insert() puts back"""
+        shape = self._shapes.pop(position)
+        key = self._keys.pop(position)
+        self._index.remove(key)
+        self._edited(position, -1, *shape.bounds())
+        return shape, key
+
+    def insert(self, position, removed):
+        """Put back a shape taken out by remove() at the same position"""
+        shape, key = removed
+        self._shapes.insert(position, shape)
+        self._keys.insert(position, key)  # Its old key still sorts between its neighbours
+        self._index.insert(key, shape, shape.bounds())
+        self._edited(position, 1, *shape.bounds())
+
+    def recolor(self, position, color):
+        """Change the color of one shape; returns the old color"""
+        shape = self._shapes[position]
+        old = shape.color
+        shape.color = color
+        self._edited(position, 0, *shape.bounds())
+        return old
+
+    def detach(self):
+        """Move every shape into a new Scene and return it, leaving this one empty"""
+        detached = Scene()
+        detached._shapes, detached._keys, detached._index = self._shapes, self._keys, self._index
+        self.clear()
+        return detached
+
+    def attach(self, other):
+        """Take over the shapes of a detached Scene (this scene must be empty)"""
+        self._shapes, self._keys, self._index = other._shapes, other._keys, other._index
+        other._shapes, other._keys, other._index = [], [], GridIndex()
+        self._replaced()
+
+    def bounds_since(self, start):
+        """(xmin, ymin, xmax, ymax) arrays for the shapes at positions >= start"""
+        bounds = np.array([shape.bounds() for shape in self._shapes[start:]], np.float64)
+        return tuple(bounds.reshape(-1, 4).T)
+
+    def query(self, xmin, ymin, xmax, ymax):
+        """Shapes whose bounds intersect the world rect, in draw order"""
+        return self._index.query(xmin, ymin, xmax, ymax)
+
+    def columns_in(self, xmin, ymin, xmax, ymax):
+        """(palette, {kind: {name: array}}) of the shapes whose bounds intersect the world rect"""
+        keys = self._index.query_keys(xmin, ymin, xmax, ymax)
+        positions = np.searchsorted(self._keys, keys).astype(np.int64)  # Keys increase with position
+        found = ColumnarScene(self._shapes[i] for i in positions.tolist())
+        return found.palette, {kind: dict(cols, order=positions[cols['order']])
+                               for kind, cols in found.columns().items()}
+
+    def visible(self, canvas_width, height, center_x, center_y, zoom_level, margin_px=0):
+        """Shapes that may be visible on the canvas, in draw order"""
+        return self.query(*visible_world_rect(
+            canvas_width, height, center_x, center_y, zoom_level, margin_px
+        ))
+
+    def pick(self, x, y, tolerance):
+        """Topmost shape whose outline passes within tolerance (world units) of (x, y), or None"""
+        return pick_topmost(self.query(x - tolerance, y - tolerance, x + tolerance, y + tolerance),
+                            x, y, tolerance)
+
+    def draw_batch(self, surface, canvas_width, height, center_x, center_y, zoom_level,
+                   margin_px=0, since=None, labels=None):
+        """Draw every visible shape in order (same interface as ColumnarScene)
+
+        Returns the dirty rects of shapes at positions >= since. With the
+        numpy backend the visible shapes are copied into columns and drawn
+        as one batch.
+        """
+        new_shapes = {id(shape) for shape in self._shapes[since:]} if since is not None else ()
+        visible = self.visible(canvas_width, height, center_x, center_y, zoom_level, margin_px)
+        if rasterizes(surface):
+            found = ColumnarScene(visible)
+            columns = found.columns()
+            # New shapes are the last in draw order, so they are a suffix of the visible ones
+            local_since = None if since is None else next(
+                (i for i, shape in enumerate(visible) if id(shape) in new_shapes), len(visible))
+            return draw_columns(surface, found.palette, columns['circle'], columns['ellipse'],
+                                columns['line'], center_x, center_y, zoom_level, local_since, labels)
+        dirty = []
+        for shape in visible:
+            rect = shape.draw(surface, center_x, center_y, zoom_level, labels)
+            if id(shape) in new_shapes:
+                dirty.append(rect)
+        return dirty
@@ -1,5 +1,6 @@
 """UI module - User Interface components"""
 
 from .panel import draw_input_panel, handle_panel_click, init_input_fields
+from .layout import Node, Layout
 
-__all__ = ['draw_input_panel', 'handle_panel_click', 'init_input_fields']
+__all__ = ['draw_input_panel', 'handle_panel_click', 'init_input_fields', 'Node', 'Layout']
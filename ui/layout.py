@@ -0,0 +1,82 @@
+"""Declarative widget layout shared by drawing and hit-testing"""
+
+from bisect import bisect_right
+
+
+class Node:
+    """One laid-out element of a widget tree
+
+    rect is in content coordinates. kind tells the drawing code what the
+    node is ('section', 'button', 'label', ...) and props carry what it
+    needs to draw it (text, colors, fonts). A node with an action can be
+    clicked: hit-testing reports the action. name, when given, lets the
+    owner find the node again (e.g. to redraw a stateful group). Children
+    are drawn after their parent, in order.
+    """
+    __slots__ = ('kind', 'rect', 'action', 'name', 'props', 'children')
+
+    def __init__(self, kind, rect, action=None, name=None, children=(), **props):
+        self.kind = kind
+        self.rect = rect
+        self.action = action
+        self.name = name
+        self.props = props
+        self.children = list(children)
+
+    def walk(self):
+        """This node and all its descendants in drawing (pre-)order"""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+class Layout:
+    """A laid-out widget tree with an interval index over its clickable nodes
+
+    Clickable nodes are grouped into rows of vertically overlapping
+    rects. hit() bisects the row tops for y, then the lefts within that
+    row for x, so a lookup costs O(log widgets). Building the index
+    raises ValueError when clickable rects in a row overlap horizontally,
+    since a click there could not be resolved by x alone.
+    """
+    def __init__(self, root):
+        self.root = root
+        self.named = {node.name: node for node in root.walk() if node.name is not None}
+        self._build_index()
+
+    def _build_index(self):
+        clickable = sorted((node for node in self.root.walk() if node.action is not None),
+                           key=lambda node: (node.rect.top, node.rect.left))
+        rows = []  # [top, bottom, nodes]
+        for node in clickable:
+            if rows and node.rect.top < rows[-1][1]:
+                rows[-1][1] = max(rows[-1][1], node.rect.bottom)
+                rows[-1][2].append(node)
+            else:
+                rows.append([node.rect.top, node.rect.bottom, [node]])
+
+        self._row_tops = [top for top, _, _ in rows]
+        self._row_bottoms = [bottom for _, bottom, _ in rows]
+        self._rows = []
+        for _, _, nodes in rows:
+            nodes.sort(key=lambda node: node.rect.left)
+            for before, after in zip(nodes, nodes[1:]):
+                if before.rect.right > after.rect.left:
+                    raise ValueError(f"Widgets {before.action} and {after.action} overlap in a row")
+            self._rows.append(([node.rect.left for node in nodes], nodes))
+
+    @property
+    def height(self):
+        """Height of the whole tree (the root's rect)"""
+        return self.root.rect.height
+
+    def hit(self, x, y):
+        """The clickable node under a content-space point, or None"""
+        row = bisect_right(self._row_tops, y) - 1
+        if row < 0 or y >= self._row_bottoms[row]:
+            return None
+        lefts, nodes = self._rows[row]
+        i = bisect_right(lefts, x) - 1
+        if i < 0 or not nodes[i].rect.collidepoint(x, y):
+            return None
+        return nodes[i]
@@ -3,6 +3,8 @@
 import pygame
 from config import *
 from drawing.renderer import draw_gradient_rect, draw_button_3d
+from drawing.fonts import render_text
+from .layout import Node, Layout
 from utils.coordinates import coordinate_to_screen
 
 
@@ -36,13 +38,233 @@ def init_input_fields(current_tool):
         }, 'x1'
 
 
+# Retained panel content (rendered off-screen, blitted through a viewport)
+HEADER_HEIGHT = 70
+TOOLS = [("Circle", "circle"), ("Ellipse", "ellipse"), ("Line", "line")]
+COLORS = [("Red", RED), ("Green", GREEN), ("Blue", BLUE), ("Cyan", CYAN),
+          ("Magenta", MAGENTA), ("Yellow", YELLOW), ("Orange", ORANGE), ("Purple", PURPLE)]
+FIELD_LABELS = {
+    "circle": [("Center X:", "cx"), ("Center Y:", "cy"), ("Radius:", "r")],
+    "ellipse": [("Center X:", "cx"), ("Center Y:", "cy"),
+                ("Radius X:", "rx"), ("Radius Y:", "ry")],
+    "line": [("Start X:", "x1"), ("Start Y:", "y1"),
+             ("End X:", "x2"), ("End Y:", "y2")],
+}
+
+_layouts = {}  # tool -> Layout of its scrollable content
+_layout = None  # Layout the retained content was rendered from
+_content_surface = None
+_content_tool = None
+_widget_states = {}
+_last_view = None
+
+
+def _build_panel_layout(current_tool):
+    """Lay out the scrollable content for a tool (content coordinates)"""
+    fields = FIELD_LABELS.get(current_tool, FIELD_LABELS["line"])
+    section_width = INPUT_PANEL_WIDTH - 20
+    nodes = []
+    y_pos = 90
+
+    # Tool Selection Section
+    tools = Node('group', pygame.Rect(25, y_pos + 45, 250, 40 * len(TOOLS)), name='tools', children=[
+        Node('toggle', pygame.Rect(25, y_pos + 45 + 40 * i, 250, 32),
+             action=(tool_key, None, None), value=tool_key, text=tool_name)
+        for i, (tool_name, tool_key) in enumerate(TOOLS)])
+    nodes.append(Node('section', pygame.Rect(10, y_pos, section_width, 160), children=[tools],
+                      color=ACCENT_BLUE, title="SELECT TOOL"))
+    y_pos += 45 + 40 * len(TOOLS) + 15
+
+    # Color Selection Section (2-column grid of swatches)
+    rows = (len(COLORS) + 1) // 2
+    swatches = Node('group', pygame.Rect(21, y_pos + 41, 252, 33 * rows + 3), name='colors', children=[
+        Node('swatch', pygame.Rect(25 + (i % 2) * 125, y_pos + 45 + 33 * (i // 2), 115, 28),
+             action=(None, color_val, None), value=color_val)
+        for i, (_, color_val) in enumerate(COLORS)])
+    nodes.append(Node('section', pygame.Rect(10, y_pos, section_width, 190), children=[swatches],
+                      color=ACCENT_GREEN, title="SELECT COLOR"))
+    y_pos += 45 + 33 * rows + 15
+
+    # Input Fields Section
+    section = Node('section', pygame.Rect(10, y_pos, section_width, 80 + len(fields) * 38), name='fields',
+                   color=CYAN, title="ENTER VALUES")
+    y_pos += 45
+    for label, key in fields:
+        section.children.append(Node('label', pygame.Rect(25, y_pos, 90, 28), text=label))
+        section.children.append(Node('field', pygame.Rect(115, y_pos, 160, 28),
+                                     action=(None, None, key), value=key))
+        y_pos += 38
+    nodes.append(section)
+    y_pos += 20
+
+    # Action buttons section
+    nodes.append(Node('button', pygame.Rect(30, y_pos, 240, 45), action=("draw_shape", None, None),
+                      style=BTN_SUCCESS, text="DRAW SHAPE", font=FONT_LARGE))
+    y_pos += 55
+    nodes.append(Node('button', pygame.Rect(30, y_pos, 240, 40), action=("clear_all", None, None),
+                      style=BTN_DANGER, text="Clear All", font=FONT_NORMAL))
+    y_pos += 50
+
+    # Zoom controls section
+    zoom_buttons = [
+        Node('button', pygame.Rect(30, y_pos + 45, 110, 35), action=("zoom_in", None, None),
+             style=BTN_INFO, text="+ In", font=FONT_NORMAL),
+        Node('button', pygame.Rect(160, y_pos + 45, 110, 35), action=("zoom_out", None, None),
+             style=BTN_WARNING, text="- Out", font=FONT_NORMAL),
+        Node('button', pygame.Rect(30, y_pos + 90, 240, 32), action=("reset_zoom", None, None),
+             style=BTN_SECONDARY, text="Reset (F5)", font=FONT_NORMAL),
+    ]
+    nodes.append(Node('section', pygame.Rect(10, y_pos, section_width, 140), children=zoom_buttons,
+                      color=ORANGE, title="ZOOM CONTROLS"))
+    y_pos += 45 + 45 + 45
+
+    return Layout(Node('panel', pygame.Rect(0, 0, INPUT_PANEL_WIDTH, y_pos + 40), children=nodes))
+
+
+def _get_layout(current_tool):
+    """The content layout for a tool, built on first use
+
+    Content coordinates do not depend on the window size (resizing only
+    moves the panel), so each tool's layout is built once.
+    """
+    layout = _layouts.get(current_tool)
+    if layout is None:
+        layout = _layouts[current_tool] = _build_panel_layout(current_tool)
+    return layout
+
+
+def _draw_section(surface, node):
+    """Draw a rounded section frame with its title"""
+    section_rect = node.rect
+    pygame.draw.rect(surface, SECTION_BG, section_rect, border_radius=10)
+    pygame.draw.rect(surface, node.props['color'], section_rect, 2, border_radius=10)
+    surface.blit(render_text(node.props['title'], FONT_MEDIUM, WHITE), (section_rect.x + 15, section_rect.y + 10))
+
+
+def _draw_static_node(surface, node):
+    """Draw a node that never changes after layout (stateful ones are drawn per update)"""
+    if node.kind == 'section':
+        _draw_section(surface, node)
+    elif node.kind == 'label':
+        surface.blit(render_text(node.props['text'], FONT_SMALL, WHITE), (node.rect.x, node.rect.y + 5))
+    elif node.kind == 'button':
+        draw_button_3d(surface, node.rect, node.props['style'], node.props['text'], node.props['font'], False)
+
+
+def _draw_tool_buttons(surface, group, current_tool):
+    """Draw the tool selection buttons (each one fully covers the previous state)"""
+    for node in group.children:
+        if current_tool == node.props['value']:
+            draw_button_3d(surface, node.rect, BTN_PRIMARY, node.props['text'], FONT_NORMAL, False)
+        else:
+            draw_button_3d(surface, node.rect, BTN_SECONDARY, node.props['text'], FONT_NORMAL, False)
+
+
+def _draw_color_grid(surface, group, current_color):
+    """Draw the 2-column grid of color swatches"""
+    pygame.draw.rect(surface, SECTION_BG, group.rect)
+
+    for node in group.children:
+        color_val = node.props['value']
+        btn_rect = node.rect
+
+        # 3D effect
+        if current_color == color_val:
+            pygame.draw.rect(surface, HIGHLIGHT, btn_rect.inflate(8, 8), border_radius=6)
+            pygame.draw.rect(surface, color_val, btn_rect.inflate(4, 4), border_radius=5)
+        else:
+            shadow_rect = btn_rect.copy()
+            shadow_rect.y += 2
+            pygame.draw.rect(surface, BLACK, shadow_rect, border_radius=5)
+
+        pygame.draw.rect(surface, color_val, btn_rect, border_radius=5)
+        pygame.draw.rect(surface, WHITE if current_color == color_val else BLACK, btn_rect, 2, border_radius=5)
+
+
+def _draw_input_field(surface, node, value, active):
+    """Draw a single input field with its current value"""
+    field_rect = node.rect
+    pygame.draw.rect(surface, SECTION_BG, field_rect.inflate(6, 6))
+
+    if active:
+        # Active field - glowing effect
+        glow_rect = field_rect.inflate(6, 6)
+        pygame.draw.rect(surface, ACCENT_BLUE, glow_rect, border_radius=6)
+        pygame.draw.rect(surface, WHITE, field_rect, border_radius=5)
+    else:
+        # Inactive field
+        pygame.draw.rect(surface, LIGHT_GRAY, field_rect, border_radius=5)
+    
+    pygame.draw.rect(surface, DARK_GRAY, field_rect, 2, border_radius=5)
+    
+    # Input value
+    if value:
+        value_text = render_text(value, FONT_NORMAL, BLACK)
+        surface.blit(value_text, (field_rect.x + 8, field_rect.y + 5))
+    elif active:
+        # Show cursor
+        cursor_text = render_text("|", FONT_NORMAL, BLACK)
+        surface.blit(cursor_text, (field_rect.x + 8, field_rect.y + 3))
+
+
+def _render_panel_content(current_tool):
+    """Render the static scrollable content for a tool; returns its height"""
+    global _content_surface, _content_tool, _layout
+
+    _layout = _get_layout(current_tool)
+    _content_surface = pygame.Surface((INPUT_PANEL_WIDTH, _layout.height), pygame.SRCALPHA)
+    _content_tool = current_tool
+    _widget_states.clear()
+    for node in _layout.root.walk():
+        _draw_static_node(_content_surface, node)
+    return _layout.height
+
+
+def _update_panel_widgets(current_tool, current_color, input_fields, active_field):
+    """Re-render only the widgets whose state changed; returns their content rects"""
+    changed = []
+    
+    tools = _layout.named['tools']
+    state = current_tool
+    if _widget_states.get('tools') != state:
+        _draw_tool_buttons(_content_surface, tools, current_tool)
+        _widget_states['tools'] = state
+        changed.append(tools.rect.copy())
+    
+    colors = _layout.named['colors']
+    state = tuple(current_color)
+    if _widget_states.get('colors') != state:
+        _draw_color_grid(_content_surface, colors, current_color)
+        _widget_states['colors'] = state
+        changed.append(colors.rect.copy())
+    
+    for node in _layout.named['fields'].children:
+        if node.kind != 'field':
+            continue
+        key = node.props['value']
+        state = (input_fields.get(key, ''), active_field == key)
+        if _widget_states.get(('field', key)) != state:
+            _draw_input_field(_content_surface, node, state[0], state[1])
+            _widget_states[('field', key)] = state
+            changed.append(node.rect.inflate(6, 6))
+    
+    return changed
+
+
 def draw_input_panel(screen, canvas_width, height, current_tool, current_color, 
-                     input_fields, active_field, zoom_level, shapes, panel_scroll_offset):
+                     input_fields, active_field, zoom_level, shapes, panel_scroll_offset,
+                     damage=None):
     """Draw Professional Input Panel on the right side with scroll support"""
-    global max_scroll, panel_content_height
+    global max_scroll, panel_content_height, _last_view
     
     panel_x = canvas_width
     
+    # Rebuild the retained content only when the layout changes
+    rebuilt = _content_surface is None or _content_tool != current_tool
+    if rebuilt:
+        panel_content_height = _render_panel_content(current_tool)
+    changed = _update_panel_widgets(current_tool, current_color, input_fields, active_field)
+    
     # Panel background with gradient
     panel_rect = pygame.Rect(panel_x, 0, INPUT_PANEL_WIDTH, height)
     draw_gradient_rect(screen, panel_rect, PANEL_BG, VERY_DARK_GRAY, vertical=True)
@@ -50,188 +272,50 @@ def draw_input_panel(screen, canvas_width, height, current_tool, current_color,
     # Left border accent
     pygame.draw.rect(screen, ACCENT_BLUE, (panel_x, 0, 4, height))
     
+    # Calculate max scroll and clamp the offset
+    viewport_height = max(0, height - HEADER_HEIGHT)
+    max_scroll = max(0, panel_content_height - viewport_height)
+    panel_scroll_offset = max(0, min(panel_scroll_offset, max_scroll))
+    
+    # Scrollable content through a clipped viewport below the header
+    viewport = pygame.Rect(0, HEADER_HEIGHT + panel_scroll_offset, INPUT_PANEL_WIDTH, viewport_height)
+    screen.blit(_content_surface, (panel_x, HEADER_HEIGHT), viewport)
+    
+    # Report what changed on screen (whole panel on layout/scroll/resize)
+    if damage is not None:
+        view = (panel_x, height, panel_scroll_offset)
+        if rebuilt or view != _last_view:
+            damage.add(pygame.Rect(panel_x, 0, INPUT_PANEL_WIDTH, height))
+        else:
+            screen_viewport = pygame.Rect(panel_x, HEADER_HEIGHT, INPUT_PANEL_WIDTH, viewport_height)
+            for rect in changed:
+                rect = rect.move(panel_x, -panel_scroll_offset)
+                damage.add(rect.clip(screen_viewport))
+        _last_view = view
+    
     # Header section (fixed, doesn't scroll)
-    header_rect = pygame.Rect(panel_x, 0, INPUT_PANEL_WIDTH, 70)
+    header_rect = pygame.Rect(panel_x, 0, INPUT_PANEL_WIDTH, HEADER_HEIGHT)
     draw_gradient_rect(screen, header_rect, PANEL_HEADER, PANEL_BG, vertical=True)
-    pygame.draw.line(screen, ACCENT_BLUE, (panel_x, 70), (panel_x + INPUT_PANEL_WIDTH, 70), 2)
+    pygame.draw.line(screen, ACCENT_BLUE, (panel_x, HEADER_HEIGHT), (panel_x + INPUT_PANEL_WIDTH, HEADER_HEIGHT), 2)
     
     # Title with icon (fixed header)
-    title_font = pygame.font.Font(None, FONT_LARGE)
-    title_text = title_font.render("CONTROL PANEL", True, WHITE)
-    title_shadow = title_font.render("CONTROL PANEL", True, BLACK)
+    title_text = render_text("CONTROL PANEL", FONT_LARGE, WHITE)
+    title_shadow = render_text("CONTROL PANEL", FONT_LARGE, BLACK)
     screen.blit(title_shadow, (panel_x + 22, 22))
     screen.blit(title_text, (panel_x + 20, 20))
     
-    # Start drawing scrollable content (apply scroll offset)
-    y_pos = 90 - panel_scroll_offset
-    
-    subtitle_font = pygame.font.Font(None, FONT_MEDIUM)
-    font = pygame.font.Font(None, FONT_NORMAL)
-    small_font = pygame.font.Font(None, FONT_SMALL)
-    
-    # Tool Selection Section
-    section_rect = pygame.Rect(panel_x + 10, y_pos, INPUT_PANEL_WIDTH - 20, 160)
-    pygame.draw.rect(screen, SECTION_BG, section_rect, border_radius=10)
-    pygame.draw.rect(screen, ACCENT_BLUE, section_rect, 2, border_radius=10)
-    
-    tool_title = subtitle_font.render("SELECT TOOL", True, WHITE)
-    screen.blit(tool_title, (panel_x + 25, y_pos + 10))
-    y_pos += 45
-    
-    # Tool buttons with icons
-    tools = [("Circle", "circle"), ("Ellipse", "ellipse"), ("Line", "line")]
-    for tool_name, tool_key in tools:
-        btn_rect = pygame.Rect(panel_x + 25, y_pos, 250, 32)
-        if current_tool == tool_key:
-            draw_button_3d(screen, btn_rect, BTN_PRIMARY, tool_name, font, False)
-        else:
-            draw_button_3d(screen, btn_rect, BTN_SECONDARY, tool_name, font, False)
-        y_pos += 40
-    
-    y_pos += 15
-    
-    # Color Selection Section
-    section_rect = pygame.Rect(panel_x + 10, y_pos, INPUT_PANEL_WIDTH - 20, 190)
-    pygame.draw.rect(screen, SECTION_BG, section_rect, border_radius=10)
-    pygame.draw.rect(screen, ACCENT_GREEN, section_rect, 2, border_radius=10)
-    
-    color_title = subtitle_font.render("SELECT COLOR", True, WHITE)
-    screen.blit(color_title, (panel_x + 25, y_pos + 10))
-    y_pos += 45
-    
-    colors = [("Red", RED), ("Green", GREEN), ("Blue", BLUE), ("Cyan", CYAN),
-              ("Magenta", MAGENTA), ("Yellow", YELLOW), ("Orange", ORANGE), ("Purple", PURPLE)]
-    
-    for i in range(0, len(colors), 2):
-        for j in range(2):
-            if i + j < len(colors):
-                color_name, color_val = colors[i + j]
-                x_offset = panel_x + 25 + j * 125
-                btn_rect = pygame.Rect(x_offset, y_pos, 115, 28)
-                
-                # 3D effect
-                if current_color == color_val:
-                    pygame.draw.rect(screen, HIGHLIGHT, btn_rect.inflate(8, 8), border_radius=6)
-                    pygame.draw.rect(screen, color_val, btn_rect.inflate(4, 4), border_radius=5)
-                else:
-                    shadow_rect = btn_rect.copy()
-                    shadow_rect.y += 2
-                    pygame.draw.rect(screen, BLACK, shadow_rect, border_radius=5)
-                
-                pygame.draw.rect(screen, color_val, btn_rect, border_radius=5)
-                pygame.draw.rect(screen, WHITE if current_color == color_val else BLACK, btn_rect, 2, border_radius=5)
-        y_pos += 33
-    
-    y_pos += 15
-    
-    # Input Fields Section
-    num_fields = len(input_fields)
-    section_height = 80 + num_fields * 38
-    section_rect = pygame.Rect(panel_x + 10, y_pos, INPUT_PANEL_WIDTH - 20, section_height)
-    pygame.draw.rect(screen, SECTION_BG, section_rect, border_radius=10)
-    pygame.draw.rect(screen, CYAN, section_rect, 2, border_radius=10)
-    
-    input_title = subtitle_font.render("ENTER VALUES", True, WHITE)
-    screen.blit(input_title, (panel_x + 25, y_pos + 10))
-    y_pos += 45
-    
-    # Determine fields based on current tool
-    if current_tool == "circle":
-        fields = [("Center X:", "cx"), ("Center Y:", "cy"), ("Radius:", "r")]
-    elif current_tool == "ellipse":
-        fields = [("Center X:", "cx"), ("Center Y:", "cy"), 
-                  ("Radius X:", "rx"), ("Radius Y:", "ry")]
-    else:  # line
-        fields = [("Start X:", "x1"), ("Start Y:", "y1"), 
-                  ("End X:", "x2"), ("End Y:", "y2")]
-    
-    for label, key in fields:
-        # Label
-        label_text = small_font.render(label, True, WHITE)
-        screen.blit(label_text, (panel_x + 25, y_pos + 5))
-        
-        # Input field with modern styling
-        field_x = panel_x + 115
-        field_rect = pygame.Rect(field_x, y_pos, 160, 28)
-        
-        if active_field == key:
-            # Active field - glowing effect
-            glow_rect = field_rect.inflate(6, 6)
-            pygame.draw.rect(screen, ACCENT_BLUE, glow_rect, border_radius=6)
-            pygame.draw.rect(screen, WHITE, field_rect, border_radius=5)
-        else:
-            # Inactive field
-            pygame.draw.rect(screen, LIGHT_GRAY, field_rect, border_radius=5)
-        
-        pygame.draw.rect(screen, DARK_GRAY, field_rect, 2, border_radius=5)
-        
-        # Input value
-        value = input_fields.get(key, '')
-        if value:
-            value_text = font.render(value, True, BLACK)
-            screen.blit(value_text, (field_x + 8, y_pos + 5))
-        elif active_field == key:
-            # Show cursor
-            cursor_text = font.render("|", True, BLACK)
-            screen.blit(cursor_text, (field_x + 8, y_pos + 3))
-        
-        y_pos += 38
-    
-    y_pos += 20
-    
-    # Action buttons section
-    # Draw button
-    draw_btn_rect = pygame.Rect(panel_x + 30, y_pos, 240, 45)
-    draw_button_3d(screen, draw_btn_rect, BTN_SUCCESS, "DRAW SHAPE", title_font, False)
-    y_pos += 55
-    
-    # Clear button
-    clear_btn_rect = pygame.Rect(panel_x + 30, y_pos, 240, 40)
-    draw_button_3d(screen, clear_btn_rect, BTN_DANGER, "Clear All", font, False)
-    y_pos += 50
-    
-    # Zoom controls section
-    section_rect = pygame.Rect(panel_x + 10, y_pos, INPUT_PANEL_WIDTH - 20, 140)
-    pygame.draw.rect(screen, SECTION_BG, section_rect, border_radius=10)
-    pygame.draw.rect(screen, ORANGE, section_rect, 2, border_radius=10)
-    
-    zoom_title = subtitle_font.render("ZOOM CONTROLS", True, WHITE)
-    screen.blit(zoom_title, (panel_x + 25, y_pos + 10))
-    y_pos += 45
-    
-    # Zoom buttons in a row
-    zoom_in_rect = pygame.Rect(panel_x + 30, y_pos, 110, 35)
-    draw_button_3d(screen, zoom_in_rect, BTN_INFO, "+ In", font, False)
-    
-    zoom_out_rect = pygame.Rect(panel_x + 160, y_pos, 110, 35)
-    draw_button_3d(screen, zoom_out_rect, BTN_WARNING, "- Out", font, False)
-    y_pos += 45
-    
-    # Reset Zoom button
-    reset_zoom_rect = pygame.Rect(panel_x + 30, y_pos, 240, 32)
-    draw_button_3d(screen, reset_zoom_rect, BTN_SECONDARY, "Reset (F5)", font, False)
-    y_pos += 45
-    
-    # Calculate total content height and max scroll
-    panel_content_height = y_pos + 40  # Add padding at bottom
-    current_max_scroll = max(0, panel_content_height - (height - 70))
-    
-    # Ensure panel_scroll_offset doesn't exceed max_scroll
-    if panel_scroll_offset > current_max_scroll:
-        panel_scroll_offset = current_max_scroll
-    
     # Draw scrollbar if content is larger than panel
-    if panel_content_height > (height - 70):
+    if panel_content_height > viewport_height:
         # Scrollbar background
         scrollbar_x = panel_x + INPUT_PANEL_WIDTH - 15
-        scrollbar_bg_rect = pygame.Rect(scrollbar_x, 70, 10, height - 70)
+        scrollbar_bg_rect = pygame.Rect(scrollbar_x, HEADER_HEIGHT, 10, viewport_height)
         pygame.draw.rect(screen, VERY_DARK_GRAY, scrollbar_bg_rect, border_radius=5)
         
         # Scrollbar handle
-        scroll_ratio = panel_scroll_offset / current_max_scroll if current_max_scroll > 0 else 0
-        visible_ratio = (height - 70) / panel_content_height
-        handle_height = max(30, int((height - 70) * visible_ratio))
-        handle_y = 70 + int((height - 70 - handle_height) * scroll_ratio)
+        scroll_ratio = panel_scroll_offset / max_scroll if max_scroll > 0 else 0
+        visible_ratio = viewport_height / panel_content_height
+        handle_height = max(30, int(viewport_height * visible_ratio))
+        handle_y = HEADER_HEIGHT + int((viewport_height - handle_height) * scroll_ratio)
         
         handle_rect = pygame.Rect(scrollbar_x, handle_y, 10, handle_height)
         pygame.draw.rect(screen, ACCENT_BLUE, handle_rect, border_radius=5)
@@ -243,86 +327,14 @@ def draw_input_panel(screen, canvas_width, height, current_tool, current_color,
 def handle_panel_click(pos, canvas_width, height, current_tool, input_fields, 
                       panel_scroll_offset, shapes, center_x, center_y, zoom_level):
     """Handle clicks on the input panel with scroll support"""
-    x, y_raw = pos
-    panel_x = canvas_width
+    x, y = pos
     
-    # Check if click is in panel area
-    if x < panel_x:
+    # Clicks left of the panel or on the fixed header hit nothing
+    if x < canvas_width or y < HEADER_HEIGHT:
         return None, None, None
     
-    # Adjust y coordinate for scroll offset (only for content below header)
-    if y_raw < 70:
-        # Header area - no scroll adjustment
+    # Content area - adjust for scroll and look the point up in the layout
+    node = _get_layout(current_tool).hit(x - canvas_width, y + panel_scroll_offset)
+    if node is None:
         return None, None, None
-    else:
-        # Content area - adjust for scroll
-        y = y_raw + panel_scroll_offset
-    
-    # Tool selection buttons (adjusted for scroll)
-    base_y = 90
-    if base_y + 30 <= y <= base_y + 65 and panel_x + 25 <= x <= panel_x + 275:
-        return "circle", None, None
-    elif base_y + 75 <= y <= base_y + 110 and panel_x + 25 <= x <= panel_x + 275:
-        return "ellipse", None, None
-    elif base_y + 120 <= y <= base_y + 155 and panel_x + 25 <= x <= panel_x + 275:
-        return "line", None, None
-    
-    # Color selection buttons (adjusted for scroll)
-    color_base = base_y + 175 + 45  # 310
-    
-    if color_base <= y <= color_base + 33:
-        if panel_x + 25 <= x <= panel_x + 140:
-            return None, RED, None
-        elif panel_x + 150 <= x <= panel_x + 265:
-            return None, GREEN, None
-    elif color_base + 33 <= y <= color_base + 66:
-        if panel_x + 25 <= x <= panel_x + 140:
-            return None, BLUE, None
-        elif panel_x + 150 <= x <= panel_x + 265:
-            return None, CYAN, None
-    elif color_base + 66 <= y <= color_base + 99:
-        if panel_x + 25 <= x <= panel_x + 140:
-            return None, MAGENTA, None
-        elif panel_x + 150 <= x <= panel_x + 265:
-            return None, YELLOW, None
-    elif color_base + 99 <= y <= color_base + 132:
-        if panel_x + 25 <= x <= panel_x + 140:
-            return None, ORANGE, None
-        elif panel_x + 150 <= x <= panel_x + 265:
-            return None, PURPLE, None
-    
-    # Input fields - check exact position for each field
-    field_y_start = 502
-    field_height = 38
-    fields = list(input_fields.keys())
-    
-    for i, key in enumerate(fields):
-        field_y = field_y_start + i * field_height
-        field_x = panel_x + 115
-        if field_y <= y < field_y + 28 and field_x <= x <= field_x + 160:
-            return None, None, key
-    
-    # Action buttons
-    draw_btn_y = field_y_start + len(fields) * field_height + 20
-    if draw_btn_y <= y <= draw_btn_y + 45 and panel_x + 30 <= x <= panel_x + 270:
-        return "draw_shape", None, None
-    
-    clear_btn_y = draw_btn_y + 55
-    if clear_btn_y <= y <= clear_btn_y + 40 and panel_x + 30 <= x <= panel_x + 270:
-        return "clear_all", None, None
-    
-    # Zoom buttons
-    zoom_section_y = clear_btn_y + 50
-    zoom_btn_y = zoom_section_y + 45
-    
-    if zoom_btn_y <= y <= zoom_btn_y + 35:
-        if panel_x + 30 <= x <= panel_x + 140:
-            return "zoom_in", None, None
-        elif panel_x + 160 <= x <= panel_x + 270:
-            return "zoom_out", None, None
-    
-    reset_zoom_y = zoom_btn_y + 45
-    if reset_zoom_y <= y <= reset_zoom_y + 32 and panel_x + 30 <= x <= panel_x + 270:
-        return "reset_zoom", None, None
-    
-    return None, None, None
+    return node.action
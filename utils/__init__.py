@@ -1,6 +1,9 @@
 """Utility functions module"""
 
-from .coordinates import coordinate_to_screen, screen_to_coordinate
-from .shapes_factory import create_shape_from_input
+from .coordinates import (coordinate_to_screen, screen_to_coordinate, screen_to_world, visible_world_rect,
+                          coordinates_to_screen, screens_to_world)
+from .shapes_factory import create_shape_from_input, create_shape_from_dict
 
-__all__ = ['coordinate_to_screen', 'screen_to_coordinate', 'create_shape_from_input']
+__all__ = ['coordinate_to_screen', 'screen_to_coordinate', 'screen_to_world', 'visible_world_rect',
+           'coordinates_to_screen', 'screens_to_world',
+           'create_shape_from_input', 'create_shape_from_dict']
@@ -0,0 +1,117 @@
+"""Per-stage frame timing with rolling percentiles and trace export"""
+
+import json
+from time import perf_counter_ns
+
+import numpy as np
+
+from config import PROFILER_WINDOW, PROFILER_TRACE_FRAMES
+
+
+class FrameProfiler:
+    """Times the stages of each frame with perf_counter_ns
+
+    Call begin_frame() at the top of the loop, mark(stage) after each
+    stage (the time since the previous mark is charged to it) and
+    end_frame() last. While disabled every call returns after a single
+    attribute test. The last PROFILER_WINDOW frames feed the p50/p95/p99
+    summary; the last PROFILER_TRACE_FRAMES frames can be exported.
+    """
+    def __init__(self, stages, enabled=False):
+        self.stages = list(stages)
+        self._columns = {stage: i for i, stage in enumerate(self.stages)}
+        self.enabled = enabled
+        self.active = False  # True between begin_frame and end_frame while enabled
+        self.reset()
+
+    def reset(self):
+        """Forget every recorded frame"""
+        width = len(self.stages) + 1  # Last column holds the frame total
+        self.frames = 0
+        self._window = np.zeros((PROFILER_WINDOW, width), np.int64)
+        self._trace = np.zeros((PROFILER_TRACE_FRAMES, width), np.int64)
+        self._trace_start = np.zeros(PROFILER_TRACE_FRAMES, np.int64)
+        self._row = [0] * width
+
+    def set_enabled(self, enabled):
+        """Turn timing on or off (takes effect at the next begin_frame)"""
+        self.enabled = enabled
+
+    # ---------------------
+    # Recording
+    # ---------------------
+    def begin_frame(self):
+        """Start timing a frame"""
+        self.active = self.enabled
+        if self.active:
+            self._row = [0] * (len(self.stages) + 1)
+            self._frame_start = self._last = perf_counter_ns()
+
+    def mark(self, stage):
+        """Charge the time since the previous mark to stage"""
+        if self.active:
+            now = perf_counter_ns()
+            self._row[self._columns[stage]] += now - self._last
+            self._last = now
+
+    def end_frame(self):
+        """Finish the frame and store its timings"""
+        if not self.active:
+            return
+        self.active = False
+        self._row[-1] = self._last - self._frame_start
+        self._window[self.frames % PROFILER_WINDOW] = self._row
+        self._trace[self.frames % PROFILER_TRACE_FRAMES] = self._row
+        self._trace_start[self.frames % PROFILER_TRACE_FRAMES] = self._frame_start
+        self.frames += 1
+
+    # ---------------------
+    # Results
+    # ---------------------
+    def _recent(self, buffer, size):
+        """Rows of a ring buffer in recording order"""
+        count = min(self.frames, size)
+        start = self.frames - count
+        rows = np.arange(start, self.frames) % size
+        return buffer[rows]
+
+    def summary(self):
+        """{stage: (p50, p95, p99)} in milliseconds over the rolling window ('frame' = total)"""
+        samples = self._recent(self._window, PROFILER_WINDOW)
+        if not len(samples):
+            return {}
+        p = np.percentile(samples, (50, 95, 99), axis=0) / 1e6
+        return {stage: tuple(p[:, i].tolist()) for i, stage in enumerate(self.stages + ['frame'])}
+
+    def trace(self):
+        """Recorded frames, oldest first: [{'frame', 'start_ns', 'stages': {stage: ns}, 'total_ns'}]"""
+        rows = self._recent(self._trace, PROFILER_TRACE_FRAMES).tolist()
+        starts = self._recent(self._trace_start, PROFILER_TRACE_FRAMES).tolist()
+        first = self.frames - len(rows)
+        return [{'frame': first + i, 'start_ns': start,
+                 'stages': dict(zip(self.stages, row[:-1])), 'total_ns': row[-1]}
+                for i, (row, start) in enumerate(zip(rows, starts))]
+
+    def export_json(self, path):
+        """Write the summary and the per-frame trace as JSON"""
+        data = {'stages': self.stages,
+                'summary_ms': {stage: dict(zip(('p50', 'p95', 'p99'), values))
+                               for stage, values in self.summary().items()},
+                'frames': self.trace()}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def export_chrome_trace(self, path):
+        """Write the trace in Chrome trace-event format (chrome://tracing, Perfetto)"""
+        events = []
+        for frame in self.trace():
+            ts = frame['start_ns'] / 1000
+            events.append({'name': f"frame {frame['frame']}", 'ph': 'X', 'pid': 1, 'tid': 1,
+                           'ts': ts, 'dur': frame['total_ns'] / 1000})
+            for stage, ns in frame['stages'].items():
+                # Stages run back to back in mark() order
+                events.append({'name': stage, 'ph': 'X', 'pid': 1, 'tid': 2,
+                               'ts': ts, 'dur': ns / 1000})
+                ts += ns / 1000
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
@@ -0,0 +1,79 @@
+"""Scene file loading and saving (JSON)
+
+A scene file is a JSON object::
+
+    {"zoom": 1.0,
+     "shapes": [{"type": "circle", "cx": 0, "cy": 0, "r": 10, "color": "red"},
+                {"type": "ellipse", "cx": 5, "cy": 5, "rx": 20, "ry": 8},
+                {"type": "line", "x1": 0, "y1": 0, "x2": 40, "y2": 20,
+                 "color": [111, 66, 193], "label": false}]}
+
+"zoom" is optional; "color" defaults to red and "label" to true.
+Files ending in SCENE_FILE_EXT use the binary format in shapes/mapped.py.
+Imported as utils.scene_io (not re-exported by utils, since shapes.scene
+itself depends on utils).
+"""
+
+import json
+
+from config import SCENE_FILE_EXT
+from shapes import Scene, Circle, Ellipse, MappedScene, write_mapped_scene
+from .shapes_factory import create_shape_from_dict, SHAPE_COLORS
+
+
+def load_scene(path, scene=None):
+    """Read a scene file into scene (a new Scene by default); returns (scene, zoom or None)
+
+    Binary files open as a lazily loaded MappedScene unless a scene is given.
+    """
+    if path.endswith(SCENE_FILE_EXT):
+        mapped = MappedScene(path)
+        if scene is None:
+            return mapped, mapped.zoom_level
+        scene.extend(mapped)
+        return scene, mapped.zoom_level
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {"shapes": data}  # Bare list of shape records
+
+    scene = Scene() if scene is None else scene
+    shapes = []
+    for i, record in enumerate(data.get("shapes", [])):
+        try:
+            shapes.append(create_shape_from_dict(record))
+        except (ValueError, AttributeError) as e:
+            raise ValueError(f"shape {i}: {e}") from None
+    scene.extend(shapes)
+    return scene, data.get("zoom")
+
+
+def shape_to_dict(shape):
+    """Scene-file record for a Circle, Ellipse or Line"""
+    names = {color: name for name, color in SHAPE_COLORS.items()}
+    color = tuple(shape.color)
+    record = {"color": names.get(color, list(color))}
+    if isinstance(shape, Circle):
+        record.update(type="circle", cx=shape.original_center_x, cy=shape.original_center_y,
+                      r=shape.radius)
+    elif isinstance(shape, Ellipse):
+        record.update(type="ellipse", cx=shape.original_center_x, cy=shape.original_center_y,
+                      rx=shape.rx, ry=shape.ry)
+    else:
+        record.update(type="line", x1=shape.x1, y1=shape.y1, x2=shape.x2, y2=shape.y2)
+    if not shape.original_coords:
+        record["label"] = False
+    return record
+
+
+def save_scene(path, shapes, zoom_level=None):
+    """Write shapes (any iterable of shapes) as a scene file"""
+    if path.endswith(SCENE_FILE_EXT):
+        write_mapped_scene(path, shapes, zoom_level)
+        return
+    data = {"shapes": [shape_to_dict(shape) for shape in shapes]}
+    if zoom_level is not None:
+        data["zoom"] = zoom_level
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
@@ -1,6 +1,25 @@
 """Shape creation factory"""
 
+import csv
+from itertools import islice
+
+import numpy as np
+
+from config import RED, GREEN, BLUE, CYAN, MAGENTA, YELLOW, ORANGE, PURPLE, IMPORT_CHUNK_ROWS
 from shapes import Circle, Ellipse, Line
+from shapes.columnar import ShapeBatch
+
+
+# Color names accepted in scene files (same palette as the control panel)
+SHAPE_COLORS = {"red": RED, "green": GREEN, "blue": BLUE, "cyan": CYAN,
+                "magenta": MAGENTA, "yellow": YELLOW, "orange": ORANGE, "purple": PURPLE}
+
+# Coordinate fields of each shape type, in constructor order
+SHAPE_FIELDS = {
+    "circle": ("cx", "cy", "r"),
+    "ellipse": ("cx", "cy", "rx", "ry"),
+    "line": ("x1", "y1", "x2", "y2"),
+}
 
 
 def create_shape_from_input(current_tool, input_fields, current_color, center_x, center_y, zoom_level):
@@ -49,3 +68,254 @@ def create_shape_from_input(current_tool, input_fields, current_color, center_x,
         pass
     
     return None
+
+
+def parse_color(value):
+    """Color from a palette name or an [r, g, b] list"""
+    if isinstance(value, str):
+        color = SHAPE_COLORS.get(value.lower())
+        if color is None:
+            raise ValueError(f"unknown color {value!r}")
+        return color
+    color = tuple(int(channel) for channel in value)
+    if len(color) != 3 or not all(0 <= channel <= 255 for channel in color):
+        raise ValueError(f"invalid color {value!r}")
+    return color
+
+
+def create_shape_from_dict(record):
+    """Create a shape from a scene-file record; raises ValueError if it is invalid"""
+    kind = record.get("type")
+    fields = SHAPE_FIELDS.get(kind)
+    if fields is None:
+        raise ValueError(f"unknown shape type {kind!r}")
+    try:
+        values = [int(record[name]) for name in fields]
+    except KeyError as e:
+        raise ValueError(f"{kind} is missing {e.args[0]!r}") from None
+    except (TypeError, ValueError):
+        raise ValueError(f"{kind} coordinates must be integers") from None
+    color = parse_color(record.get("color", "red"))
+    labelled = record.get("label", True)
+
+    if kind == "circle":
+        cx, cy, r = values
+        return Circle(cx, cy, r, color, (cx, cy) if labelled else None)
+    if kind == "ellipse":
+        cx, cy, rx, ry = values
+        return Ellipse(cx, cy, rx, ry, color, (cx, cy) if labelled else None)
+    x1, y1, x2, y2 = values
+    return Line(x1, y1, x2, y2, color, (x1, y1, x2, y2) if labelled else None)
+
+
+# =====================
+# Bulk creation
+# =====================
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+
+
+def _parse_int_column(values):
+    """Parse strings like int() with '' -> 0; returns (int64 array, ok mask)"""
+    try:
+        # Empty fields mean 0, as in the panel
+        numbers = np.fromiter(map(int, (value or '0' for value in values)), np.int64, len(values))
+        ok = np.ones(len(values), bool)
+    except (ValueError, OverflowError):
+        # Slow path only for chunks that contain bad values
+        numbers = np.zeros(len(values), np.int64)
+        ok = np.zeros(len(values), bool)
+        for i, value in enumerate(values):
+            try:
+                numbers[i] = int(value.strip() or '0')
+                ok[i] = True
+            except (ValueError, OverflowError):
+                pass
+    ok &= (numbers >= INT32_MIN) & (numbers <= INT32_MAX)
+    return numbers, ok
+
+
+def _normalize_column(values):
+    """Stripped, lower-cased strings; each distinct value is normalized once"""
+    distinct, inverse = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return np.array([value.strip().lower() for value in distinct.tolist()], dtype=str)[inverse]
+
+
+def _parse_label_column(values):
+    """'', 1/0, true/false, yes/no -> (bool array, ok mask); empty means labelled"""
+    text = _normalize_column(values)
+    labelled = np.isin(text, ('', '1', 'true', 'yes'))
+    return labelled, labelled | np.isin(text, ('0', 'false', 'no'))
+
+
+def create_shapes_from_columns(columns, default_color, line_numbers=None):
+    """Vectorized create_shape_from_input for many rows at once
+
+    columns maps field names (type, cx, cy, r, rx, ry, x1, y1, x2, y2,
+    color, label) to equally long sequences of strings; without a "type"
+    column the kind is inferred from the fields present. Rows follow the
+    panel's rules (integers, empty means 0, r > 0, rx > 0 and ry > 0).
+    Returns (ShapeBatch, rejected) where rejected lists (line number,
+    reason); rows are numbered 1..n unless line_numbers is given.
+    """
+    n = len(next(iter(columns.values()), ()))
+    lines = np.arange(1, n + 1) if line_numbers is None else np.asarray(line_numbers)
+    accepted = np.ones(n, bool)
+    reasons = np.full(n, None, object)
+
+    def reject(mask, reason):
+        """Record the first reason each still-accepted row fails"""
+        mask = mask & accepted
+        reasons[mask] = reason
+        accepted[mask] = False
+
+    # Shape kind per row
+    if 'type' in columns:
+        kinds = _normalize_column(columns['type'])
+    else:
+        inferred = [kind for kind, fields in SHAPE_FIELDS.items()
+                    if all(name in columns for name in fields)]
+        # Ambiguous headers (e.g. both r and rx/ry) need an explicit type column
+        kinds = np.full(n, inferred[0] if len(inferred) == 1 else '')
+    reject(~np.isin(kinds, list(SHAPE_FIELDS)), "unknown shape type")
+
+    # Numeric fields
+    numbers = {}
+    for name in sorted({name for fields in SHAPE_FIELDS.values() for name in fields}):
+        if name in columns:
+            numbers[name], ok = _parse_int_column(columns[name])
+            needed = np.isin(kinds, [kind for kind, fields in SHAPE_FIELDS.items() if name in fields])
+            reject(needed & ~ok, f"{name} must be a 32-bit integer")
+    for kind, fields in SHAPE_FIELDS.items():
+        for name in fields:
+            if name not in numbers:
+                reject(kinds == kind, f"missing column {name!r}")
+    if 'r' in numbers:
+        reject((kinds == 'circle') & (numbers['r'] <= 0), "radius must be > 0")
+    if 'rx' in numbers and 'ry' in numbers:
+        reject((kinds == 'ellipse') & ((numbers['rx'] <= 0) | (numbers['ry'] <= 0)),
+               "radii must be > 0")
+
+    # Colors: parse each distinct value once
+    palette = [tuple(default_color)]
+    color_ids = np.zeros(n, np.int64)
+    if 'color' in columns:
+        names, inverse = np.unique(np.asarray(columns['color'], dtype=str), return_inverse=True)
+        ids = []
+        for name in names.tolist():
+            name = name.strip()
+            try:
+                color = parse_color(name) if name else tuple(default_color)
+            except ValueError:
+                ids.append(-1)
+                continue
+            if color not in palette:
+                palette.append(color)
+            ids.append(palette.index(color))
+        color_ids = np.asarray(ids, np.int64)[inverse]
+        reject(color_ids < 0, "unknown color")
+
+    labelled = np.ones(n, bool)
+    if 'label' in columns:
+        labelled, ok = _parse_label_column(columns['label'])
+        reject(~ok, "label must be 1/0, true/false or yes/no")
+
+    order = np.cumsum(accepted) - 1  # Draw order among the accepted rows
+    batch_columns = {}
+    for kind, fields in SHAPE_FIELDS.items():
+        rows = accepted & (kinds == kind)
+        if not rows.any():
+            continue
+        cols = {'order': order[rows]}
+        cols.update((name, numbers[name][rows]) for name in fields)
+        cols['color'] = color_ids[rows]
+        cols['labelled'] = labelled[rows]
+        batch_columns[kind] = cols
+
+    rejected = list(zip(lines[~accepted].tolist(), reasons[~accepted].tolist()))
+    return ShapeBatch(palette, batch_columns), rejected
+
+
+def _merge_batches(batches):
+    """Concatenate ShapeBatches in order into one batch"""
+    palette = []
+    parts = {kind: [] for kind in SHAPE_FIELDS}
+    offset = 0
+    for batch in batches:
+        lut = []
+        for color in batch.palette:
+            if color not in palette:
+                palette.append(color)
+            lut.append(palette.index(color))
+        lut = np.asarray(lut, np.int64)
+        for kind, cols in batch.columns().items():
+            part = dict(cols)
+            part['order'] = cols['order'] + offset
+            part['color'] = lut[cols['color']] if len(lut) else cols['color']
+            parts[kind].append(part)
+        offset += len(batch)
+    columns = {kind: {name: np.concatenate([part[name] for part in kind_parts])
+                      for name in kind_parts[0]}
+               for kind, kind_parts in parts.items() if kind_parts}
+    return ShapeBatch(palette, columns)
+
+
+def _split_chunk(lines, first_line, delimiter, width):
+    """Split raw text lines into columns; returns (columns list, line numbers, rejected)"""
+    if any('"' in line for line in lines):
+        # Quoted fields need the csv module (and the row-to-column transpose)
+        reader = csv.reader(lines, delimiter=delimiter)
+        rows, numbers, rejected = [], [], []
+        for row in reader:
+            line = first_line + reader.line_num - 1
+            if len(row) == width:
+                rows.append(row)
+                numbers.append(line)
+            elif row:
+                rejected.append((line, f"expected {width} fields"))
+        return [list(column) for column in zip(*rows)] or [[] for _ in range(width)], numbers, rejected
+
+    text = [line.rstrip('\r\n') for line in lines]
+    numbers = list(range(first_line, first_line + len(text)))
+    counts = [line.count(delimiter) for line in text]
+    rejected = []
+    if counts.count(width - 1) != len(text):
+        keep = [i for i, count in enumerate(counts) if count == width - 1]
+        rejected = [(numbers[i], f"expected {width} fields")
+                    for i, count in enumerate(counts) if count != width - 1 and text[i]]
+        text = [text[i] for i in keep]
+        numbers = [numbers[i] for i in keep]
+    # Split the whole chunk at once; column j is every width-th field from j
+    fields = delimiter.join(text).split(delimiter) if text else []
+    return [fields[j::width] for j in range(width)], numbers, rejected
+
+
+def import_shapes(path, default_color, chunk_rows=IMPORT_CHUNK_ROWS):
+    """Read shapes from a CSV/TSV file with a header row, in chunks of rows
+
+    Returns (ShapeBatch, rejected) like create_shapes_from_columns, with
+    file line numbers. Append the batch with a single extend() call.
+    Raises ValueError when the header names a column twice.
+    """
+    delimiter = '\t' if path.lower().endswith(('.tsv', '.tab')) else ','
+    batches = []
+    rejected = []
+    with open(path, newline='', encoding='utf-8-sig') as f:  # -sig: drop the BOM spreadsheets write
+        header = [name.strip().lower() for name in next(csv.reader([f.readline()], delimiter=delimiter), [])]
+        repeated = sorted({name for name in header if header.count(name) > 1})
+        if repeated:
+            raise ValueError(f"duplicate column {', '.join(map(repr, repeated))} in the header")
+        first_line = 2
+        while True:
+            lines = list(islice(f, chunk_rows))
+            if not lines:
+                break
+            columns, numbers, bad = _split_chunk(lines, first_line, delimiter, len(header))
+            first_line += len(lines)
+            rejected.extend(bad)
+            if not numbers:
+                continue
+            batch, bad = create_shapes_from_columns(dict(zip(header, columns)), default_color, numbers)
+            batches.append(batch)
+            rejected.extend(bad)
+    rejected.sort()
+    return _merge_batches(batches), rejected
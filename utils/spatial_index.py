@@ -0,0 +1,160 @@
+"""Uniform-grid spatial index over world-space bounding boxes"""
+
+from math import floor, isqrt
+
+import numpy as np
+
+from config import SPATIAL_CELL_SIZE, SPATIAL_MAX_CELLS
+
+
+class GridIndex:
+    """Buckets (key, item, bounds) entries into fixed-size world cells
+
+    Keys are integers that define draw order (lower keys are drawn first).
+    Items whose bounding box spans more than SPATIAL_MAX_CELLS cells are kept
+    in a separate list that every query checks, so huge shapes do not
+    flood the grid.
+    """
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.large = {}
+        self.entries = {}  # key -> (item, bounds)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _cell_range(self, bounds):
+        xmin, ymin, xmax, ymax = bounds
+        size = self.cell_size
+        return (floor(xmin / size), floor(ymin / size),
+                floor(xmax / size), floor(ymax / size))
+
+    def insert(self, key, item, bounds):
+        """Add an item with its (xmin, ymin, xmax, ymax) bounds"""
+        self.entries[key] = (item, bounds)
+        cx0, cy0, cx1, cy1 = self._cell_range(bounds)
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > SPATIAL_MAX_CELLS:
+            self.large[key] = item
+            return
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                self.cells.setdefault((cx, cy), {})[key] = item
+
+    def remove(self, key):
+        """Remove the item stored under key"""
+        item, bounds = self.entries.pop(key)
+        if self.large.pop(key, None) is not None:
+            return item
+        cx0, cy0, cx1, cy1 = self._cell_range(bounds)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket is not None:
+                    bucket.pop(key, None)
+                    if not bucket:
+                        del self.cells[(cx, cy)]
+        return item
+
+    def query(self, xmin, ymin, xmax, ymax):
+        """Return the items whose bounds intersect the rect, in key order"""
+        return [self.entries[key][0] for key in self.query_keys(xmin, ymin, xmax, ymax)]
+
+    def query_keys(self, xmin, ymin, xmax, ymax):
+        """Sorted keys of the items whose bounds intersect the rect"""
+        found = {}
+        cx0, cy0, cx1, cy1 = self._cell_range((xmin, ymin, xmax, ymax))
+
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.entries):
+            # Query covers more cells than there are items - scan instead
+            for key, (item, bounds) in self.entries.items():
+                if bounds[0] <= xmax and bounds[2] >= xmin and bounds[1] <= ymax and bounds[3] >= ymin:
+                    found[key] = item
+        else:
+            entries = self.entries
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    bucket = self.cells.get((cx, cy))
+                    if not bucket:
+                        continue
+                    for key, item in bucket.items():
+                        if key in found:
+                            continue
+                        bounds = entries[key][1]
+                        if bounds[0] <= xmax and bounds[2] >= xmin and bounds[1] <= ymax and bounds[3] >= ymin:
+                            found[key] = item
+            for key, item in self.large.items():
+                bounds = entries[key][1]
+                if bounds[0] <= xmax and bounds[2] >= xmin and bounds[1] <= ymax and bounds[3] >= ymin:
+                    found[key] = item
+
+        return sorted(found)
+
+
+class SortedCellIndex:
+    """Static index over bounding-box arrays for rect queries in O(log n + hits)
+
+    Each box is filed under the cell of its (xmin, ymin) corner and the
+    rows are sorted by (cell x, cell y), so the cells of one cell column
+    form a single contiguous run found with two binary searches. A query
+    only visits the occupied cell columns inside its x range, so a rect
+    covering millions of empty cells costs no more than the columns that
+    hold boxes. A query widens its lower edges by the largest indexed box
+    extent so boxes starting in an earlier cell are not missed. Boxes wider
+    or taller than sqrt(SPATIAL_MAX_CELLS) cells are kept apart and always
+    tested.
+    """
+    def __init__(self, xmin, ymin, xmax, ymax, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.bounds = tuple(np.asarray(v, np.float64) for v in (xmin, ymin, xmax, ymax))
+        xmin, ymin, xmax, ymax = self.bounds
+        self.count = len(xmin)
+        self.extent = ((xmin.min(), ymin.min(), xmax.max(), ymax.max()) if self.count
+                       else (np.inf, np.inf, -np.inf, -np.inf))
+
+        extent = np.maximum(xmax - xmin, ymax - ymin)
+        large = extent > cell_size * isqrt(SPATIAL_MAX_CELLS)
+        self.large = np.nonzero(large)[0]
+        small = np.nonzero(~large)[0]
+        self.reach = float(extent[small].max()) if len(small) else 0.0
+
+        keys = self._keys(np.floor(xmin[small] / cell_size), np.floor(ymin[small] / cell_size))
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.rows = small[order]
+        self.columns = np.unique(self.keys // 2 ** 32)  # Occupied cell x values, ascending
+
+    def __len__(self):
+        return self.count
+
+    @staticmethod
+    def _keys(cell_x, cell_y):
+        """Sort key ordering cells by x, then y"""
+        return np.asarray(cell_x, np.int64) * 2 ** 32 + (np.asarray(cell_y, np.int64) + 2 ** 31)
+
+    @staticmethod
+    def _cell(value, size):
+        """Cell number of a world coordinate, clamped to the 32-bit cell range keys can hold"""
+        return min(max(floor(value / size), -2 ** 31), 2 ** 31 - 1)
+
+    def query(self, xmin, ymin, xmax, ymax):
+        """Sorted indices of the boxes that intersect the rect"""
+        ex0, ey0, ex1, ey1 = self.extent
+        if xmin <= ex0 and ymin <= ey0 and xmax >= ex1 and ymax >= ey1:
+            return np.arange(self.count)  # The rect holds every box
+
+        size = self.cell_size
+        lo = np.searchsorted(self.columns, self._cell(xmin - self.reach, size), 'left')
+        hi = np.searchsorted(self.columns, self._cell(xmax, size), 'right')
+        cell_xs = self.columns[lo:hi]
+        first = np.searchsorted(self.keys, self._keys(cell_xs, self._cell(ymin - self.reach, size)), 'left')
+        last = np.searchsorted(self.keys, self._keys(cell_xs, self._cell(ymax, size)), 'right')
+
+        # Gather every run [first, last) at once: position k of run j is first[j] + k
+        lengths = last - first
+        starts = np.repeat(first - (np.cumsum(lengths) - lengths), lengths)
+        rows = np.concatenate([self.rows[starts + np.arange(len(starts))], self.large])
+
+        bx0, by0, bx1, by1 = self.bounds
+        hit = (bx0[rows] <= xmax) & (bx1[rows] >= xmin) & (by0[rows] <= ymax) & (by1[rows] >= ymin)
+        return np.sort(rows[hit])